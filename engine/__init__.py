@@ -0,0 +1,36 @@
+"""Motor vetorizado de backtest das estratégias VAR.
+
+As páginas definem as estratégias como funções ``estrategia_N`` ou como
+textos da linguagem de expressões (expr.py); o motor as lê como dados
+(catálogo), calcula as VARs uma única vez e avalia todas as estratégias com
+operações em bitsets.
+"""
+from .all_markets import (all_markets_catalog, daily_games, leaderboard, run_all_markets, totals_board,
+                          verify_compact_schema)
+from .apriori import mine_rules, rules_catalog
+from .approval import approval_data, evaluate_approval
+from .backtest import above_thresholds, backtest_catalog, bet_prefix, match_bits, moving_averages
+from .breakdown import breakdown, breakdown_matrix, market_breakdown
+from .bundle import cached_catalog, load_bundle, save_bundle
+from .catalog import PAGE_MARKETS, Catalog, load_page_catalog, page_code, parse_strategies, strategy_key
+from .expr import HAS_NUMEXPR, compile_expression, expressions_catalog, format_expression, parse_expression
+from .features import ODDS_COLUMNS, VAR_NAMES, compute_features
+from .history import History, prepare_history
+from .io import compact_schema, iter_table, read_table
+from .kernels import HAS_NUMBA, fused_totals
+from .leagues import APPROVED_LEAGUES, approved_mask, filter_approved, normalize_leagues
+from .library import BetCache, StrategyLibrary, parse_strategy_file, strategy_file_text
+from .markets import MARKETS
+from .miner2d import candidates_catalog, mine_pairs, to_page_code
+from .meta_backtest import meta_backtest
+from .minhash import minhash_clusters
+from .neighbors import build_index, neighbor_games, neighbor_outcomes
+from .overlap import intersection_matrix, overlap, prune_redundant
+from .simulation import simulate_games
+from .significance import benjamini_hochberg, significance
+from .staking import STAKING_MODES, simulate_staking
+from .store import find_rows, open_history, prune_store, row_keys
+from .stream import stream_backtest, stream_file
+from .sweep import best_min_odds, odds_curve, sweep_min_odds
+from .tree import learn_rules
+from .walkforward import make_folds, walk_forward
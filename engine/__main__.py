@@ -0,0 +1,89 @@
+"""Linha de comando: ranking de todos os mercados sem abrir o Streamlit.
+
+Exemplo::
+
+    python -m engine historico.csv --diario jogos_do_dia.csv --top 30
+
+Com ``--blocos N`` o histórico é lido em blocos de N linhas (stream.py), para
+arquivos maiores que a memória.
+
+O catálogo pode vir de um pacote binário (bundle.py), gerado uma vez e lido
+em milissegundos::
+
+    python -m engine --gerar-pacote estrategias.npz
+    python -m engine historico.csv --pacote estrategias.npz
+
+Com ``--so-totais`` o ranking traz só jogos, acertos, lucro e ROI, calculados
+pelo kernel fundido (kernels.py): com Numba instalado, sem montar as VARs nem
+os bitsets do histórico.
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from .all_markets import all_markets_catalog, daily_games, run_all_markets, totals_board
+from .bundle import load_bundle, save_bundle
+from .io import read_table
+from .leagues import filter_approved
+from .library import StrategyLibrary
+from .stream import stream_file
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return read_table(os.path.basename(path), f.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m engine',
+                                     description="Backtest de todas as estratégias, de todos os mercados, numa única passada.")
+    parser.add_argument('historico', nargs='?', help="planilha histórica (.xlsx ou .csv)")
+    parser.add_argument('--diario', help="planilha com os jogos do dia: lista os jogos das estratégias aprovadas")
+    parser.add_argument('--top', type=int, default=20, help="quantas estratégias mostrar no ranking (padrão: 20)")
+    parser.add_argument('--blocos', type=int,
+                        help="lê o histórico em blocos de N linhas (.csv ou .parquet), sem carregá-lo inteiro")
+    parser.add_argument('--so-totais', action='store_true',
+                        help="só jogos, acertos, lucro e ROI, pelo kernel fundido (rápido com Numba), sem aprovação")
+    parser.add_argument('--saida', help="salva o ranking completo em .csv")
+    parser.add_argument('--pacote', help="lê as estratégias de um pacote binário (.npz) em vez das páginas")
+    parser.add_argument('--gerar-pacote', metavar='ARQUIVO',
+                        help="grava as estratégias das páginas e de strategies/*.txt num pacote binário (.npz)")
+    args = parser.parse_args(argv)
+
+    if args.gerar_pacote:
+        library = StrategyLibrary.open()
+        save_bundle(library.catalog, args.gerar_pacote, library.keys)
+        print(f"{len(library.catalog)} estratégias gravadas em {args.gerar_pacote}.")
+    if args.historico is None:
+        if not args.gerar_pacote:
+            parser.error("informe a planilha histórica")
+        return
+    if args.so_totais and (args.blocos or args.diario):
+        parser.error("--so-totais não calcula a aprovação nem lê em blocos: não combina com --diario ou --blocos")
+
+    catalog = load_bundle(args.pacote)[0] if args.pacote else all_markets_catalog()
+    if args.so_totais:
+        n_rows, board = totals_board(_read(args.historico), catalog)
+    elif args.blocos:
+        n_rows, board = stream_file(args.historico, catalog, chunksize=args.blocos)
+        board = board.sort_values("Lucro Total", ascending=False, kind='stable')
+    else:
+        history, catalog, board = run_all_markets(_read(args.historico), catalog)
+        n_rows = history.n_rows
+    print(f"{n_rows} jogos nas ligas aprovadas, {len(catalog)} estratégias avaliadas.")
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(board[board["Total de Jogos"] > 0].head(args.top).to_string(index=False))
+    if args.saida:
+        board.to_csv(args.saida, index=False)
+
+    if args.diario:
+        approved = board.index[board["Acima dos Limiares"]].tolist()
+        games = daily_games(filter_approved(_read(args.diario)), catalog, approved)
+        print(f"\n{len(approved)} estratégias aprovadas, {len(games)} entradas nos jogos do dia.")
+        if len(games):
+            print(games.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Backtest de todos os mercados numa única passada.
+
+Em vez de subir o mesmo histórico nas cinco páginas, o arquivo é lido,
+filtrado e transformado em VARs uma vez; cada mercado é liquidado uma vez e as
+estratégias das cinco páginas são avaliadas juntas numa única chamada do motor.
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import above_thresholds, backtest_catalog, match_bits, moving_averages
+from .bitsets import match_lists
+from .catalog import PAGE_MARKETS, Catalog, load_page_catalog
+from .history import prepare_history
+from .io import compact_schema
+from .kernels import fused_totals
+from .leagues import filter_approved
+from .markets import MARKETS
+from .segments import segment_owner
+
+
+def all_markets_catalog(pages=None):
+    """Catálogo único com as estratégias de todas as páginas de backtest (ou das indicadas)."""
+    return Catalog.concat([load_page_catalog(page) for page in (pages or PAGE_MARKETS)])
+
+
+def leaderboard(history, catalog, bits=None):
+    """Ranking entre mercados: backtest, ROI, médias móveis (8 e 40) e aprovação de cada estratégia.
+
+    O índice do resultado é a posição da estratégia no catálogo.
+    """
+    if bits is None:
+        bits = match_bits(history, catalog)
+    board = backtest_catalog(history, catalog, bits)
+    bets = board["Total de Jogos"].to_numpy()
+    board["ROI"] = np.where(bets > 0, board["Lucro Total"].to_numpy() / np.maximum(bets, 1), 0.0)
+    recent = moving_averages(history, catalog, bits)
+    for col in recent.columns[2:]:
+        board[col] = recent[col]
+    board["Acima dos Limiares"] = above_thresholds(recent)
+    return board.sort_values("Lucro Total", ascending=False, kind='stable')
+
+
+def run_all_markets(df, catalog=None):
+    """Filtra as ligas, prepara o histórico uma vez e devolve (histórico, catálogo, ranking)."""
+    catalog = catalog if catalog is not None else all_markets_catalog()
+    history = prepare_history(filter_approved(df).reset_index(drop=True))
+    return history, catalog, leaderboard(history, catalog)
+
+
+def totals_board(df, catalog=None):
+    """Jogos, acertos, lucro e ROI de cada estratégia pelo kernel fundido (fused_totals), sem médias móveis.
+
+    Com Numba não há VARs nem bitsets materializados. Devolve (jogos nas ligas
+    aprovadas, ranking); o índice do ranking é a posição da estratégia no
+    catálogo, ordenado por lucro como em leaderboard.
+    """
+    catalog = catalog if catalog is not None else all_markets_catalog()
+    df = filter_approved(df).reset_index(drop=True)
+    bets, hits, profit = fused_totals(df, catalog)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        board = pd.DataFrame({
+            "Estratégia": catalog.names,
+            "Mercado": [MARKETS[m]['label'] for m in catalog.markets],
+            "Total de Jogos": bets,
+            "Acertos": hits,
+            "Taxa de Acerto": np.where(bets > 0, hits / np.maximum(bets, 1), 0.0),
+            "Lucro Total": profit,
+            "ROI": np.where(bets > 0, profit / np.maximum(bets, 1), 0.0),
+        })
+    return len(df), board.sort_values("Lucro Total", ascending=False, kind='stable')
+
+
+def verify_compact_schema(df, catalog=None):
+    """Confere que o esquema compacto não muda o backtest: ranking completo com e sem compact_schema.
+
+    Devolve as colunas do ranking que diferem (lista vazia quando tudo é igual).
+    """
+    catalog = catalog if catalog is not None else all_markets_catalog()
+    _, _, full = run_all_markets(df, catalog)
+    _, _, compact = run_all_markets(compact_schema(df), catalog)
+    return [col for col in full.columns if not full[col].equals(compact[col])]
+
+
+def daily_games(df_daily, catalog, indices):
+    """Jogos do dia selecionados pelas estratégias indicadas, como o analyze_daily_games das páginas.
+
+    Assim como nas páginas, os jogos do dia não passam pelo filtro de odd mínima.
+    """
+    df_daily = df_daily.reset_index(drop=True)
+    subset = catalog.subset(indices)
+    daily = prepare_history(df_daily)
+    offsets, rows = match_lists(match_bits(daily, subset, eligible=False), daily.n_rows)
+    owner = segment_owner(offsets)
+    cols = [col for col in ('Time', 'League', 'Home', 'Away') if col in df_daily.columns]
+    games = df_daily.iloc[rows][cols].reset_index(drop=True)
+    games.insert(0, "Mercado", [MARKETS[subset.markets[i]]['label'] for i in owner])
+    games.insert(0, "Estratégia", [subset.names[i] for i in owner])
+    return games
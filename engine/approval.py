@@ -0,0 +1,80 @@
+"""Aprovação com limiares, janelas e odd mínima ajustáveis sem refazer o backtest.
+
+As apostas de cada estratégia são guardadas uma única vez sem o filtro de odd
+mínima, com a odd de cada aposta. Mudar a odd mínima é só uma máscara sobre
+esse vetor (e novos offsets CSR); janelas e limiares saem das somas
+prefixadas (prefix.py). Nem as VARs nem os bitsets são recalculados: toda a
+reavaliação custa O(apostas) em NumPy.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .backtest import above_thresholds, bet_sequences, match_bits
+from .markets import MARKETS
+from .prefix import BetPrefix
+
+
+@dataclass
+class ApprovalData:
+    """Apostas de todas as estratégias sem o filtro de odd mínima, prontas para reavaliação."""
+    names: list
+    markets: list
+    offsets: np.ndarray
+    rows: np.ndarray
+    odd: np.ndarray
+    win: np.ndarray
+    profit: np.ndarray
+    n_rows: int
+    dates: np.ndarray = None
+
+    def prefix(self, min_odd=None):
+        """Somas prefixadas das apostas que passam pela odd mínima.
+
+        ``min_odd=None`` usa a odd mínima de cada mercado (a do run_backtest);
+        um número substitui a dos mercados de back. Apostas sem odd nunca entram.
+        """
+        sizes = np.diff(self.offsets)
+        limit = np.array([MARKETS[m]['min_odd'] if min_odd is None or MARKETS[m]['side'] != 'back' else min_odd
+                          for m in self.markets], dtype=np.float64)
+        limit = np.repeat(np.nan_to_num(limit, nan=-np.inf), sizes)
+        with np.errstate(invalid='ignore'):
+            keep = self.odd >= limit
+        owner = np.repeat(np.arange(len(sizes)), sizes)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(owner[keep], minlength=len(sizes)))])
+        return BetPrefix(offsets=offsets, rows=self.rows[keep], win=self.win[keep], profit=self.profit[keep],
+                         n_rows=self.n_rows, dates=self.dates)
+
+
+def approval_data(history, catalog, bits=None):
+    """Guarda as apostas do catálogo sem o filtro de odd mínima (bits de ``match_bits(eligible=False)``)."""
+    if bits is None:
+        bits = match_bits(history, catalog, eligible=False)
+    offsets, rows, odd, win, profit = bet_sequences(history, catalog, bits)
+    return ApprovalData(names=list(catalog.names), markets=list(catalog.markets), offsets=offsets, rows=rows,
+                        odd=odd, win=win, profit=profit, n_rows=history.n_rows, dates=history.dates)
+
+
+def evaluate_approval(data, windows=(8, 40), min_profit=(0.1, 0.1), min_rate=(0.5, 0.5), strict=None,
+                      min_odd=None):
+    """Backtest, médias móveis e aprovação de todas as estratégias com os parâmetros dados.
+
+    Mesmas colunas de backtest_catalog + moving_averages, com ROI e "Acima dos
+    Limiares" (critério de above_thresholds).
+    """
+    prefix = data.prefix(min_odd)
+    bets, hits, profit = prefix.sums(prefix.offsets[:-1], prefix.offsets[1:])
+    table = pd.DataFrame({
+        "Estratégia": data.names,
+        "Mercado": [MARKETS[m]['label'] for m in data.markets],
+        "Total de Jogos": bets,
+        "Acertos": hits,
+        "Taxa de Acerto": np.where(bets > 0, hits / np.maximum(bets, 1), 0.0),
+        "Lucro Total": profit,
+        "ROI": np.where(bets > 0, profit / np.maximum(bets, 1), 0.0),
+    })
+    for col, values in prefix.window_metrics(windows).items():
+        table[col] = values
+    table["Acima dos Limiares"] = above_thresholds(table, windows, min_profit, min_rate, strict)
+    return table
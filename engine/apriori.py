@@ -0,0 +1,162 @@
+"""Mineração de regras com várias cláusulas (E de faixas de VARs), nível a nível.
+
+Cada faixa candidata ``VARxx in [lo, hi]`` (intervalos contíguos de bins por
+quantis) é avaliada uma única vez como bitset. As regras crescem uma cláusula
+por nível, sempre com uma VAR de índice maior que a da última cláusula (cada
+conjunto é gerado uma única vez), por E bit a bit entre o bitset da regra e os
+das faixas. Como no Apriori, uma regra só é expandida se:
+
+* tem pelo menos ``min_support`` jogos (suporte só diminui ao expandir);
+* a soma dos lucros positivos dos seus jogos alcança ``min_profit`` — nenhuma
+  regra mais restrita pode passar disso.
+
+Entre as sobreviventes, as ``beam`` de maior lucro seguem para o próximo nível.
+A expansão de cada nível é dividida entre processos.
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import strategy_totals
+from .bitsets import pack_rows, popcount, weighted_sums
+from .catalog import Catalog
+from .features import VAR_NAMES
+from .markets import MARKETS
+from .miner2d import _range_bounds, quantile_bins
+from .parallel import default_jobs, map_blocks, open_shared, shared_array, split_blocks
+
+
+def range_predicates(history, market, n_bins=8, max_span=None, rows=None):
+    """Faixas candidatas de todas as VARs e seus bitsets sobre as linhas elegíveis.
+
+    Devolve (var, lo, hi, bits): uma faixa por intervalo contíguo de até
+    ``max_span`` bins (por padrão, todos menos a VAR inteira).
+    """
+    s = history.settle(market)
+    rows = np.arange(history.n_rows) if rows is None else np.asarray(rows)
+    rows = rows[s.eligible[rows]]
+    _, bin_min, bin_max = quantile_bins(history.features, rows, n_bins=n_bins)
+    max_span = n_bins - 1 if max_span is None else max_span
+    var, lo, hi = [], [], []
+    for v in range(history.features.shape[1]):
+        if not np.isfinite(bin_min[v]).any():
+            continue
+        for a in range(n_bins):
+            for b in range(a, min(n_bins, a + max_span)):
+                if not np.isfinite(bin_min[v, a:b + 1]).any():
+                    continue
+                low, high = _range_bounds(bin_min[v], bin_max[v], a, b)
+                var.append(v)
+                lo.append(low)
+                hi.append(high)
+    var, lo, hi = np.array(var, dtype=np.int64), np.array(lo), np.array(hi)
+    in_rows = np.zeros(history.n_rows, dtype=bool)
+    in_rows[rows] = True
+    bits = np.empty((len(var), (history.n_rows + 63) // 64), dtype=np.uint64)
+    for start in range(0, len(var), 256):
+        col = history.features[:, var[start:start + 256]].T
+        with np.errstate(invalid='ignore'):
+            mask = (col >= lo[start:start + 256, None]) & (col <= hi[start:start + 256, None]) & in_rows
+        bits[start:start + 256] = pack_rows(mask)
+    return var, lo, hi, bits
+
+
+def _score(bits, n_rows, gain, profit):
+    """Soma dos lucros positivos e lucro de cada bitset."""
+    sums = weighted_sums(bits, n_rows, np.column_stack([gain, profit]))
+    return sums[:, 0], sums[:, 1]
+
+
+def _expand(task):
+    """Expande um lote de regras com todas as faixas de VARs posteriores à última cláusula.
+
+    Devolve todas as regras sobreviventes (sem bitset) e as ``beam`` melhores do
+    lote com bitset, candidatas à fronteira do próximo nível.
+    """
+    rules, rule_bits, pred_var, pred_bits, n_rows, gain, profit, min_support, min_profit, beam = task
+    pred_bits = open_shared(pred_bits)
+    found = []
+    best = []
+    for items, bits in zip(rules, rule_bits):
+        allowed = np.flatnonzero(pred_var > pred_var[items[-1]])
+        if not len(allowed):
+            continue
+        cand = pred_bits[allowed] & bits
+        support = popcount(cand)
+        ok = support >= min_support
+        if not ok.any():
+            continue
+        cand, allowed, support = cand[ok], allowed[ok], support[ok]
+        positive, total = _score(cand, n_rows, gain, profit)
+        ok = positive >= min_profit
+        allowed, support, total, cand = allowed[ok], support[ok], total[ok], cand[ok]
+        for p, sup, tot in zip(allowed, support, total):
+            found.append((items + (int(p),), int(sup), float(tot)))
+        top = np.argsort(-total, kind='stable')[:beam]
+        best.extend((items + (int(allowed[t]),), float(total[t]), cand[t]) for t in top)
+        best = sorted(best, key=lambda r: -r[1])[:beam]
+    return found, best
+
+
+def mine_rules(history, market, max_clauses=3, n_bins=8, max_span=None, min_support=30, min_profit=1.0,
+               beam=200, max_rules=1000, rows=None, n_jobs=None):
+    """As ``max_rules`` regras E de 1 a ``max_clauses`` faixas com maior lucro, com backtest exato.
+
+    ``rows`` restringe as linhas usadas (ex.: só o treino); o resultado traz as
+    faixas em formato de catálogo na coluna interna ``_grupos``.
+    """
+    s = history.settle(market)
+    pred_var, pred_lo, pred_hi, pred_bits = range_predicates(history, market, n_bins, max_span, rows)
+    n_rows = history.n_rows
+    gain = np.where(s.eligible, np.maximum(s.profit, 0.0), 0.0)
+    profit = np.where(s.eligible, s.profit, 0.0)
+    n_jobs = default_jobs() if n_jobs is None else n_jobs
+
+    support = popcount(pred_bits)
+    ok = support >= min_support
+    positive, total = _score(pred_bits[ok], n_rows, gain, profit)
+    idx = np.flatnonzero(ok)[positive >= min_profit]
+    found = [((int(p),), int(support[p]), float(t)) for p, t in zip(idx, total[positive >= min_profit])]
+    frontier = sorted([((int(p),), float(t), pred_bits[p]) for p, t in zip(idx, total[positive >= min_profit])],
+                      key=lambda r: -r[1])[:beam]
+
+    # Os bitsets das faixas vão uma vez para o disco (mapeados pelos processos), não uma cópia por tarefa
+    with shared_array(pred_bits, n_jobs if max_clauses > 1 and frontier else 1) as shared:
+        for _ in range(max_clauses - 1):
+            if not frontier:
+                break
+            tasks = [([r[0] for r in frontier[a:b]], [r[2] for r in frontier[a:b]], pred_var, shared, n_rows, gain,
+                      profit, min_support, min_profit, beam)
+                     for a, b in split_blocks(len(frontier), 4 * n_jobs)]
+            parts = map_blocks(_expand, tasks, n_jobs)
+            found.extend(r for part, _ in parts for r in part)
+            frontier = sorted([r for _, best in parts for r in best], key=lambda r: -r[1])[:beam]
+
+    found = sorted([r for r in found if r[2] >= min_profit], key=lambda r: -r[2])[:max_rules]
+    rules = [(f"Regra {k + 1}", market, [[(VAR_NAMES[pred_var[p]], pred_lo[p], pred_hi[p])] for p in items])
+             for k, (items, _, _) in enumerate(found)]
+    if not rules:
+        return pd.DataFrame(columns=["Mercado", "Regra", "Cláusulas", "Total de Jogos", "Acertos",
+                                     "Taxa de Acerto", "Lucro Total", "ROI", "_grupos"])
+    catalog = Catalog.from_rules(rules)
+    bits = np.stack([np.bitwise_and.reduce(pred_bits[list(items)], axis=0) for items, _, _ in found])
+    bets, hits, gain_total = strategy_totals(history, catalog, bits)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = pd.DataFrame({
+            "Mercado": MARKETS[market]['label'],
+            "Regra": [" & ".join(f"{var} in [{lo:.4f}, {hi:.4f}]" for (var, lo, hi), in groups)
+                      for _, _, groups in rules],
+            "Cláusulas": [len(r[0]) for r in found],
+            "Total de Jogos": bets,
+            "Acertos": hits,
+            "Taxa de Acerto": np.where(bets > 0, hits / bets, 0.0),
+            "Lucro Total": gain_total,
+            "ROI": np.where(bets > 0, gain_total / bets, 0.0),
+            "_grupos": [groups for _, _, groups in rules],
+        })
+    return result.sort_values("Lucro Total", ascending=False, kind='stable').reset_index(drop=True)
+
+
+def rules_catalog(rules, market, start=1):
+    """Catálogo do motor com as regras mineradas (nomes "Estratégia N" a partir de start)."""
+    return Catalog.from_rules([(f"Estratégia {start + k}", market, groups)
+                               for k, groups in enumerate(rules["_grupos"])])
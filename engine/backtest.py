@@ -0,0 +1,167 @@
+"""Avaliação vetorizada de catálogos inteiros sobre o histórico.
+
+Em vez de filtrar um DataFrame por estratégia, cada faixa ``VARxx in [lo, hi]``
+distinta é avaliada uma única vez e guardada como bitset; grupos (OU) e
+estratégias (E) são reduções bit a bit sobre esses bitsets.
+"""
+import numpy as np
+import pandas as pd
+
+from .bitsets import match_lists, pack_rows, popcount, weighted_sums
+from .markets import MARKETS
+from .prefix import BetPrefix
+
+
+def predicate_bits(features, var, lo, hi):
+    """Bitsets das faixas (var, lo, hi); faixas da mesma VAR são avaliadas juntas."""
+    bits = np.empty((len(var), (features.shape[0] + 63) // 64), dtype=np.uint64)
+    for v in np.unique(var):
+        idx = np.flatnonzero(var == v)
+        col = features[:, v]
+        for start in range(0, len(idx), 64):
+            chunk = idx[start:start + 64]
+            with np.errstate(invalid='ignore'):
+                mask = (col >= lo[chunk, None]) & (col <= hi[chunk, None])
+            bits[chunk] = pack_rows(mask)
+    return bits
+
+
+def _segment_reduce(ufunc, bits, owner, n_owners, empty_value):
+    """Reduz linhas consecutivas de bits com o mesmo dono; donos sem linhas recebem empty_value."""
+    out = np.full((n_owners, bits.shape[1]), empty_value, dtype=np.uint64)
+    if len(owner):
+        starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+        out[owner[starts]] = ufunc.reduceat(bits, starts, axis=0)
+    return out
+
+
+def eligible_rows(history, market, min_odd=None):
+    """Linhas elegíveis do mercado: odd mínima do run_backtest ou, com ``min_odd``, essa odd nos mercados de back.
+
+    Mesma regra de ApprovalData.prefix: os mercados de lay mantêm o seu filtro
+    e apostas sem odd nunca entram.
+    """
+    s = history.settle(market)
+    if min_odd is None or MARKETS[market]['side'] != 'back':
+        return s.eligible
+    with np.errstate(invalid='ignore'):
+        return s.odd >= min_odd
+
+
+def eligibility_bits(history, markets, min_odd=None):
+    """Bitset de linhas elegíveis (eligible_rows) para cada mercado."""
+    return {m: pack_rows(eligible_rows(history, m, min_odd))[0] for m in set(markets)}
+
+
+def match_bits(history, catalog, eligible=True, min_odd=None):
+    """Bitsets (estratégias x palavras) dos jogos selecionados por cada estratégia.
+
+    Com ``eligible=True`` aplica também o filtro de odd mínima do mercado,
+    reproduzindo o ``run_backtest`` das páginas; ``min_odd`` substitui a odd
+    mínima dos mercados de back (ex.: a da barra lateral).
+    """
+    keys = np.stack([catalog.clause_var, catalog.clause_lo, catalog.clause_hi], axis=1)
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    preds = predicate_bits(history.features, unique[:, 0].astype(np.int64), unique[:, 1], unique[:, 2])
+    groups = _segment_reduce(np.bitwise_or, preds[inverse.ravel()], catalog.clause_group,
+                             len(catalog.group_strategy), 0)
+    # Estratégias sem grupos selecionam todas as linhas (E de nada é verdadeiro)
+    all_ones = np.iinfo(np.uint64).max
+    bits = _segment_reduce(np.bitwise_and, groups, catalog.group_strategy, len(catalog), all_ones)
+    if eligible:
+        for market, elig in eligibility_bits(history, catalog.markets, min_odd).items():
+            rows = np.array([m == market for m in catalog.markets])
+            bits[rows] &= elig
+    else:
+        tail = history.n_rows % 64
+        if tail:
+            bits[:, -1] &= np.uint64((1 << tail) - 1)
+    return bits
+
+
+def strategy_totals(history, catalog, bits):
+    """Jogos, acertos e lucro de cada estratégia a partir dos seus bitsets."""
+    bets = popcount(bits)
+    hits = np.zeros(len(catalog), dtype=np.int64)
+    profit = np.zeros(len(catalog))
+    markets = np.array(catalog.markets)
+    for market in np.unique(markets):
+        rows = np.flatnonzero(markets == market)
+        s = history.settle(market)
+        hits[rows] = popcount(bits[rows] & pack_rows(s.win)[0])
+        # Lucro NaN (odd ausente) vira 0: na soma densa 0 x NaN contaminaria todas as estratégias do mercado
+        profit[rows] = weighted_sums(bits[rows], history.n_rows, np.where(np.isnan(s.profit), 0.0, s.profit))[:, 0]
+    return bets, hits, profit
+
+
+def backtest_catalog(history, catalog, bits=None):
+    """Equivalente vetorizado de run_backtest para todas as estratégias de uma vez."""
+    if bits is None:
+        bits = match_bits(history, catalog)
+    bets, hits, profit = strategy_totals(history, catalog, bits)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hit_rate = np.where(bets > 0, hits / bets, 0.0)
+    return pd.DataFrame({
+        "Estratégia": catalog.names,
+        "Mercado": [MARKETS[m]['label'] for m in catalog.markets],
+        "Total de Jogos": bets,
+        "Acertos": hits,
+        "Taxa de Acerto": hit_rate,
+        "Lucro Total": profit,
+    })
+
+
+def bet_sequences(history, catalog, bits):
+    """Apostas de cada estratégia em CSR: offsets, linhas, odd, acerto e lucro por unidade."""
+    offsets, rows = match_lists(bits, history.n_rows)
+    owner_market = np.repeat(np.array(catalog.markets), np.diff(offsets))
+    odd = np.empty(len(rows))
+    win = np.empty(len(rows), dtype=bool)
+    profit = np.empty(len(rows))
+    for market in set(catalog.markets):
+        sel = owner_market == market
+        s = history.settle(market)
+        odd[sel], win[sel], profit[sel] = s.odd[rows[sel]], s.win[rows[sel]], s.profit[rows[sel]]
+    return offsets, rows, odd, win, profit
+
+
+def bet_prefix(history, catalog, bits=None):
+    """Apostas de cada estratégia com somas prefixadas, para métricas de qualquer janela (ver prefix.py)."""
+    if bits is None:
+        bits = match_bits(history, catalog)
+    offsets, rows, _, win, profit = bet_sequences(history, catalog, bits)
+    return BetPrefix(offsets=offsets, rows=rows, win=win, profit=profit, n_rows=history.n_rows, dates=history.dates)
+
+
+def moving_averages(history, catalog, bits=None, windows=(8, 40), prefix=None):
+    """Equivalente vetorizado de check_moving_averages: jogos, acertos, média e lucro dos últimos N.
+
+    Os últimos N jogos de cada estratégia saem do bet_prefix (acertos por
+    contagens acumuladas, lucro somado como o ``tail(N).sum()`` das páginas).
+    ``prefix`` reutiliza um bet_prefix já calculado.
+    """
+    if prefix is None:
+        prefix = bet_prefix(history, catalog, bits)
+    out = {"Estratégia": catalog.names, "Mercado": [MARKETS[m]['label'] for m in catalog.markets]}
+    out.update(prefix.window_metrics(windows))
+    return pd.DataFrame(out)
+
+
+def above_thresholds(recent, windows=(8, 40), min_profit=(0.1, 0.1), min_rate=(0.5, 0.5), strict=None):
+    """Critério de aprovação sobre a saída de moving_averages (padrão: o das páginas de back, janelas 8 e 40).
+
+    Para cada janela, lucro e média dos últimos N precisam alcançar os
+    limiares: com ``>=`` ou, onde ``strict`` é verdadeiro, com ``>`` (por
+    padrão, como em check_moving_averages, ``>=`` na primeira janela e ``>``
+    nas demais). Um limiar None não é verificado (ex.: o Lay de placar exato
+    só olha a média).
+    """
+    none = (None,) * len(windows)
+    strict = (False,) + (True,) * (len(windows) - 1) if strict is None else strict
+    approved = np.ones(len(recent), dtype=bool)
+    for n, profit, rate, gt in zip(windows, min_profit or none, min_rate or none, strict):
+        for col, limit in ((f"Lucro Últimos {n}", profit), (f"Média {n}", rate)):
+            if limit is not None:
+                values = np.asarray(recent[col])
+                approved &= values > limit if gt else values >= limit
+    return pd.Series(approved, index=recent.index)
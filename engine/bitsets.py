@@ -0,0 +1,63 @@
+"""Conjuntos de linhas compactados em bits (uint64) com contagem por popcount."""
+import numpy as np
+
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def n_words(n_rows):
+    """Quantidade de palavras de 64 bits necessárias para n_rows linhas."""
+    return (n_rows + 63) // 64
+
+
+def pack_rows(mask):
+    """Compacta uma matriz booleana (k x n) em (k x palavras) uint64; bit i = linha i."""
+    mask = np.atleast_2d(np.asarray(mask, dtype=bool))
+    packed = np.packbits(mask, axis=1, bitorder='little')
+    pad = n_words(mask.shape[1]) * 8 - packed.shape[1]
+    if pad:
+        packed = np.pad(packed, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def unpack_rows(bits, n_rows):
+    """Operação inversa de pack_rows: devolve a matriz booleana (k x n_rows)."""
+    bits = np.ascontiguousarray(np.atleast_2d(bits))
+    return np.unpackbits(bits.view(np.uint8), axis=1, count=n_rows, bitorder='little').astype(bool)
+
+
+def popcount(bits):
+    """Número de bits ligados em cada bitset (soma sobre o último eixo)."""
+    bits = np.ascontiguousarray(np.atleast_2d(bits))
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT_TABLE[bits.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def row_indices(bits, n_rows):
+    """Índices das linhas ligadas em um único bitset."""
+    return np.flatnonzero(unpack_rows(bits, n_rows)[0])
+
+
+def weighted_sums(bits, n_rows, weights, block=128):
+    """Soma, para cada bitset, dos pesos (n_rows x m) das linhas ligadas -> (k x m)."""
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim == 1:
+        weights = weights[:, None]
+    bits = np.atleast_2d(bits)
+    out = np.empty((bits.shape[0], weights.shape[1]))
+    for start in range(0, bits.shape[0], block):
+        dense = unpack_rows(bits[start:start + block], n_rows)
+        out[start:start + block] = dense.astype(np.float64) @ weights
+    return out
+
+
+def match_lists(bits, n_rows, block=256):
+    """Linhas ligadas de cada bitset em formato CSR: (offsets, linhas em ordem crescente)."""
+    bits = np.atleast_2d(bits)
+    counts = popcount(bits)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    rows = np.empty(offsets[-1], dtype=np.int64)
+    for start in range(0, bits.shape[0], block):
+        dense = unpack_rows(bits[start:start + block], n_rows)
+        rows[offsets[start]:offsets[min(start + block, bits.shape[0])]] = np.nonzero(dense)[1]
+    return offsets, rows
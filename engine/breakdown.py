@@ -0,0 +1,97 @@
+"""Desempenho de todas as estratégias por liga e por temporada.
+
+Cada aposta (CSR de bet_prefix) traz a linha do histórico; a liga ou a
+temporada da linha é um código inteiro. Jogos, acertos e lucro de cada par
+(estratégia, grupo) saem de três ``np.bincount`` sobre a chave
+``estratégia * grupos + grupo``, para todas as estratégias de uma vez.
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import bet_prefix
+from .markets import MARKETS
+
+BREAKDOWNS = {'liga': "Liga", 'temporada': "Temporada"}
+
+
+def season_codes(history, start_month=7):
+    """Temporada de cada linha: (códigos, rótulos); -1 sem data.
+
+    Com ``start_month=1`` a temporada é o ano civil ("2021"); com 7, a
+    temporada começa em julho ("2021/22").
+    """
+    if history.dates is None:
+        raise ValueError("O histórico não tem a coluna 'Date'.")
+    d = history.dates
+    valid = ~np.isnat(d)
+    if not valid.any():
+        return np.full(len(d), -1), []
+    year = d.astype('datetime64[Y]').astype(np.int64) + 1970
+    month = d.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    season = np.where(month >= start_month, year, year - 1)
+    first, last = season[valid].min(), season[valid].max()
+    labels = [str(y) if start_month == 1 else f"{y}/{(y + 1) % 100:02d}" for y in range(first, last + 1)]
+    return np.where(valid, season - first, -1), labels
+
+
+def group_codes(history, by='liga', start_month=7):
+    """Códigos e rótulos do agrupamento pedido (ver BREAKDOWNS)."""
+    if by == 'liga':
+        if history.leagues is None:
+            raise ValueError("O histórico não tem a coluna 'League'.")
+        return np.asarray(history.leagues), history.league_names
+    if by == 'temporada':
+        return season_codes(history, start_month)
+    raise ValueError(f"Agrupamento desconhecido: {by}")
+
+
+def breakdown(history, catalog, by='liga', bits=None, prefix=None, start_month=7):
+    """Jogos, acertos, taxa, lucro e ROI por (estratégia, liga) ou (estratégia, temporada), em formato longo.
+
+    ``prefix`` reutiliza apostas já preparadas (ex.: ApprovalData.prefix com
+    outra odd mínima). Só aparecem os pares com pelo menos uma aposta.
+    """
+    if prefix is None:
+        prefix = bet_prefix(history, catalog, bits)
+    codes, labels = group_codes(history, by, start_month)
+    n_groups = len(labels)
+    group = codes[prefix.rows]
+    valid = group >= 0
+    key = prefix.owner[valid] * n_groups + group[valid]
+    size = len(catalog) * n_groups
+    bets = np.bincount(key, minlength=size)
+    hits = np.bincount(key, weights=prefix.win[valid], minlength=size).astype(np.int64)
+    gain = np.bincount(key, weights=prefix.profit[valid], minlength=size)
+
+    cell = np.flatnonzero(bets)
+    strategy, g = np.divmod(cell, n_groups)
+    bets, hits, gain = bets[cell], hits[cell], gain[cell]
+    return pd.DataFrame({
+        "Estratégia": np.asarray(catalog.names, dtype=object)[strategy],
+        "Mercado": np.asarray([MARKETS[m]['label'] for m in catalog.markets], dtype=object)[strategy],
+        BREAKDOWNS[by]: np.asarray(labels, dtype=object)[g],
+        "Total de Jogos": bets,
+        "Acertos": hits,
+        "Taxa de Acerto": hits / bets,
+        "Lucro Total": gain,
+        "ROI": gain / bets,
+    }, index=pd.Index(strategy, name="Posição"))
+
+
+def breakdown_matrix(table, value="Lucro Total"):
+    """Matriz estratégias x grupos de uma métrica do breakdown (NaN onde a estratégia não apostou).
+
+    As linhas seguem a ordem da tabela; as colunas, a ordem dos rótulos (alfabética / cronológica).
+    """
+    group = next(col for col in BREAKDOWNS.values() if col in table.columns)
+    matrix = table.pivot_table(index=["Mercado", "Estratégia"], columns=group, values=value, sort=False)
+    return matrix.sort_index(axis=1)
+
+
+def market_breakdown(table):
+    """Soma do breakdown por (mercado, grupo): onde cada mercado ganha ou perde, para ajustar as ligas aprovadas."""
+    group = next(col for col in BREAKDOWNS.values() if col in table.columns)
+    out = table.groupby(["Mercado", group], sort=False)[["Total de Jogos", "Acertos", "Lucro Total"]].sum()
+    out["Taxa de Acerto"] = out["Acertos"] / out["Total de Jogos"]
+    out["ROI"] = out["Lucro Total"] / out["Total de Jogos"]
+    return out.reset_index()
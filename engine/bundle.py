@@ -0,0 +1,82 @@
+"""Pacotes binários de estratégias: o catálogo em arrays contíguos num .npz.
+
+Ler as funções ``estrategia_N`` de uma página leva mais de um segundo (ast
+de milhares de linhas); o pacote guarda direto os arrays do catálogo
+(``clause_var``, ``clause_lo``, ``clause_hi``, ``clause_group``,
+``group_strategy``), os nomes, os mercados e a chave de conteúdo de cada
+estratégia, e é lido em poucos milissegundos com ``np.load`` sem pickle.
+
+cached_catalog guarda o pacote de cada arquivo de estratégias no armazém
+(store.default_store_dir), identificado pelo hash do conteúdo do arquivo:
+depois da primeira leitura, páginas e linha de comando só abrem o .npz, e
+um arquivo editado gera um pacote novo.
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from .catalog import Catalog, strategy_key
+from .store import default_store_dir
+
+BUNDLE_FORMAT = 1  # muda quando o conteúdo do pacote muda: pacotes antigos são refeitos
+_ARRAYS = ('group_strategy', 'clause_group', 'clause_var', 'clause_lo', 'clause_hi')
+
+
+def catalog_keys(catalog):
+    """Chave de conteúdo (strategy_key) de cada estratégia do catálogo."""
+    return [strategy_key(market, groups) for _, market, groups in catalog.rules()]
+
+
+def save_bundle(catalog, path, keys=None):
+    """Grava o catálogo (e as chaves de conteúdo) em ``path``; a gravação é atômica (temporário + rename)."""
+    keys = catalog_keys(catalog) if keys is None else keys
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=parent, prefix='.tmp-', suffix='.npz')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, format=np.array(BUNDLE_FORMAT), names=np.array(catalog.names, dtype=str),
+                     markets=np.array(catalog.markets, dtype=str), keys=np.array(keys, dtype=str),
+                     **{name: getattr(catalog, name) for name in _ARRAYS})
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load_bundle(path):
+    """Lê um pacote gravado por save_bundle: devolve (catálogo, chaves)."""
+    with np.load(path, allow_pickle=False) as z:
+        if int(z['format']) != BUNDLE_FORMAT:
+            raise ValueError(f"Pacote de estratégias em formato antigo: {path}")
+        catalog = Catalog(names=z['names'].tolist(), markets=z['markets'].tolist(),
+                          **{name: z[name] for name in _ARRAYS})
+        return catalog, z['keys'].tolist()
+
+
+def cached_catalog(path, read, directory=None):
+    """(catálogo, chaves) do arquivo ``path``, pelo pacote do seu conteúdo; sem pacote, ``read(texto)`` e grava.
+
+    ``read`` transforma o texto do arquivo num Catalog (ex.: parse_strategies
+    com o mercado da página). Se o armazém não aceita gravação, o catálogo
+    lido é devolvido sem pacote.
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    digest = hashlib.sha1(f'{BUNDLE_FORMAT}:{os.path.basename(path)}:'.encode() + content).hexdigest()[:20]
+    bundle = os.path.join(directory or default_store_dir(), 'bundles', f'{digest}.npz')
+    if os.path.exists(bundle):
+        try:
+            return load_bundle(bundle)
+        except (OSError, ValueError, KeyError):
+            pass  # pacote corrompido ou antigo: refeito abaixo
+    catalog = read(content.decode('utf-8'))
+    keys = catalog_keys(catalog)
+    try:
+        save_bundle(catalog, bundle, keys)
+    except OSError:
+        pass  # armazém somente leitura: segue sem pacote
+    return catalog, keys
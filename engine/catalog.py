@@ -0,0 +1,262 @@
+"""Catálogo de estratégias em arrays e leitura das estratégias escritas nas páginas.
+
+Cada estratégia é uma conjunção (E) de grupos e cada grupo é uma disjunção (OU)
+de cláusulas ``VARxx in [lo, hi]``, que é exatamente a forma das funções
+``estrategia_N`` das páginas.
+"""
+import ast
+import hashlib
+import itertools
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from .features import VAR_INDEX, VAR_NAMES
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pages')
+
+# Página de backtest -> mercado das suas estratégias
+PAGE_MARKETS = {
+    '2_Back_Home.py': 'back_home',
+    '3_Back_Away.py': 'back_away',
+    '4_Over_2.5.py': 'over25',
+    '5_Under_2.5.py': 'under25',
+    '6_BTTS_Não.py': 'btts_no',
+}
+
+
+@dataclass
+class Catalog:
+    """Estratégias em formato colunar; cláusulas ordenadas por grupo e grupos por estratégia."""
+    names: list
+    markets: list
+    group_strategy: np.ndarray
+    clause_group: np.ndarray
+    clause_var: np.ndarray
+    clause_lo: np.ndarray
+    clause_hi: np.ndarray
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_rules(cls, rules):
+        """Monta o catálogo a partir de tuplas (nome, mercado, grupos de (VAR, lo, hi))."""
+        names, markets, group_strategy, clause_group, clauses = [], [], [], [], []
+        for s, (name, market, groups) in enumerate(rules):
+            names.append(name)
+            markets.append(market)
+            for group in groups:
+                for var, lo, hi in group:
+                    clause_group.append(len(group_strategy))
+                    clauses.append((VAR_INDEX[var] if isinstance(var, str) else int(var), lo, hi))
+                group_strategy.append(s)
+        clauses = np.array(clauses, dtype=np.float64).reshape(-1, 3)
+        return cls(
+            names=names,
+            markets=markets,
+            group_strategy=np.array(group_strategy, dtype=np.int32),
+            clause_group=np.array(clause_group, dtype=np.int32),
+            clause_var=clauses[:, 0].astype(np.int16),
+            clause_lo=clauses[:, 1].copy(),
+            clause_hi=clauses[:, 2].copy(),
+        )
+
+    def rules(self):
+        """Itera (nome, mercado, grupos) — operação inversa de from_rules."""
+        groups = [[] for _ in range(len(self.group_strategy))]
+        for g, var, lo, hi in zip(self.clause_group, self.clause_var, self.clause_lo, self.clause_hi):
+            groups[g].append((VAR_NAMES[var], float(lo), float(hi)))
+        by_strategy = [[] for _ in self.names]
+        for g, s in enumerate(self.group_strategy):
+            by_strategy[s].append(groups[g])
+        for name, market, strategy_groups in zip(self.names, self.markets, by_strategy):
+            yield name, market, strategy_groups
+
+    def subset(self, indices):
+        """Novo catálogo apenas com as estratégias indicadas (na ordem dada)."""
+        rules = list(self.rules())
+        return Catalog.from_rules([rules[i] for i in indices])
+
+    @staticmethod
+    def concat(catalogs):
+        """Junta vários catálogos em um só, preservando a ordem (só desloca os índices dos arrays)."""
+        catalogs = list(catalogs)
+        if not catalogs:
+            return Catalog.from_rules([])
+        strategy_base = np.cumsum([0] + [len(c) for c in catalogs[:-1]])
+        group_base = np.cumsum([0] + [len(c.group_strategy) for c in catalogs[:-1]])
+        return Catalog(
+            names=[name for c in catalogs for name in c.names],
+            markets=[market for c in catalogs for market in c.markets],
+            group_strategy=np.concatenate([c.group_strategy + b for c, b in zip(catalogs, strategy_base)]
+                                          ).astype(np.int32),
+            clause_group=np.concatenate([c.clause_group + b for c, b in zip(catalogs, group_base)]).astype(np.int32),
+            clause_var=np.concatenate([c.clause_var for c in catalogs]).astype(np.int16),
+            clause_lo=np.concatenate([c.clause_lo for c in catalogs]).astype(np.float64),
+            clause_hi=np.concatenate([c.clause_hi for c in catalogs]).astype(np.float64),
+        )
+
+
+def strategy_key(market, groups):
+    """Chave de conteúdo da estratégia: muda quando o mercado ou alguma faixa muda, não com o nome."""
+    text = market + ";" + "&".join(
+        "|".join(f"{var}:{float(lo).hex()}:{float(hi).hex()}" for var, lo, hi in group) for group in groups)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+# --- Escrita de catálogos no formato das páginas ---
+
+def _literal(value):
+    """Menor número de casas (mínimo 4, como nas páginas) que reproduz o limite exatamente."""
+    for digits in range(4, 11):
+        text = f"{value:.{digits}f}"
+        if float(text) == value:
+            return text
+    return repr(float(value))
+
+
+def _clause_code(var, lo, hi):
+    parts = []
+    if np.isfinite(lo):
+        parts.append(f"(vars_dict['{var}'] >= {_literal(lo)})")
+    if np.isfinite(hi):
+        parts.append(f"(vars_dict['{var}'] <= {_literal(hi)})")
+    return " & ".join(parts) or f"(vars_dict['{var}'] == vars_dict['{var}'])"
+
+
+def page_code(catalog, start=1):
+    """Código do catálogo no formato das páginas: funções estrategia_N e a lista de retorno.
+
+    Grupos com mais de uma cláusula viram OU entre parênteses, como em
+    1_Jogos_do_Dia.py; ler o código de volta com parse_strategies devolve o
+    mesmo catálogo.
+    """
+    lines, labels = [], []
+    for k, (_, _, groups) in enumerate(catalog.rules()):
+        n = start + k
+        terms = []
+        for group in groups:
+            clauses = [_clause_code(*clause) for clause in group]
+            terms.append(clauses[0] if len(clauses) == 1 else "(" + " | ".join(clauses) + ")")
+        lines.append(f"    def estrategia_{n}(df): return df[{' & '.join(terms)}].copy()")
+        labels.append(f'(estrategia_{n}, "Estratégia {n}")')
+    rows = [", ".join(labels[i:i + 7]) for i in range(0, len(labels), 7)]
+    return "\n".join(lines) + "\n\n    return [\n        " + ",\n        ".join(rows) + "\n    ]\n"
+
+
+# --- Leitura das funções estrategia_N escritas nas páginas ---
+
+def _number(node):
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _number(node.operand)
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    raise ValueError(f"Limite não numérico na linha {node.lineno}")
+
+
+def _atom(node):
+    """vars_dict['VARxx'] >= a  ->  ('VARxx', lo, hi)."""
+    if len(node.ops) != 1 or not isinstance(node.left, ast.Subscript):
+        raise ValueError(f"Comparação não suportada na linha {node.lineno}")
+    key = node.left.slice
+    if not (isinstance(key, ast.Constant) and key.value in VAR_INDEX):
+        raise ValueError(f"Variável desconhecida na linha {node.lineno}")
+    value, op = _number(node.comparators[0]), node.ops[0]
+    if isinstance(op, ast.GtE):
+        return key.value, value, np.inf
+    if isinstance(op, ast.LtE):
+        return key.value, -np.inf, value
+    if isinstance(op, ast.Gt):
+        return key.value, np.nextafter(value, np.inf), np.inf
+    if isinstance(op, ast.Lt):
+        return key.value, -np.inf, np.nextafter(value, -np.inf)
+    raise ValueError(f"Operador não suportado na linha {node.lineno}")
+
+
+def _merge_and(groups):
+    """Intersecta grupos de uma cláusula só que falam da mesma VAR (>= a & <= b vira [a, b])."""
+    merged, singles = [], {}
+    for group in groups:
+        if len(group) == 1:
+            var, lo, hi = group[0]
+            if var in singles:
+                i = singles[var]
+                _, lo0, hi0 = merged[i][0]
+                merged[i] = [(var, max(lo0, lo), min(hi0, hi))]
+                continue
+            singles[var] = len(merged)
+        merged.append(list(group))
+    return merged
+
+
+def expression_to_cnf(node):
+    """Converte a expressão booleana de uma estratégia em grupos E de cláusulas OU."""
+    if isinstance(node, ast.Compare):
+        return [[_atom(node)]]
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitAnd):
+        return _merge_and(expression_to_cnf(node.left) + expression_to_cnf(node.right))
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        left, right = expression_to_cnf(node.left), expression_to_cnf(node.right)
+        return [a + b for a, b in itertools.product(left, right)]
+    raise ValueError(f"Expressão não suportada na linha {getattr(node, 'lineno', '?')}")
+
+
+def _strategy_expression(func):
+    """Extrai EXPR de ``return df[EXPR].copy()``."""
+    body = [stmt for stmt in func.body if not isinstance(stmt, ast.Expr)]
+    if len(body) != 1 or not isinstance(body[0], ast.Return):
+        raise ValueError(f"{func.name}: corpo não suportado")
+    value = body[0].value
+    if isinstance(value, ast.Call) and isinstance(value.func, ast.Attribute) and value.func.attr == 'copy':
+        value = value.func.value
+    if not isinstance(value, ast.Subscript):
+        raise ValueError(f"{func.name}: retorno não suportado")
+    return value.slice
+
+
+def _strategy_labels(tree):
+    """Pares (função, rótulo) da lista [(estrategia_1, "Estratégia 1"), ...] da página."""
+    labels = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.List) and node.elts and all(
+                isinstance(e, ast.Tuple) and len(e.elts) == 2 and isinstance(e.elts[0], ast.Name)
+                and isinstance(e.elts[1], ast.Constant) for e in node.elts):
+            labels = [(e.elts[0].id, e.elts[1].value) for e in node.elts]
+    return labels
+
+
+def parse_strategies(source, market):
+    """Lê as funções estrategia_N de um código-fonte e devolve o catálogo equivalente.
+
+    ``market`` é o mercado de todas as estratégias ou um dicionário
+    rótulo -> mercado (páginas com estratégias de mercados diferentes);
+    rótulos fora do dicionário são ignorados.
+    """
+    tree = ast.parse(source)
+    functions = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name.startswith('estrategia_'):
+            functions[node.name] = node
+    labels = _strategy_labels(tree) or [
+        (name, f"Estratégia {name.split('_', 1)[1]}") for name in functions
+    ]
+    markets = market if isinstance(market, dict) else {label: market for _, label in labels}
+    rules = [(label, markets[label], expression_to_cnf(_strategy_expression(functions[name])))
+             for name, label in labels if name in functions and label in markets]
+    return Catalog.from_rules(rules)
+
+
+def load_page_catalog(page, market=None):
+    """Catálogo de uma página de backtest (ex.: '2_Back_Home.py') sem executar o Streamlit.
+
+    A página só é lida com ``ast`` quando muda; nas outras vezes o catálogo vem
+    do pacote binário guardado para o seu conteúdo (bundle.py).
+    """
+    from .bundle import cached_catalog
+    path = page if os.path.isabs(page) else os.path.join(PAGES_DIR, page)
+    market = market or PAGE_MARKETS[os.path.basename(path)]
+    catalog, _ = cached_catalog(path, lambda source: parse_strategies(source, market))
+    return catalog
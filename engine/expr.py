@@ -0,0 +1,268 @@
+"""Linguagem de expressões das estratégias.
+
+Uma estratégia é escrita como texto em vez de código Python, por exemplo::
+
+    (VAR41 in [0.2335, 0.331] or VAR75 in [0.4838, 0.7777]) and VAR39 in [0.84, 4.0]
+
+Átomos: ``VARxx in [lo, hi]`` (intervalo fechado) e ``VARxx >= a`` (também
+``<=``, ``>`` e ``<``); conectivos ``and``/``or`` e parênteses, com ``and``
+mais forte que ``or``. O texto é lido uma única vez numa árvore, simplificado
+para a forma do catálogo (E de grupos OU de faixas) e compilado numa única
+avaliação:
+
+- com numexpr instalado, uma só chamada ``numexpr.evaluate`` percorre as
+  colunas das VARs em blocos, sem máscaras intermediárias do tamanho do
+  histórico;
+- sem numexpr, a avaliação NumPy escreve as comparações em buffers
+  (``out=``) e avalia os grupos em curto-circuito: cada grupo só lê as
+  linhas que passaram nos grupos anteriores.
+"""
+import itertools
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from .catalog import Catalog, _literal, _merge_and
+from .features import VAR_INDEX, VAR_NAMES
+
+try:
+    import numexpr
+except ImportError:  # numexpr é opcional
+    numexpr = None
+
+HAS_NUMEXPR = numexpr is not None
+
+_TOKEN = re.compile(r"\s*(?:(?P<num>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(?P<name>[A-Za-z_]\w*)"
+                    r"|(?P<op>>=|<=|>|<)|(?P<punct>[()\[\],]))")
+
+
+def _tokens(text):
+    """Lista de (tipo, valor, posição) do texto da expressão."""
+    tokens, pos = [], 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise ValueError(f"Caractere inesperado na posição {pos}: {text[pos:pos + 10]!r}")
+        kind = m.lastgroup
+        value, start = m.group(kind), m.start(kind)
+        if kind == 'name' and value.lower() in ('and', 'or', 'in'):
+            kind, value = 'kw', value.lower()
+        tokens.append((kind, value, start))
+        pos = m.end()
+    return tokens
+
+
+class _Parser:
+    """Descida recursiva: expr := termo ('or' termo)*; termo := fator ('and' fator)*."""
+
+    def __init__(self, text):
+        self.tokens = _tokens(text)
+        self.i = 0
+
+    def peek(self):
+        return self.tokens[self.i] if self.i < len(self.tokens) else (None, None, -1)
+
+    def take(self, kind, value=None):
+        tok = self.peek()
+        if tok[0] != kind or (value is not None and tok[1] != value):
+            where = f"na posição {tok[2]}" if tok[0] else "no fim da expressão"
+            raise ValueError(f"Esperado {value or kind} {where}")
+        self.i += 1
+        return tok[1]
+
+    def parse(self):
+        node = self.expr()
+        if self.i < len(self.tokens):
+            raise ValueError(f"Sobra na posição {self.peek()[2]}: {self.peek()[1]!r}")
+        return node
+
+    def expr(self):
+        terms = [self.term()]
+        while self.peek()[:2] == ('kw', 'or'):
+            self.i += 1
+            terms.append(self.term())
+        return terms[0] if len(terms) == 1 else ('or', terms)
+
+    def term(self):
+        factors = [self.factor()]
+        while self.peek()[:2] == ('kw', 'and'):
+            self.i += 1
+            factors.append(self.factor())
+        return factors[0] if len(factors) == 1 else ('and', factors)
+
+    def factor(self):
+        if self.peek()[:2] == ('punct', '('):
+            self.i += 1
+            node = self.expr()
+            self.take('punct', ')')
+            return node
+        pos = self.peek()[2]
+        var = self.take('name').upper()
+        if var not in VAR_INDEX:
+            raise ValueError(f"Variável desconhecida na posição {pos}: {var}")
+        if self.peek()[:2] == ('kw', 'in'):
+            self.i += 1
+            self.take('punct', '[')
+            lo = float(self.take('num'))
+            self.take('punct', ',')
+            hi = float(self.take('num'))
+            self.take('punct', ']')
+            return ('in', var, lo, hi)
+        op, value = self.take('op'), float(self.take('num'))
+        if op == '>=':
+            return ('in', var, value, np.inf)
+        if op == '<=':
+            return ('in', var, -np.inf, value)
+        if op == '>':
+            return ('in', var, np.nextafter(value, np.inf), np.inf)
+        return ('in', var, -np.inf, np.nextafter(value, -np.inf))
+
+
+def parse_expression(text):
+    """Árvore da expressão: ('in', VAR, lo, hi), ('and', [...]) ou ('or', [...])."""
+    return _Parser(text).parse()
+
+
+def _to_cnf(node):
+    if node[0] == 'in':
+        return [[node[1:]]]
+    parts = [_to_cnf(child) for child in node[1]]
+    if node[0] == 'and':
+        return _merge_and([group for part in parts for group in part])
+    return [[c for g in combo for c in g] for combo in itertools.product(*parts)]
+
+
+def _union(group):
+    """Grupo OU sem faixas repetidas: faixas da mesma VAR que se tocam viram uma só; faixas vazias saem."""
+    by_var = {}
+    for var, lo, hi in group:
+        if lo <= hi:
+            by_var.setdefault(var, []).append((lo, hi))
+    out = []
+    for var, ranges in by_var.items():
+        ranges.sort()
+        merged = [list(ranges[0])]
+        for lo, hi in ranges[1:]:
+            if lo <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        out.extend((var, lo, hi) for lo, hi in merged)
+    return out
+
+
+def simplify(node):
+    """Forma do catálogo (lista E de grupos OU de (VAR, lo, hi)), simplificada.
+
+    ``and`` da mesma VAR vira a interseção das faixas; dentro de cada grupo,
+    faixas repetidas ou sobrepostas da mesma VAR se juntam; grupos que
+    contêm outro grupo inteiro são redundantes e saem.
+    """
+    groups = [_union(group) for group in _to_cnf(node)]
+    keep = []
+    for i, group in enumerate(groups):
+        clauses = set(group)
+        if any(j != i and set(other) <= clauses and (set(other) < clauses or j < i)
+               for j, other in enumerate(groups)):
+            continue
+        keep.append(group)
+    return keep
+
+
+def _clause_source(var, lo, hi):
+    parts = []
+    if np.isfinite(lo):
+        parts.append(f"({var} >= {float(lo)!r})")
+    if np.isfinite(hi):
+        parts.append(f"({var} <= {float(hi)!r})")
+    return " & ".join(parts) or f"({var} == {var})"
+
+
+@dataclass
+class Expression:
+    """Expressão compilada: grupos E de faixas OU e a mesma condição como string do numexpr."""
+    text: str
+    groups: list
+    source: str
+
+    @property
+    def var_indices(self):
+        """Índices (0-based) das VARs usadas, para compute_features(df, var_indices)."""
+        return sorted({VAR_INDEX[var] for group in self.groups for var, _, _ in group})
+
+    def evaluate(self, features):
+        """Máscara booleana das linhas que satisfazem a expressão (``features``: linhas x 77)."""
+        features = np.asarray(features)
+        n_rows = features.shape[0]
+        if not self.groups:
+            return np.ones(n_rows, dtype=bool)
+        if not all(self.groups):
+            return np.zeros(n_rows, dtype=bool)
+        if HAS_NUMEXPR:
+            columns = {VAR_NAMES[i]: features[:, i] for i in self.var_indices}
+            return numexpr.evaluate(self.source, local_dict=columns)
+        # Grupo a grupo, do menor para o maior; cada grupo só lê as linhas que passaram nos anteriores
+        rows = None
+        for group in sorted(self.groups, key=len):
+            size = n_rows if rows is None else len(rows)
+            hit, tmp, below = np.zeros(size, dtype=bool), np.empty(size, dtype=bool), np.empty(size, dtype=bool)
+            for var, lo, hi in group:
+                x = features[:, VAR_INDEX[var]] if rows is None else features[rows, VAR_INDEX[var]]
+                np.greater_equal(x, lo, out=tmp)
+                tmp &= np.less_equal(x, hi, out=below)
+                hit |= tmp
+            rows = np.flatnonzero(hit) if rows is None else rows[hit]
+        out = np.zeros(n_rows, dtype=bool)
+        out[rows] = True
+        return out
+
+
+def compile_expression(text):
+    """Lê, simplifica e compila a expressão de uma estratégia.
+
+    Um grupo sem faixas (ex.: ``VAR01 >= 2 and VAR01 <= 1``) nunca é
+    satisfeito: a expressão inteira vira ``False``.
+    """
+    groups = simplify(parse_expression(text))
+    if not all(groups):
+        return Expression(text=text, groups=groups, source="False")
+    terms = []
+    for group in groups:
+        clauses = [_clause_source(*clause) for clause in group]
+        terms.append(clauses[0] if len(clauses) == 1 else "(" + " | ".join(clauses) + ")")
+    return Expression(text=text, groups=groups, source=" & ".join(terms) or "True")
+
+
+def format_expression(groups):
+    """Texto de uma estratégia do catálogo (grupos de (VAR, lo, hi)) na linguagem de expressões."""
+    def clause(var, lo, hi):
+        if np.isfinite(lo) and np.isfinite(hi):
+            return f"{var} in [{_literal(lo)}, {_literal(hi)}]"
+        if np.isfinite(lo):
+            return f"{var} >= {_literal(lo)}"
+        return f"{var} <= {_literal(hi)}"
+
+    terms = []
+    for group in groups:
+        clauses = [clause(*c) for c in group]
+        terms.append(clauses[0] if len(clauses) == 1 or len(groups) == 1 else "(" + " or ".join(clauses) + ")")
+    return " and ".join(terms)
+
+
+def expressions_catalog(expressions, market):
+    """Catálogo de um dicionário rótulo -> expressão (texto ou Expression).
+
+    ``market`` é o mercado de todas as estratégias ou um dicionário
+    rótulo -> mercado, como em parse_strategies; rótulos fora dele são ignorados.
+    """
+    markets = market if isinstance(market, dict) else {label: market for label in expressions}
+    rules = []
+    for label, expression in expressions.items():
+        if label not in markets:
+            continue
+        if isinstance(expression, str):
+            expression = compile_expression(expression)
+        rules.append((label, markets[label], expression.groups))
+    return Catalog.from_rules(rules)
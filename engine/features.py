@@ -0,0 +1,103 @@
+"""Cálculo vetorizado das variáveis VAR01..VAR77 a partir das odds.
+
+Reproduz exatamente ``pre_calculate_all_vars`` das páginas, mas devolve uma
+matriz NumPy (linhas x variáveis) em vez de um dicionário de Series.
+"""
+import numpy as np
+
+from .io import numeric_column
+
+# Colunas de odds usadas pelas VARs, na ordem das probabilidades abaixo
+ODDS_COLUMNS = [
+    'Odd_H_Back', 'Odd_D_Back', 'Odd_A_Back', 'Odd_Over25_FT_Back', 'Odd_Under25_FT_Back',
+    'Odd_BTTS_Yes_Back', 'Odd_BTTS_No_Back', 'Odd_CS_0x0_Lay', 'Odd_CS_0x1_Lay', 'Odd_CS_1x0_Lay'
+]
+PROB_NAMES = ['pH', 'pD', 'pA', 'pOver', 'pUnder', 'pBTTS_Y', 'pBTTS_N', 'p0x0', 'p0x1', 'p1x0']
+_P = {name: i for i, name in enumerate(PROB_NAMES)}
+
+# Tipos de variável: razão a/b, coeficiente de variação, |a-b|, ângulo e |a-b|/b
+RATIO, CV, ABSDIFF, ANGLE, RELDIFF = range(5)
+
+_RATIOS = [
+    ('pH', 'pD'), ('pH', 'pA'), ('pD', 'pH'), ('pD', 'pA'), ('pA', 'pH'), ('pA', 'pD'),
+    ('pOver', 'pUnder'), ('pUnder', 'pOver'), ('pBTTS_Y', 'pBTTS_N'), ('pBTTS_N', 'pBTTS_Y'),
+    ('pH', 'pOver'), ('pD', 'pOver'), ('pA', 'pOver'), ('pH', 'pUnder'), ('pD', 'pUnder'), ('pA', 'pUnder'),
+    ('pH', 'pBTTS_Y'), ('pD', 'pBTTS_Y'), ('pA', 'pBTTS_Y'), ('pH', 'pBTTS_N'), ('pD', 'pBTTS_N'), ('pA', 'pBTTS_N'),
+    ('p0x0', 'pH'), ('p0x0', 'pD'), ('p0x0', 'pA'), ('p0x0', 'pOver'), ('p0x0', 'pUnder'), ('p0x0', 'pBTTS_Y'),
+    ('p0x0', 'pBTTS_N'), ('p0x1', 'pH'), ('p0x1', 'pD'), ('p0x1', 'pA'), ('p0x1', 'pOver'), ('p0x1', 'pUnder'),
+    ('p0x1', 'pBTTS_Y'), ('p0x1', 'pBTTS_N'), ('p1x0', 'pH'), ('p1x0', 'pD'), ('p1x0', 'pA'), ('p1x0', 'pOver'),
+    ('p1x0', 'pUnder'), ('p1x0', 'pBTTS_Y'), ('p1x0', 'pBTTS_N'), ('p0x0', 'p0x1'), ('p0x0', 'p1x0'),
+    ('p0x1', 'p0x0'), ('p0x1', 'p1x0'), ('p1x0', 'p0x0'), ('p1x0', 'p0x1'),
+]
+_CVS = [('pH', 'pD', 'pA'), ('pOver', 'pUnder'), ('pBTTS_Y', 'pBTTS_N'), ('p0x0', 'p0x1', 'p1x0')]
+_PAIRS = [('pH', 'pA'), ('pH', 'pD'), ('pD', 'pA'), ('pOver', 'pUnder'), ('pBTTS_Y', 'pBTTS_N'),
+          ('p0x0', 'p0x1'), ('p0x0', 'p1x0'), ('p0x1', 'p1x0')]
+_ANGLES = [('pA', 'pH'), ('pD', 'pH'), ('pA', 'pD'), ('pUnder', 'pOver'), ('pBTTS_N', 'pBTTS_Y'),
+           ('p0x1', 'p0x0'), ('p1x0', 'p0x0'), ('p1x0', 'p0x1')]
+_RELDIFFS = [('pH', 'pA'), ('pH', 'pD'), ('pD', 'pA'), ('pOver', 'pUnder'), ('pBTTS_Y', 'pBTTS_N'),
+             ('p0x0', 'p0x1'), ('p0x0', 'p1x0'), ('p0x1', 'p1x0')]
+
+# VAR_SPEC[i] = (tipo, índices das probabilidades) para a variável VAR{i+1:02d}
+VAR_SPEC = (
+    [(RATIO, (_P[a], _P[b])) for a, b in _RATIOS]
+    + [(CV, tuple(_P[p] for p in ps)) for ps in _CVS]
+    + [(ABSDIFF, (_P[a], _P[b])) for a, b in _PAIRS]
+    + [(ANGLE, (_P[a], _P[b])) for a, b in _ANGLES]
+    + [(RELDIFF, (_P[a], _P[b])) for a, b in _RELDIFFS]
+)
+VAR_NAMES = [f'VAR{i:02d}' for i in range(1, len(VAR_SPEC) + 1)]
+VAR_INDEX = {name: i for i, name in enumerate(VAR_NAMES)}
+
+
+def implied_probabilities(odds):
+    """Converte a matriz de odds (linhas x 10) em probabilidades implícitas 1/odd."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 1.0 / np.asarray(odds, dtype=np.float64)
+
+
+def _coef_var(cols):
+    """Desvio padrão amostral / média por linha, ignorando NaN como o pandas."""
+    values = np.column_stack(cols)
+    mask = np.isnan(values)
+    count = (~mask).sum(axis=1)
+    values = np.where(mask, 0.0, values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = values.sum(axis=1) / count
+        sqr = np.where(mask, 0.0, (mean[:, None] - values) ** 2)
+        std = np.sqrt(sqr.sum(axis=1) / (count - 1))
+        std[count < 2] = np.nan
+        return std / mean
+
+
+def var_column(probs, index):
+    """Calcula uma única VAR (índice 0-based) a partir da matriz de probabilidades."""
+    kind, args = VAR_SPEC[index]
+    cols = [probs[:, j] for j in args]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if kind == RATIO:
+            return cols[0] / cols[1]
+        if kind == CV:
+            return _coef_var(cols)
+        if kind == ABSDIFF:
+            return np.abs(cols[0] - cols[1])
+        if kind == ANGLE:
+            return np.arctan((cols[0] - cols[1]) / 2) * 180 / np.pi
+        return np.abs(cols[0] - cols[1]) / cols[1]
+
+
+def odds_matrix(df):
+    """Extrai as 10 colunas de odds do DataFrame como matriz float64."""
+    missing = [col for col in ODDS_COLUMNS if col not in df.columns]
+    if missing:
+        raise KeyError(f"Colunas de odds ausentes: {', '.join(missing)}")
+    return np.column_stack([numeric_column(df[col]) for col in ODDS_COLUMNS])
+
+
+def compute_features(df, var_indices=None):
+    """Retorna a matriz (linhas x 77) com as VARs; colunas não pedidas ficam NaN."""
+    probs = implied_probabilities(odds_matrix(df))
+    features = np.full((probs.shape[0], len(VAR_SPEC)), np.nan)
+    indices = range(len(VAR_SPEC)) if var_indices is None else var_indices
+    for i in indices:
+        features[:, i] = var_column(probs, i)
+    return features
@@ -0,0 +1,74 @@
+"""Histórico preparado para o motor: VARs, odds, gols e datas em arrays NumPy."""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .features import compute_features
+from .io import numeric_column
+from .leagues import normalize_leagues
+from .markets import MARKETS, market_result, settle
+
+
+@dataclass
+class History:
+    """Histórico em ordem cronológica (a ordem das linhas do arquivo, como o tail() das páginas)."""
+    features: np.ndarray
+    columns: dict
+    dates: np.ndarray = None
+    leagues: np.ndarray = None
+    league_names: list = None
+    keys: np.ndarray = None
+    store: str = None
+    _settlements: dict = field(default_factory=dict, repr=False)
+
+    def __reduce__(self):
+        # Aberto do armazém (store.py): os processos de trabalho reabrem os .npy mapeados em vez de copiar os arrays
+        if self.store is not None:
+            from .store import load_history
+            return load_history, (self.store,)
+        return super().__reduce__()
+
+    @property
+    def n_rows(self):
+        return self.features.shape[0]
+
+    def column(self, name):
+        """Coluna numérica do histórico como float64."""
+        if name not in self.columns:
+            raise KeyError(f"Coluna '{name}' ausente no histórico.")
+        return self.columns[name]
+
+    def settle(self, market):
+        """Liquidação do mercado, calculada uma única vez por histórico."""
+        if market not in self._settlements:
+            spec = MARKETS[market]
+            win = market_result(spec['result'], self.column('Goals_H'), self.column('Goals_A'),
+                                self.column('Total_Goals'))
+            self._settlements[market] = settle(self.column(spec['odd']), win, spec['min_odd'], spec['side'])
+        return self._settlements[market]
+
+
+def prepare_history(df):
+    """Calcula as VARs e extrai odds, gols, datas e ligas (códigos de categoria) de um DataFrame histórico."""
+    columns = {}
+    for spec in MARKETS.values():
+        if spec['odd'] in df.columns:
+            columns[spec['odd']] = numeric_column(df[spec['odd']])
+    for col in ('Goals_H', 'Goals_A'):
+        if col in df.columns:
+            columns[col] = numeric_column(df[col])
+    if 'Total_Goals' in df.columns:
+        columns['Total_Goals'] = numeric_column(df['Total_Goals'])
+    elif 'Goals_H' in columns and 'Goals_A' in columns:
+        columns['Total_Goals'] = columns['Goals_H'] + columns['Goals_A']
+
+    dates = None
+    if 'Date' in df.columns:
+        dates = np.asarray(pd.to_datetime(df['Date'], errors='coerce', dayfirst=True), dtype='datetime64[D]')
+    leagues, league_names = None, None
+    if 'League' in df.columns:
+        league = normalize_leagues(df['League']).cat.remove_unused_categories()
+        leagues, league_names = league.cat.codes.to_numpy(), list(league.cat.categories)
+    return History(features=compute_features(df), columns=columns, dates=dates, leagues=leagues,
+                   league_names=league_names)
@@ -0,0 +1,106 @@
+"""Leitura de planilhas (.xlsx/.csv, e Parquet em blocos) sem depender do Streamlit.
+
+As tabelas lidas recebem um esquema compacto (compact_schema):
+- odds e demais números decimais em float32;
+- gols em int8;
+- League, Home, Away, Date e Time como categorias (League com os nomes
+  normalizados, ver leagues.py): datas e horários se repetem em todos os jogos
+  do mesmo dia ou horário.
+
+Cada coluna só é convertida se a volta ao float64 (numeric_column)
+reproduz exatamente os valores originais. Assim o motor vê os mesmos números
+de antes e nenhum resultado muda.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+from .leagues import normalize_leagues
+
+TEXT_COLUMNS = ('League', 'Home', 'Away', 'Date', 'Time')
+GOAL_COLUMNS = ('Goals_H', 'Goals_A', 'Total_Goals')
+
+
+def widen(values):
+    """float32 -> float64 com o valor decimal original (6 algarismos significativos, a precisão do float32)."""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        digits = 5 - np.floor(np.log10(np.abs(values)))
+    scale = 10.0 ** np.nan_to_num(digits, nan=0.0, posinf=0.0, neginf=0.0)
+    return np.round(values * scale) / scale
+
+
+def numeric_column(series):
+    """Coluna numérica como float64 (NaN nos vazios), desfazendo o esquema compacto."""
+    values = pd.to_numeric(series, errors='coerce')
+    if values.dtype == np.float32:
+        return widen(values.to_numpy())
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def compact_schema(df):
+    """Cópia do DataFrame com tipos compactos, coluna a coluna, somente onde a conversão não perde nada."""
+    df = df.copy()
+    for col in df.columns:
+        values = df[col]
+        if col == 'League':
+            df[col] = normalize_leagues(values)
+        elif col in TEXT_COLUMNS and pd.api.types.is_string_dtype(values.dtype):
+            df[col] = values.astype('category')
+        elif values.dtype.kind == 'f' or (values.dtype.kind in 'iu' and col in GOAL_COLUMNS):
+            x = values.to_numpy(dtype=np.float64)
+            finite = x[np.isfinite(x)]
+            if col in GOAL_COLUMNS and np.array_equal(finite, np.round(finite)) \
+                    and (not len(finite) or (finite.min() >= -128 and finite.max() <= 127)):
+                df[col] = values.astype('Int8' if len(finite) < len(x) else np.int8)
+            elif values.dtype.kind == 'f' and np.array_equal(widen(x.astype(np.float32)), x, equal_nan=True):
+                df[col] = values.astype(np.float32)
+    return df
+
+
+def read_table(name, content, compact=True):
+    """Lê o conteúdo binário de um arquivo .xlsx ou .csv (separador ',' ou ';').
+
+    Com ``compact``, aplica compact_schema.
+    """
+    name = name.lower()
+    if name.endswith('.xlsx'):
+        df = pd.read_excel(io.BytesIO(content))
+    elif name.endswith('.csv'):
+        df = pd.read_csv(io.BytesIO(content))
+        if df.shape[1] <= 1:
+            df = pd.read_csv(io.BytesIO(content), sep=';')
+        if df.empty or df.shape[1] <= 1:
+            raise ValueError("Falha ao ler o arquivo CSV corretamente. Verifique o separador (',' ou ';') e o formato.")
+    else:
+        raise ValueError("Formato de arquivo não suportado. Use .xlsx ou .csv")
+    return compact_schema(df) if compact else df
+
+
+def iter_table(path, chunksize=100_000, name=None):
+    """Lê um arquivo em blocos de linhas (DataFrames), sem carregar o arquivo inteiro.
+
+    ``path`` pode ser um caminho ou um arquivo aberto (com ``name`` indicando
+    o formato). CSV (',' ou ';') é lido com ``chunksize``; Parquet, em lotes do
+    PyArrow (opcional). Planilhas .xlsx não têm leitura incremental: são
+    lidas inteiras e fatiadas.
+    """
+    name = (name or str(path)).lower()
+    if name.endswith('.csv'):
+        header = pd.read_csv(path, nrows=0)
+        sep = ';' if header.shape[1] <= 1 else ','
+        if hasattr(path, 'seek'):
+            path.seek(0)
+        with pd.read_csv(path, sep=sep, chunksize=chunksize) as reader:
+            yield from reader
+    elif name.endswith('.parquet'):
+        import pyarrow.parquet as pq  # dependência opcional, só para Parquet
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif name.endswith('.xlsx'):
+        df = pd.read_excel(path)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+    else:
+        raise ValueError("Formato de arquivo não suportado. Use .xlsx, .csv ou .parquet")
@@ -0,0 +1,152 @@
+"""Kernel fundido: odds -> VARs -> faixas das estratégias -> liquidação, linha a linha.
+
+O caminho NumPy (prepare_history + match_bits + strategy_totals) materializa
+as probabilidades, a matriz das 77 VARs e um bitset por faixa. Este kernel lê
+as 10 odds de cada jogo, calcula só as VARs usadas pelo catálogo num vetor
+local, avalia as cláusulas de todas as estratégias e soma jogos, acertos e
+lucro direto nos acumuladores. As linhas são divididas em blocos processados
+em paralelo (``prange``), cada bloco com a sua linha de acumuladores.
+
+O kernel é compilado com Numba quando ele está instalado. Sem Numba,
+fused_totals usa o caminho NumPy. Jogos e acertos são os mesmos nos dois
+caminhos. Duas diferenças possíveis:
+- o lucro difere só pela ordem das somas;
+- as VARs de ângulo usam o arctan da libm, que pode diferir do NumPy no último bit.
+"""
+import math
+
+import numpy as np
+
+from .backtest import match_bits, strategy_totals
+from .features import ABSDIFF, ANGLE, RATIO, RELDIFF, VAR_SPEC, odds_matrix
+from .history import prepare_history
+from .io import numeric_column
+from .markets import MARKETS, market_result, settle
+from .parallel import default_jobs
+
+try:
+    import numba
+except ImportError:  # Numba é opcional
+    numba = None
+
+HAS_NUMBA = numba is not None
+_prange = numba.prange if HAS_NUMBA else range
+
+# VAR_SPEC em arrays: tipo e até 3 índices de probabilidade (-1 = sem argumento)
+_VAR_KIND = np.array([kind for kind, _ in VAR_SPEC], dtype=np.int64)
+_VAR_ARGS = np.array([list(args) + [-1] * (3 - len(args)) for _, args in VAR_SPEC], dtype=np.int64)
+
+
+def _var_value(kind, args, probs):
+    """Uma VAR de uma linha, com as mesmas operações (e a mesma ordem) de features.var_column."""
+    a = probs[args[0]]
+    b = probs[args[1]]
+    if kind == RATIO:
+        return a / b
+    if kind == ABSDIFF:
+        return abs(a - b)
+    if kind == ANGLE:
+        return math.atan((a - b) / 2) * 180 / math.pi
+    if kind == RELDIFF:
+        return abs(a - b) / b
+    # CV: desvio padrão amostral / média ignorando NaN, como o pandas
+    count = 0
+    total = 0.0
+    for j in range(3):
+        if args[j] >= 0 and not math.isnan(probs[args[j]]):
+            count += 1
+            total += probs[args[j]]
+    if count < 2:
+        return math.nan
+    mean = total / count
+    sqr = 0.0
+    for j in range(3):
+        if args[j] >= 0 and not math.isnan(probs[args[j]]):
+            sqr += (mean - probs[args[j]]) ** 2
+    return math.sqrt(sqr / (count - 1)) / mean
+
+
+def _fused_kernel(odds, win, profit, eligible, needed, var_kind, var_args, strategy_market, group_offsets,
+                  clause_offsets, clause_var, clause_lo, clause_hi, n_blocks):
+    """Jogos, acertos e lucro por (bloco de linhas, estratégia); o chamador soma os blocos."""
+    n_rows = odds.shape[0]
+    k = len(strategy_market)
+    bets = np.zeros((n_blocks, k), dtype=np.int64)
+    hits = np.zeros((n_blocks, k), dtype=np.int64)
+    gain = np.zeros((n_blocks, k))
+    for block in _prange(n_blocks):
+        probs = np.empty(odds.shape[1])
+        values = np.full(len(var_kind), np.nan)
+        for i in range(block * n_rows // n_blocks, (block + 1) * n_rows // n_blocks):
+            for j in range(odds.shape[1]):
+                probs[j] = 1.0 / odds[i, j]
+            for v in needed:
+                values[v] = _var_value(var_kind[v], var_args[v], probs)
+            for s in range(k):
+                m = strategy_market[s]
+                if not eligible[i, m]:
+                    continue
+                ok = True
+                for g in range(group_offsets[s], group_offsets[s + 1]):
+                    hit = False
+                    for c in range(clause_offsets[g], clause_offsets[g + 1]):
+                        x = values[clause_var[c]]
+                        if x >= clause_lo[c] and x <= clause_hi[c]:
+                            hit = True
+                            break
+                    if not hit:
+                        ok = False
+                        break
+                if ok:
+                    bets[block, s] += 1
+                    hits[block, s] += win[i, m]
+                    gain[block, s] += profit[i, m]
+    return bets, hits, gain
+
+
+if HAS_NUMBA:
+    _var_value = numba.njit(error_model='numpy', cache=True)(_var_value)
+    _fused_kernel = numba.njit(parallel=True, error_model='numpy', cache=True)(_fused_kernel)
+
+
+def _settlement_matrices(df, markets, eligible):
+    """Acerto, lucro e elegibilidade (linhas x mercados) dos mercados do catálogo."""
+    def col(name):
+        return numeric_column(df[name]) if name in df.columns else np.full(len(df), np.nan)
+
+    goals_h, goals_a = col('Goals_H'), col('Goals_A')
+    total = col('Total_Goals') if 'Total_Goals' in df.columns else goals_h + goals_a
+    win = np.zeros((len(df), len(markets)), dtype=np.int64)
+    profit = np.zeros((len(df), len(markets)))
+    ok = np.ones((len(df), len(markets)), dtype=bool)
+    for j, market in enumerate(markets):
+        spec = MARKETS[market]
+        s = settle(col(spec['odd']), market_result(spec['result'], goals_h, goals_a, total), spec['min_odd'],
+                   spec['side'])
+        win[:, j], profit[:, j] = s.win, np.where(np.isnan(s.profit), 0.0, s.profit)  # como strategy_totals
+        if eligible:
+            ok[:, j] = s.eligible
+    return win, profit, ok
+
+
+def fused_totals(df, catalog, eligible=True, n_blocks=None):
+    """Jogos, acertos e lucro de cada estratégia direto das odds (como strategy_totals de match_bits).
+
+    ``df`` é o histórico já filtrado. Sem Numba, usa o caminho NumPy. Com
+    Numba, o lucro pode diferir na última casa decimal, pela ordem das somas.
+    """
+    if not HAS_NUMBA:
+        history = prepare_history(df)
+        return strategy_totals(history, catalog, match_bits(history, catalog, eligible=eligible))
+    markets = sorted(set(catalog.markets))
+    win, profit, ok = _settlement_matrices(df, markets, eligible)
+    n_groups = len(catalog.group_strategy)
+    group_offsets = np.searchsorted(catalog.group_strategy, np.arange(len(catalog) + 1))
+    clause_offsets = np.searchsorted(catalog.clause_group, np.arange(n_groups + 1))
+    n_blocks = n_blocks or 4 * default_jobs()
+    bets, hits, gain = _fused_kernel(
+        np.ascontiguousarray(odds_matrix(df)), win, profit, ok, np.unique(catalog.clause_var).astype(np.int64),
+        _VAR_KIND, _VAR_ARGS, np.array([markets.index(m) for m in catalog.markets], dtype=np.int64),
+        group_offsets, clause_offsets, catalog.clause_var.astype(np.int64), catalog.clause_lo, catalog.clause_hi,
+        max(1, min(n_blocks, len(df))))
+    return bets.sum(axis=0), hits.sum(axis=0), gain.sum(axis=0)
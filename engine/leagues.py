@@ -0,0 +1,54 @@
+"""Ligas aprovadas, compartilhadas pelas páginas que usam o motor.
+
+Os nomes das ligas são normalizados (maiúsculas, sem espaços nas pontas) e
+codificados como categoria uma única vez. O filtro transforma o conjunto de
+ligas aprovadas numa tabela booleana por código de categoria e seleciona as
+linhas com uma única indexação inteira, sem comparar strings linha a linha.
+"""
+import numpy as np
+import pandas as pd
+
+# Mesma lista das páginas de backtest
+APPROVED_LEAGUES = set([
+    "ARGENTINA 1", "ARGENTINA 2", "AUSTRALIA 1", "AUSTRIA 1", "AUSTRIA 2", "BELGIUM 1", "BELGIUM 2", "BOLIVIA 1", "BRAZIL 1", "BRAZIL 2",
+    "BULGARIA 1", "CHILE 1", "CHINA 1", "CHINA 2", "COLOMBIA 1", "COLOMBIA 2", "CROATIA 1", "CZECH 1", "DENMARK 1", "DENMARK 2",
+    "ECUADOR 1", "EGYPT 1", "ENGLAND 1", "ENGLAND 2", "ENGLAND 3", "ENGLAND 4", "ENGLAND 5", "ESTONIA 1", "EUROPA CHAMPIONS LEAGUE",
+    "EUROPA CONFERENCE LEAGUE", "EUROPA LEAGUE", "FINLAND 1", "FRANCE 1", "GREECE 1", "HUNGARY 1", "IRELAND 1", "IRELAND 2", "ISRAEL 1",
+    "ITALY 1", "ITALY 2", "JAPAN 1", "JAPAN 2", "MEXICO 1", "MEXICO 2",  "NETHERLANDS 1", "NETHERLANDS 2", "NORTHERN IRELAND 2", "NORWAY 1",
+    "NORWAY 2", "PARAGUAY 1", "PERU 1", "POLAND 1", "POLAND 2", "PORTUGAL 1", "PORTUGAL 2", "ROMANIA 1", "ROMANIA 2", "SAUDI ARABIA 1",
+    "SCOTLAND 1", "SCOTLAND 2", "SCOTLAND 3", "SCOTLAND 4", "SERBIA 1",  "SLOVAKIA 1", "SOUTH KOREA 1", "SOUTH KOREA 2", "SPAIN 1", "SPAIN 2",
+    "SWEDEN 1", "SWEDEN 2", "SWITZERLAND 1", "SWITZERLAND 2", "TURKEY 1", "TURKEY 2", "UKRAINE 1", "URUGUAY 1", "USA 1", "VENEZUELA 1", "WALES 1"
+])
+
+
+def normalize_leagues(league):
+    """Coluna de ligas como categoria com nomes normalizados (só o dicionário de nomes é processado)."""
+    league = league if isinstance(league.dtype, pd.CategoricalDtype) else league.astype('category')
+    names = pd.Index(league.cat.categories.astype(str).str.upper().str.strip())
+    if names.is_unique and names.equals(league.cat.categories):
+        return league
+    categories = names.unique()
+    mapping = np.append(categories.get_indexer(names), -1)  # código -1 (vazio) continua -1
+    codes = mapping[league.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=league.index, name=league.name)
+
+
+def approved_mask(league, leagues=APPROVED_LEAGUES):
+    """Máscara das linhas de ligas aprovadas: tabela booleana por código de categoria, indexada pelos códigos."""
+    league = normalize_leagues(league)
+    lookup = np.append(league.cat.categories.isin(leagues), False)  # código -1 (vazio) nunca é aprovado
+    return lookup[league.cat.codes.to_numpy()]
+
+
+def filter_approved(df, leagues=APPROVED_LEAGUES):
+    """Mantém apenas os jogos das ligas aprovadas, com os nomes das ligas normalizados.
+
+    Sem coluna 'League', devolve tudo.
+    """
+    if 'League' not in df.columns:
+        return df.copy()
+    league = normalize_leagues(df['League'])
+    mask = approved_mask(league, leagues)
+    df = df[mask].copy()
+    df['League'] = pd.Categorical.from_codes(league.cat.codes.to_numpy()[mask], league.cat.categories)
+    return df
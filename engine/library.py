@@ -0,0 +1,154 @@
+"""Biblioteca de estratégias em arquivos, relida quando um arquivo muda.
+
+As estratégias vêm das páginas de backtest (funções ``estrategia_N``) e dos
+arquivos ``strategies/*.txt``, escritos na linguagem de expressões (expr.py)::
+
+    # comentário
+    [back_home]
+    Estratégia 1: VAR01 in [1.2, 2.5] and (VAR39 in [0.84, 4.0] or VAR62 >= 10)
+
+Uma seção ``[mercado]`` vale para as linhas seguintes; cada linha é
+``nome: expressão``. Os arquivos ficam no controle de versão junto com o
+código, e acrescentar ou ajustar uma estratégia não exige editar a página.
+
+StrategyLibrary.refresh confere data e tamanho de cada arquivo e só relê os
+que mudaram (pelo pacote binário do conteúdo, bundle.py, quando já existe).
+Cada estratégia tem uma chave de conteúdo (mercado + faixas, sem o nome);
+BetCache guarda as apostas por chave e, depois de uma mudança, avalia no
+histórico (VARs já calculadas) apenas as estratégias novas ou alteradas.
+"""
+import glob
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .approval import ApprovalData, approval_data
+from .bundle import cached_catalog
+from .catalog import PAGE_MARKETS, PAGES_DIR, Catalog, parse_strategies
+from .expr import compile_expression, format_expression
+from .markets import MARKETS
+
+STRATEGIES_DIR = os.path.join(os.path.dirname(PAGES_DIR), 'strategies')
+
+
+def default_sources():
+    """Páginas de backtest e arquivos strategies/*.txt, nesta ordem."""
+    pages = [os.path.join(PAGES_DIR, page) for page in PAGE_MARKETS]
+    return pages + sorted(glob.glob(os.path.join(STRATEGIES_DIR, '*.txt')))
+
+
+def parse_strategy_file(text, source='<texto>'):
+    """Regras (nome, mercado, grupos) de um arquivo de estratégias em expressões."""
+    rules, market = [], None
+    for n, line in enumerate(text.splitlines(), start=1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            market = line[1:-1].strip()
+            if market not in MARKETS:
+                raise ValueError(f"{source}, linha {n}: mercado desconhecido '{market}'")
+            continue
+        name, sep, expression = line.partition(':')
+        if not sep or not name.strip():
+            raise ValueError(f"{source}, linha {n}: esperado 'nome: expressão'")
+        if market is None:
+            raise ValueError(f"{source}, linha {n}: estratégia antes de uma seção [mercado]")
+        try:
+            groups = compile_expression(expression).groups
+        except ValueError as e:
+            raise ValueError(f"{source}, linha {n}: {e}") from None
+        rules.append((name.strip(), market, groups))
+    return rules
+
+
+def strategy_file_text(catalog):
+    """Texto de um catálogo no formato de strategies/*.txt (ex.: para migrar uma página)."""
+    lines, market = [], None
+    for name, m, groups in catalog.rules():
+        if m != market:
+            lines.extend(([""] if lines else []) + [f"[{m}]"])
+            market = m
+        lines.append(f"{name}: {format_expression(groups)}")
+    return "\n".join(lines) + "\n"
+
+
+def _read_catalog(path):
+    """(catálogo, chaves) de uma página ou de um arquivo .txt, pelo pacote binário do seu conteúdo."""
+    if path.endswith('.py'):
+        market = PAGE_MARKETS[os.path.basename(path)]
+        return cached_catalog(path, lambda text: parse_strategies(text, market))
+    return cached_catalog(path, lambda text: Catalog.from_rules(parse_strategy_file(text, os.path.basename(path))))
+
+
+@dataclass
+class StrategyLibrary:
+    """Catálogo montado a partir de arquivos; ``refresh`` relê só os arquivos alterados.
+
+    Com ``sources=None`` a lista de arquivos é a de default_sources, refeita a
+    cada refresh: arquivos novos em strategies/ entram e os apagados saem.
+    """
+    sources: list = None
+    catalog: Catalog = None
+    keys: list = None
+    _paths: list = field(default=None, repr=False)
+    _stamps: dict = field(default_factory=dict, repr=False)
+    _files: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def open(cls, sources=None):
+        library = cls(sources=None if sources is None else list(sources))
+        library.refresh()
+        return library
+
+    def refresh(self):
+        """Relê os arquivos novos ou cuja data ou tamanho mudou; devolve os caminhos relidos."""
+        paths = default_sources() if self.sources is None else self.sources
+        changed = []
+        for path in paths:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            if self._stamps.get(path) != stamp:
+                self._files[path] = _read_catalog(path)
+                self._stamps[path] = stamp
+                changed.append(path)
+        if changed or paths != self._paths:
+            for path in set(self._files) - set(paths):
+                del self._files[path], self._stamps[path]
+            self.catalog = Catalog.concat(self._files[path][0] for path in paths)
+            self.keys = [key for path in paths for key in self._files[path][1]]
+            self._paths = list(paths)
+        return changed
+
+
+@dataclass
+class BetCache:
+    """Apostas (sem odd mínima) de cada chave de estratégia num histórico, como em approval_data."""
+    history: object
+    _bets: dict = field(default_factory=dict, repr=False)
+    _last: tuple = field(default=None, repr=False)
+
+    def approval_data(self, catalog, keys):
+        """ApprovalData do catálogo, avaliando só as chaves ainda não vistas; devolve (dados, novas)."""
+        if self._last is not None and self._last[0] == (tuple(catalog.names), tuple(keys)):
+            return self._last[1], 0
+        missing = sorted({k: i for i, k in enumerate(keys) if k not in self._bets}.values())
+        if missing:
+            new = approval_data(self.history, catalog.subset(missing))
+            for j, i in enumerate(missing):
+                lo, hi = new.offsets[j], new.offsets[j + 1]
+                self._bets[keys[i]] = (new.rows[lo:hi], new.odd[lo:hi], new.win[lo:hi], new.profit[lo:hi])
+        self._bets = {k: self._bets[k] for k in keys}  # descarta estratégias removidas
+        parts = [self._bets[k] for k in keys]
+        sizes = [len(p[0]) for p in parts]
+
+        def column(j, dtype):
+            return np.concatenate([p[j] for p in parts]) if parts else np.empty(0, dtype=dtype)
+
+        data = ApprovalData(names=list(catalog.names), markets=list(catalog.markets),
+                            offsets=np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)]),
+                            rows=column(0, np.int64), odd=column(1, np.float64), win=column(2, bool),
+                            profit=column(3, np.float64), n_rows=self.history.n_rows, dates=self.history.dates)
+        self._last = ((tuple(catalog.names), tuple(keys)), data)
+        return data, len(missing)
@@ -0,0 +1,64 @@
+"""Definição dos mercados e liquidação vetorizada das apostas."""
+from dataclasses import dataclass
+
+import numpy as np
+
+# Mercados das páginas de backtest: coluna de odd, condição de acerto, lado e odd mínima de run_backtest
+MARKETS = {
+    'back_home': {'label': 'Back Home', 'odd': 'Odd_H_Back', 'result': 'home', 'side': 'back', 'min_odd': 1.30},
+    'back_away': {'label': 'Back Away', 'odd': 'Odd_A_Back', 'result': 'away', 'side': 'back', 'min_odd': 1.30},
+    'over25': {'label': 'Over 2.5', 'odd': 'Odd_Over25_FT_Back', 'result': 'over25', 'side': 'back', 'min_odd': 1.3},
+    'under25': {'label': 'Under 2.5', 'odd': 'Odd_Under25_FT_Back', 'result': 'under25', 'side': 'back', 'min_odd': 1.3},
+    'btts_no': {'label': 'BTTS Não', 'odd': 'Odd_BTTS_No_Back', 'result': 'btts_no', 'side': 'back', 'min_odd': 1.3},
+    # Lay de placar exato: a aposta ganha quando o placar NÃO acontece
+    'lay_cs_0x0': {'label': 'Lay 0x0', 'odd': 'Odd_CS_0x0_Lay', 'result': 'cs_0x0', 'side': 'lay', 'min_odd': None},
+    'lay_cs_0x1': {'label': 'Lay 0x1', 'odd': 'Odd_CS_0x1_Lay', 'result': 'cs_0x1', 'side': 'lay', 'min_odd': None},
+    'lay_cs_1x0': {'label': 'Lay 1x0', 'odd': 'Odd_CS_1x0_Lay', 'result': 'cs_1x0', 'side': 'lay', 'min_odd': None},
+    'lay_cs_1x1': {'label': 'Lay 1x1', 'odd': 'Odd_CS_1x1_Lay', 'result': 'cs_1x1', 'side': 'lay', 'min_odd': None},
+}
+
+
+@dataclass
+class Settlement:
+    """Resultado de um mercado linha a linha: odd, acerto, lucro de 1 unidade e elegibilidade."""
+    odd: np.ndarray
+    win: np.ndarray
+    profit: np.ndarray
+    eligible: np.ndarray
+
+
+def market_result(result, goals_h, goals_a, total_goals):
+    """Condição de acerto do mercado (mesmas comparações das páginas; NaN conta como erro no back).
+
+    Para lay de placar exato ('cs_HxA') o acerto é o placar não acontecer.
+    """
+    with np.errstate(invalid='ignore'):
+        if result == 'home':
+            return goals_h > goals_a
+        if result == 'away':
+            return goals_h < goals_a
+        if result == 'over25':
+            return total_goals > 2
+        if result == 'under25':
+            return total_goals < 3
+        if result == 'btts_no':
+            return (goals_h == 0) | (goals_a == 0)
+        if result.startswith('cs_'):
+            home, away = (int(g) for g in result[3:].split('x'))
+            return ~((goals_h == home) & (goals_a == away))
+    raise ValueError(f"Resultado de mercado desconhecido: {result}")
+
+
+def settle(odd, win, min_odd=None, side='back'):
+    """Liquida apostas de 1 unidade.
+
+    Back: acerto paga odd-1 e erro perde 1. Lay: acerto ganha a stake (1) e
+    erro perde a responsabilidade (odd-1).
+    """
+    if side == 'lay':
+        profit = np.where(win, 1.0, -(odd - 1))
+    else:
+        profit = np.where(win, odd - 1, -1.0)
+    with np.errstate(invalid='ignore'):
+        eligible = odd >= min_odd if min_odd is not None else ~np.isnan(odd)
+    return Settlement(odd=odd, win=win, profit=profit, eligible=eligible)
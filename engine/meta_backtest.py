@@ -0,0 +1,96 @@
+"""Meta-backtest da regra de aprovação: a política das páginas reencenada dia a dia.
+
+Em produção, uma estratégia é aprovada quando as médias móveis dos seus
+últimos jogos (check_moving_averages) passam dos limiares, e os jogos dela do
+dia seguinte são apostados. Aqui o histórico é percorrido em ordem cronológica
+por rodadas (dias): a aprovação de cada estratégia em cada rodada usa apenas
+as apostas dela de rodadas anteriores, e só os jogos das rodadas em que ela
+estaria aprovada são liquidados.
+
+As janelas "últimos N antes da rodada" são avaliadas uma vez por (estratégia,
+rodada) a partir do bet_prefix (prefix.py), sem refazer o backtest a cada dia;
+o lucro das janelas soma como o ``tail(N).sum()`` das páginas.
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import above_thresholds, bet_prefix, moving_averages
+from .markets import MARKETS
+from .segments import segment_reduce
+
+
+def matchdays(history):
+    """Rodada de cada linha: linhas consecutivas com a mesma data formam uma rodada.
+
+    Sem datas, cada linha é uma rodada.
+    """
+    if history.dates is None:
+        return np.arange(history.n_rows)
+    d = history.dates
+    change = np.ones(len(d), dtype=bool)
+    change[1:] = d[1:] != d[:-1]
+    return np.cumsum(change) - 1
+
+
+def meta_backtest(history, catalog, bits=None, windows=(8, 40), rule=above_thresholds, prefix=None):
+    """Replay cronológico da política "aprovar pelas médias móveis e apostar na rodada seguinte".
+
+    ``rule`` recebe as colunas de moving_averages das janelas e devolve a
+    aprovação (por padrão, o critério das páginas de back). ``prefix``
+    reutiliza apostas já preparadas (ex.: ApprovalData.prefix com outra odd
+    mínima). Devolve (resumo por estratégia, resultado da carteira por rodada).
+    """
+    if prefix is None:
+        prefix = bet_prefix(history, catalog, bits)
+    offsets, rows, win, profit, owner = prefix.offsets, prefix.rows, prefix.win, prefix.profit, prefix.owner
+    day_of_row = matchdays(history)
+    n_days = int(day_of_row[-1]) + 1 if history.n_rows else 0
+    day = day_of_row[rows]
+
+    # Primeira aposta de cada (estratégia, rodada): a janela termina logo antes dela
+    new_run = np.ones(len(rows), dtype=bool)
+    new_run[1:] = (owner[1:] != owner[:-1]) | (day[1:] != day[:-1])
+    run_pos = np.flatnonzero(new_run)
+    run_approved = np.asarray(rule(pd.DataFrame(prefix.window_metrics(windows, run_pos, owner[run_pos]))), dtype=bool)
+    approved = run_approved[np.cumsum(new_run) - 1]
+
+    # Rodadas aprovadas: cada decisão vale da rodada seguinte à aposta anterior até a rodada atual;
+    # depois da última aposta vale o estado final (as médias móveis de hoje)
+    first_run = np.ones(len(run_pos), dtype=bool)
+    first_run[1:] = owner[run_pos][1:] != owner[run_pos][:-1]
+    prev_day = np.where(first_run, -1, np.roll(day[run_pos], 1))
+    span = np.zeros(len(rows), dtype=np.int64)
+    span[run_pos] = (day[run_pos] - prev_day) * run_approved
+    last_day = segment_reduce(np.maximum, day, offsets, empty_value=-1)
+    final = np.asarray(rule(moving_averages(history, catalog, windows=windows, prefix=prefix)), dtype=bool)
+    days_approved = segment_reduce(np.add, span, offsets) + final * (n_days - 1 - last_day)
+
+    bets = segment_reduce(np.add, approved.astype(np.int64), offsets)
+    hits = segment_reduce(np.add, (win & approved).astype(np.int64), offsets)
+    gain = segment_reduce(np.add, np.where(approved, profit, 0.0), offsets, 0.0)
+    summary = pd.DataFrame({
+        "Estratégia": catalog.names,
+        "Mercado": [MARKETS[m]['label'] for m in catalog.markets],
+        "Total de Jogos": np.diff(offsets),
+        "Lucro Total": segment_reduce(np.add, profit, offsets, 0.0),
+        "Apostas Aprovadas": bets,
+        "Acertos": hits,
+        "Taxa de Acerto": np.where(bets > 0, hits / np.maximum(bets, 1), 0.0),
+        "Lucro Meta": gain,
+        "ROI Meta": np.where(bets > 0, gain / np.maximum(bets, 1), 0.0),
+        "Rodadas Aprovada": days_approved,
+        "Aprovada Hoje": final,
+    })
+
+    placed = day[approved]
+    daily = pd.DataFrame({
+        "Estratégias Apostando": np.bincount(day[run_pos[run_approved]], minlength=n_days),
+        "Apostas": np.bincount(placed, minlength=n_days),
+        "Acertos": np.bincount(placed, weights=win[approved], minlength=n_days).astype(np.int64),
+        "Lucro": np.bincount(placed, weights=profit[approved], minlength=n_days),
+    })
+    daily["Lucro Acumulado"] = daily["Lucro"].cumsum()
+    if history.dates is not None:
+        first_row = np.flatnonzero(np.r_[True, np.diff(day_of_row) > 0])
+        daily.index = pd.Index(pd.to_datetime(history.dates[first_row]), name="Data")
+    return summary, daily
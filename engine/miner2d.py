@@ -0,0 +1,170 @@
+"""Mineração de estratégias "faixa de VAR x faixa de VAR" por histogramas 2-D.
+
+Cada VAR é dividida em faixas (bins) por quantis. Para um par de VARs, jogos,
+acertos e lucro de todas as células (bin_i, bin_j) saem de um único
+``np.bincount``; com somas prefixadas 2-D, qualquer retângulo contíguo de bins
+(uma faixa de cada VAR) é pontuado em O(1). Os limites emitidos são os valores
+reais dos jogos nas pontas da faixa, arredondados apenas enquanto continuam
+separando os bins vizinhos — o backtest da estratégia gerada reproduz
+exatamente os números da mineração.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from .catalog import Catalog, page_code
+from .features import VAR_NAMES
+from .markets import MARKETS
+from .parallel import default_jobs, map_blocks, split_blocks
+
+_MAX_CELLS = 4_000_000  # retângulos x VARs avaliados por vez
+
+
+def quantile_bins(features, rows, n_bins=20):
+    """Bins por quantis de cada VAR (calculados nas linhas indicadas).
+
+    Devolve (bins, bin_min, bin_max): o bin de cada linha (n_bins para NaN) e o
+    menor/maior valor observado em cada bin (+inf/-inf em bins vazios).
+    """
+    n, n_vars = features.shape
+    bins = np.full((n, n_vars), n_bins, dtype=np.int16)
+    bin_min = np.full((n_vars, n_bins), np.inf)
+    bin_max = np.full((n_vars, n_bins), -np.inf)
+    q = np.linspace(0, 1, n_bins + 1)[1:-1]
+    for v in range(n_vars):
+        col = features[rows, v]
+        finite = np.isfinite(col)
+        if not finite.any():
+            continue
+        edges = np.quantile(col[finite], q)
+        b = np.searchsorted(edges, col[finite], side='right')
+        idx = rows[finite]
+        bins[idx, v] = b
+        np.minimum.at(bin_min[v], b, col[finite])
+        np.maximum.at(bin_max[v], b, col[finite])
+    return bins, bin_min, bin_max
+
+
+def _rectangles(n_bins):
+    """Todos os intervalos contíguos [a, b] de bins."""
+    a, b = np.triu_indices(n_bins)
+    return a, b
+
+
+def _box_sums(prefix, lo_i, hi_i, lo_j, hi_j):
+    """Somas de todos os retângulos a partir da soma prefixada (VARs x (B+1) x (B+1))."""
+    return (prefix[:, hi_i + 1][:, :, hi_j + 1] - prefix[:, lo_i][:, :, hi_j + 1]
+            - prefix[:, hi_i + 1][:, :, lo_j] + prefix[:, lo_i][:, :, lo_j])
+
+
+def _mine_base(task):
+    """Melhor retângulo de cada par (base, VAR j > base) que respeita os limites."""
+    bins, win, profit, bases, n_bins, min_bets, min_profit, min_roi = task
+    n_vars = bins.shape[1]
+    lo, hi = _rectangles(n_bins)
+    width = n_bins + 1  # o bin extra guarda os NaN e é descartado
+    found = []
+    for base in bases:
+        partners = np.arange(base + 1, n_vars)
+        step = max(1, _MAX_CELLS // (len(lo) * len(lo)))
+        for start in range(0, len(partners), step):
+            js = partners[start:start + step]
+            cell = (bins[:, base].astype(np.int64)[:, None] * width + bins[:, js]) + np.arange(len(js)) * width * width
+            size = len(js) * width * width
+            grids = []
+            for weights in (None, win, profit):
+                g = np.bincount(cell.ravel(), weights=None if weights is None else np.repeat(weights, len(js)),
+                                minlength=size).reshape(len(js), width, width)[:, :n_bins, :n_bins]
+                prefix = np.zeros((len(js), n_bins + 1, n_bins + 1))
+                prefix[:, 1:, 1:] = g.cumsum(axis=1).cumsum(axis=2)
+                grids.append(_box_sums(prefix, lo, hi, lo, hi))
+            bets, hits, gain = grids
+            with np.errstate(invalid='ignore', divide='ignore'):
+                ok = (bets >= min_bets) & (gain >= min_profit) & (gain >= min_roi * bets)
+            score = np.where(ok, gain, -np.inf).reshape(len(js), -1)
+            best = score.argmax(axis=1)
+            for k in np.flatnonzero(np.isfinite(score[np.arange(len(js)), best])):
+                r_i, r_j = divmod(best[k], len(lo))
+                found.append((base, js[k], lo[r_i], hi[r_i], lo[r_j], hi[r_j],
+                              int(round(bets[k, r_i, r_j])), int(round(hits[k, r_i, r_j])), gain[k, r_i, r_j]))
+    return found
+
+
+def _tight_bound(value, neighbour, side):
+    """Arredonda o limite (4 casas, como nas páginas) sem alcançar o bin vizinho.
+
+    ``side='lo'`` arredonda para baixo e precisa ficar acima de ``neighbour``;
+    ``side='hi'`` arredonda para cima e precisa ficar abaixo.
+    """
+    for digits in range(4, 11):
+        scale = 10 ** digits
+        r = round((math.floor if side == 'lo' else math.ceil)(value * scale) / scale, digits)
+        if side == 'lo' and neighbour < r <= value:
+            return r
+        if side == 'hi' and value <= r < neighbour:
+            return r
+    return float(value)
+
+
+def _range_bounds(bin_min, bin_max, a, b):
+    """Limites [lo, hi] inclusivos que selecionam exatamente os bins a..b de uma VAR."""
+    lo = bin_min[a:b + 1].min()
+    hi = bin_max[a:b + 1].max()
+    below = bin_max[:a].max() if a > 0 else -np.inf
+    above = bin_min[b + 1:].min() if b + 1 < len(bin_min) else np.inf
+    return _tight_bound(lo, below, 'lo'), _tight_bound(hi, above, 'hi')
+
+
+def mine_pairs(history, market, n_bins=20, min_bets=30, min_profit=1.0, min_roi=0.0, bases=None,
+               rows=None, n_jobs=None):
+    """Candidatas "faixa de VAR_i x faixa de VAR_j" do mercado, a melhor de cada par de VARs.
+
+    ``bases`` restringe a VAR base (índices ou nomes); ``rows`` restringe as
+    linhas do histórico usadas (ex.: só o período de treino). Apenas jogos
+    elegíveis no mercado (odd mínima) entram na contagem.
+    """
+    s = history.settle(market)
+    rows = np.arange(history.n_rows) if rows is None else np.asarray(rows)
+    rows = rows[s.eligible[rows]]
+    bins, bin_min, bin_max = quantile_bins(history.features, rows, n_bins=n_bins)
+    bins = bins[rows]
+    n_vars = bins.shape[1]
+    if bases is None:
+        bases = range(n_vars - 1)
+    bases = [VAR_NAMES.index(b) if isinstance(b, str) else int(b) for b in bases]
+    n_jobs = default_jobs() if n_jobs is None else n_jobs
+    tasks = [(bins, s.win[rows].astype(np.float64), s.profit[rows], bases[a:b], n_bins, min_bets, min_profit, min_roi)
+             for a, b in split_blocks(len(bases), 4 * n_jobs)]
+    found = [row for part in map_blocks(_mine_base, tasks, n_jobs) for row in part]
+
+    records = []
+    for i, j, a_i, b_i, a_j, b_j, bets, hits, gain in found:
+        lo_i, hi_i = _range_bounds(bin_min[i], bin_max[i], a_i, b_i)
+        lo_j, hi_j = _range_bounds(bin_min[j], bin_max[j], a_j, b_j)
+        records.append({
+            "VAR A": VAR_NAMES[i], "De A": lo_i, "Até A": hi_i,
+            "VAR B": VAR_NAMES[j], "De B": lo_j, "Até B": hi_j,
+            "Total de Jogos": bets, "Acertos": hits,
+            "Taxa de Acerto": hits / bets if bets else 0.0,
+            "Lucro Total": gain, "ROI": gain / bets if bets else 0.0,
+        })
+    columns = ["VAR A", "De A", "Até A", "VAR B", "De B", "Até B", "Total de Jogos", "Acertos",
+               "Taxa de Acerto", "Lucro Total", "ROI"]
+    candidates = pd.DataFrame(records, columns=columns)
+    candidates.insert(0, "Mercado", MARKETS[market]['label'])
+    return candidates.sort_values("Lucro Total", ascending=False, kind='stable').reset_index(drop=True)
+
+
+def candidates_catalog(candidates, market, start=1):
+    """Catálogo do motor com as candidatas (nomes "Estratégia N" a partir de start)."""
+    return Catalog.from_rules([
+        (f"Estratégia {start + k}", market, [[(row["VAR A"], row["De A"], row["Até A"])],
+                                             [(row["VAR B"], row["De B"], row["Até B"])]])
+        for k, (_, row) in enumerate(candidates.iterrows())
+    ])
+
+
+def to_page_code(candidates, market, start=1):
+    """Código das candidatas no formato das páginas (funções estrategia_N e a lista de retorno)."""
+    return page_code(candidates_catalog(candidates, market, start), start)
@@ -0,0 +1,117 @@
+"""Agrupamento aproximado de estratégias por MinHash e LSH.
+
+Para catálogos com dezenas de milhares de estratégias a matriz exata de
+sobreposição (overlap.py) fica quadrática. Aqui cada estratégia vira uma
+assinatura MinHash dos jogos que seleciona (mínimo de hashes por segmento da
+lista CSR); assinaturas são cortadas em bandas e estratégias que coincidem em
+alguma banda viram candidatas. Candidatas com Jaccard estimado acima do limite
+são unidas em grupos (componentes conexas), tudo em tempo quase linear.
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import match_bits
+from .bitsets import match_lists
+from .markets import MARKETS
+
+_PRIME = (1 << 31) - 1  # hashes (a * linha + b) mod p, com linha < 2**31
+_EMPTY = np.uint32(_PRIME)  # assinatura de estratégias sem jogos
+_HASH_BLOCK = 16  # hashes calculados por vez sobre a lista de jogos
+_MAX_CELLS = 4_000_000  # jogos x hashes por bloco de cálculo
+
+
+def minhash_signatures(offsets, rows, n_hashes=128, seed=0):
+    """Assinaturas MinHash (estratégias x n_hashes) das listas CSR de jogos."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=n_hashes, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, size=n_hashes, dtype=np.uint64)
+    k = len(offsets) - 1
+    signatures = np.full((k, n_hashes), _EMPTY, dtype=np.uint32)
+    budget = _MAX_CELLS // _HASH_BLOCK
+    s = 0
+    while s < k:
+        # Bloco de estratégias cujas listas somadas cabem no orçamento (ao menos uma)
+        e = min(k, max(s + 1, int(np.searchsorted(offsets, offsets[s] + budget, side='right')) - 1))
+        sizes = np.diff(offsets[s:e + 1])
+        nonempty = np.flatnonzero(sizes > 0)
+        if len(nonempty):
+            block_rows = rows[offsets[s]:offsets[e]].astype(np.uint64)
+            starts = offsets[s:e][nonempty] - offsets[s]
+            for h in range(0, n_hashes, _HASH_BLOCK):
+                values = (block_rows[:, None] * a[None, h:h + _HASH_BLOCK] + b[None, h:h + _HASH_BLOCK]) % _PRIME
+                signatures[s + nonempty, h:h + _HASH_BLOCK] = np.minimum.reduceat(values, starts, axis=0)
+        s = e
+    return signatures
+
+
+def _components(n, left, right):
+    """Componentes conexas do grafo (n nós, arestas left-right) por propagação do menor rótulo."""
+    labels = np.arange(n)
+    while True:
+        new = labels.copy()
+        np.minimum.at(new, left, labels[right])
+        np.minimum.at(new, right, labels[left])
+        new = new[new]  # salto de ponteiros: encurta as cadeias a cada rodada
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+def lsh_clusters(signatures, bands=32, threshold=0.8, keys=None):
+    """Grupo de cada estratégia a partir das assinaturas (bandas de n_hashes / bands linhas).
+
+    ``keys`` (opcional) separa estratégias que nunca devem ficar no mesmo grupo,
+    como estratégias de mercados diferentes.
+    """
+    k, n_hashes = signatures.shape
+    width = n_hashes // bands
+    left, right = [], []
+    for band in range(bands):
+        block = signatures[:, band * width:(band + 1) * width]
+        if keys is not None:
+            block = np.column_stack([keys.astype(np.uint32), block])
+        _, first, bucket = np.unique(block, axis=0, return_index=True, return_inverse=True)
+        # Cada estratégia é ligada ao primeiro membro do seu balde
+        rep = first[bucket.ravel()]
+        pair = rep != np.arange(k)
+        left.append(np.flatnonzero(pair))
+        right.append(rep[pair])
+    left, right = np.concatenate(left), np.concatenate(right)
+    if len(left):
+        estimate = (signatures[left] == signatures[right]).mean(axis=1)
+        keep = estimate >= threshold
+        left, right = left[keep], right[keep]
+    return _components(k, left, right)
+
+
+def minhash_clusters(history, catalog, bits=None, n_hashes=128, bands=32, threshold=0.8, seed=0,
+                     by_market=True):
+    """Grupos de estratégias que escolhem essencialmente os mesmos jogos.
+
+    O representante de cada grupo é a estratégia com mais jogos (empates na
+    ordem do catálogo); estratégias sem jogos ficam no grupo -1.
+    """
+    if bits is None:
+        bits = match_bits(history, catalog)
+    offsets, rows = match_lists(bits, history.n_rows)
+    sizes = np.diff(offsets)
+    signatures = minhash_signatures(offsets, rows, n_hashes=n_hashes, seed=seed)
+    keys = np.unique(np.array(catalog.markets), return_inverse=True)[1] if by_market else None
+    labels = lsh_clusters(signatures, bands=bands, threshold=threshold, keys=keys)
+
+    cluster = np.full(len(sizes), -1, dtype=np.int64)
+    cluster[sizes > 0] = np.unique(labels[sizes > 0], return_inverse=True)[1].ravel()
+    order = np.lexsort((np.arange(len(sizes)), -sizes, cluster))
+    is_first = np.r_[True, cluster[order][1:] != cluster[order][:-1]]
+    representative = np.zeros(len(sizes), dtype=bool)
+    representative[order[is_first]] = True
+    representative &= sizes > 0
+    counts = np.bincount(cluster[cluster >= 0], minlength=1)
+    return pd.DataFrame({
+        "Estratégia": catalog.names,
+        "Mercado": [MARKETS[m]['label'] for m in catalog.markets],
+        "Total de Jogos": sizes,
+        "Grupo": cluster,
+        "Tamanho do Grupo": np.where(cluster >= 0, counts[np.maximum(cluster, 0)], 0),
+        "Representante": representative,
+    })
@@ -0,0 +1,133 @@
+"""Jogos históricos mais parecidos com cada jogo do dia, no espaço das VARs.
+
+As VARs são padronizadas (média 0, desvio 1; NaN vira a média) e reduzidas por
+PCA a poucas componentes. O índice é montado uma vez por histórico e responde
+a consultas de k vizinhos de todos os jogos do dia de uma vez: com SciPy
+instalado usa uma KD-tree (``cKDTree``); sem ele, a busca é exata em blocos de
+consultas x histórico por multiplicação de matrizes.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .catalog import PAGE_MARKETS
+from .markets import MARKETS
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # SciPy é opcional
+    cKDTree = None
+
+_MAX_CELLS = 4_000_000  # consultas x jogos do histórico por bloco da busca exata
+
+
+@dataclass
+class NeighborIndex:
+    """Índice de similaridade: padronização, componentes da PCA e pontos do histórico."""
+    mean: np.ndarray
+    scale: np.ndarray
+    components: np.ndarray
+    points: np.ndarray
+    rows: np.ndarray
+    tree: object = None
+
+    def transform(self, features):
+        """Projeta VARs (jogos x VARs) no espaço do índice."""
+        z = (np.asarray(features, dtype=np.float64) - self.mean) / self.scale
+        z = np.where(np.isfinite(z), z, 0.0)
+        return z @ self.components.T
+
+    def query(self, features, k=50):
+        """Distâncias e linhas do histórico dos k vizinhos de cada jogo (jogos x k, do mais próximo)."""
+        k = min(k, len(self.rows))
+        q = self.transform(features)
+        if self.tree is not None:
+            dist, idx = self.tree.query(q, k=k)
+            dist, idx = dist.reshape(len(q), k), idx.reshape(len(q), k)
+        else:
+            dist, idx = _exact_query(self.points, q, k)
+        return dist, self.rows[idx]
+
+
+def _exact_query(points, q, k):
+    """k vizinhos exatos por blocos de consultas (||q||² - 2 q·p + ||p||²)."""
+    dist = np.empty((len(q), k))
+    idx = np.empty((len(q), k), dtype=np.int64)
+    p_norm = (points ** 2).sum(axis=1)
+    step = max(1, _MAX_CELLS // max(len(points), 1))
+    for start in range(0, len(q), step):
+        block = q[start:start + step]
+        d2 = (block ** 2).sum(axis=1)[:, None] - 2 * block @ points.T + p_norm[None, :]
+        part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        d_part = np.take_along_axis(d2, part, axis=1)
+        order = np.argsort(d_part, axis=1, kind='stable')
+        idx[start:start + step] = np.take_along_axis(part, order, axis=1)
+        dist[start:start + step] = np.sqrt(np.maximum(np.take_along_axis(d_part, order, axis=1), 0.0))
+    return dist, idx
+
+
+def build_index(history, n_components=10, rows=None):
+    """Monta o índice sobre as linhas do histórico (todas por padrão).
+
+    ``n_components=None`` mantém todas as VARs padronizadas, sem PCA.
+    """
+    rows = np.arange(history.n_rows) if rows is None else np.asarray(rows)
+    x = history.features[rows]
+    finite = np.isfinite(x)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        count = finite.sum(axis=0)
+        mean = np.where(count > 0, np.where(finite, x, 0.0).sum(axis=0) / np.maximum(count, 1), 0.0)
+        var = np.where(finite, (x - mean) ** 2, 0.0).sum(axis=0) / np.maximum(count, 1)
+    scale = np.where(var > 0, np.sqrt(var), 1.0)
+    z = np.where(finite, (x - mean) / scale, 0.0)
+    if n_components is None or n_components >= z.shape[1]:
+        components = np.eye(z.shape[1])
+    else:
+        # Autovetores da covariância, da maior para a menor variância
+        values, vectors = np.linalg.eigh(z.T @ z / max(len(z) - 1, 1))
+        components = vectors[:, np.argsort(values)[::-1][:n_components]].T
+    points = z @ components.T
+    tree = cKDTree(points) if cKDTree is not None and len(points) else None
+    return NeighborIndex(mean=mean, scale=scale, components=components, points=points, rows=rows, tree=tree)
+
+
+def _available_markets(history, markets):
+    """Mercados indicados (por padrão, os das páginas de backtest) cujas colunas estão no histórico."""
+    markets = list(PAGE_MARKETS.values()) if markets is None else markets
+    return [m for m in markets if MARKETS[m]['odd'] in history.columns and 'Goals_H' in history.columns]
+
+
+def neighbor_outcomes(history, index, features, k=50, markets=None):
+    """Resumo dos k vizinhos de cada jogo: distância média e, por mercado, taxa de acerto e lucro médio.
+
+    Só vizinhos elegíveis no mercado (odd mínima) entram nas médias.
+    """
+    dist, idx = index.query(features, k=k)
+    summary = pd.DataFrame({"Vizinhos": np.full(len(idx), idx.shape[1]), "Distância Média": dist.mean(axis=1)})
+    for market in _available_markets(history, markets):
+        s = history.settle(market)
+        eligible = s.eligible[idx]
+        n = eligible.sum(axis=1)
+        label = MARKETS[market]['label']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            summary[f"Acerto {label}"] = np.where(n > 0, (s.win[idx] & eligible).sum(axis=1) / n, np.nan)
+            summary[f"Lucro Médio {label}"] = np.where(n > 0, np.where(eligible, s.profit[idx], 0.0).sum(axis=1) / n,
+                                                       np.nan)
+    return summary
+
+
+def neighbor_games(history, index, features, k=50, markets=None):
+    """Os k vizinhos de um único jogo, do mais próximo: data, placar, distância e lucro por mercado."""
+    dist, idx = index.query(np.atleast_2d(features), k=k)
+    dist, idx = dist[0], idx[0]
+    games = pd.DataFrame({"Linha": idx, "Distância": dist})
+    if history.dates is not None:
+        games.insert(1, "Data", pd.to_datetime(history.dates[idx]))
+    if 'Goals_H' in history.columns:
+        games["Placar"] = [f"{h:.0f}x{a:.0f}" for h, a in zip(history.column('Goals_H')[idx],
+                                                               history.column('Goals_A')[idx])]
+    for market in _available_markets(history, markets):
+        s = history.settle(market)
+        games[f"Lucro {MARKETS[market]['label']}"] = np.where(s.eligible[idx], s.profit[idx], np.nan)
+    return games
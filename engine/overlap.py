@@ -0,0 +1,129 @@
+"""Sobreposição entre estratégias e poda das redundantes.
+
+A interseção dos jogos de duas estratégias é o popcount do E bit a bit dos
+seus bitsets. A matriz de interseções é calculada em blocos (estratégias x
+estratégias x palavras) apenas no triângulo superior, com as faixas de linhas
+distribuídas entre processos. Dela saem Jaccard, inclusão (uma estratégia
+contida em outra) e equivalência (mesmos jogos).
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import match_bits
+from .bitsets import popcount
+from .markets import MARKETS
+from .parallel import default_jobs, map_blocks, open_shared, shared_array
+
+_MAX_WORDS = 2_000_000  # palavras uint64 por bloco de E bit a bit (~16 MB)
+
+
+def _intersection_rows(task):
+    """Interseções das estratégias [start, stop) com todas as de índice >= start."""
+    bits, start, stop = task
+    bits = open_shared(bits)
+    k, words = bits.shape
+    out = np.zeros((stop - start, k), dtype=np.int32)
+    tile = max(1, int(np.sqrt(_MAX_WORDS / max(words, 1))))
+    for a in range(start, stop, tile):
+        a2 = min(a + tile, stop)
+        left = bits[a:a2, None, :]
+        for b in range(a, k, tile):
+            b2 = min(b + tile, k)
+            out[a - start:a2 - start, b:b2] = popcount(left & bits[None, b:b2, :])
+    return start, out
+
+
+def intersection_matrix(bits, n_jobs=None):
+    """Matriz simétrica (k x k) com o número de jogos em comum; a diagonal é o tamanho de cada estratégia."""
+    bits = np.ascontiguousarray(np.atleast_2d(bits))
+    k = bits.shape[0]
+    n_jobs = default_jobs() if n_jobs is None else n_jobs
+    # Linhas do topo têm mais pares no triângulo superior: as fatias equilibram o trabalho
+    work = np.cumsum(np.arange(k, 0, -1, dtype=np.float64))
+    n_tasks = max(1, min(k, 4 * n_jobs))
+    edges = np.unique(np.concatenate([[0], np.searchsorted(work, work[-1] * np.arange(1, n_tasks) / n_tasks), [k]]))
+    inter = np.zeros((k, k), dtype=np.int32)
+    # Os bitsets vão uma vez para o disco (mapeados pelos processos), não uma cópia por tarefa
+    with shared_array(bits, n_jobs if len(edges) > 2 else 1) as shared:
+        tasks = [(shared, int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
+        for start, rows in map_blocks(_intersection_rows, tasks, n_jobs):
+            inter[start:start + len(rows)] = rows
+    # Os blocos da diagonal também preenchem parte do triângulo inferior: só o superior é usado
+    return np.triu(inter) + np.triu(inter, 1).T
+
+
+def jaccard_matrix(inter):
+    """Jaccard |A ∩ B| / |A ∪ B| a partir da matriz de interseções (0 quando ambas são vazias)."""
+    sizes = np.diag(inter).astype(np.float64)
+    union = sizes[:, None] + sizes[None, :] - inter
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(union > 0, inter / union, 0.0).astype(np.float32)
+
+
+def prune_redundant(catalog, inter, min_jaccard=None):
+    """Índices das estratégias mantidas após a poda, na ordem do catálogo.
+
+    Percorre as estratégias da maior para a menor (empates na ordem do
+    catálogo) e remove as que estão contidas numa estratégia já mantida do
+    mesmo mercado — a cobertura de jogos de cada mercado fica idêntica.
+    Com ``min_jaccard`` remove também as quase duplicadas (Jaccard >= limite),
+    o que pode perder alguns jogos.
+
+    Sem ``min_jaccard`` a poda não precisa de laço: a inclusão é transitiva
+    (quem contém uma removida está contido numa mantida anterior), então uma
+    estratégia sai exatamente quando alguma anterior do mesmo mercado a contém.
+    """
+    sizes = np.diag(inter).astype(np.int64)
+    markets = np.array(catalog.markets)
+    order = np.lexsort((np.arange(len(sizes)), -sizes))
+    if min_jaccard is None:
+        rank = np.empty(len(sizes), dtype=np.int64)
+        rank[order] = np.arange(len(sizes))
+        earlier = (rank[None, :] < rank[:, None]) & (markets[None, :] == markets[:, None])
+        return np.flatnonzero(~(earlier & (inter == sizes[:, None])).any(axis=1))
+    jaccard = jaccard_matrix(inter)
+    kept = np.zeros(len(sizes), dtype=bool)
+    for i in order:
+        peers = kept & (markets == markets[i])
+        kept[i] = not ((inter[i, peers] == sizes[i]).any() or (jaccard[i, peers] >= min_jaccard).any())
+    return np.flatnonzero(kept)
+
+
+def redundancy_report(catalog, inter, kept=None):
+    """Para cada estratégia: vizinha mais parecida do mesmo mercado, inclusão, equivalência e se foi mantida."""
+    sizes = np.diag(inter).astype(np.int64)
+    markets = np.array(catalog.markets)
+    names = np.array(catalog.names, dtype=object)
+    jaccard = jaccard_matrix(inter)
+    same = markets[:, None] == markets[None, :]
+    np.fill_diagonal(same, False)
+    jaccard = np.where(same, jaccard, -1.0)
+    nearest = jaccard.argmax(axis=1)
+    contained = same & (inter == sizes[:, None]) & (sizes[:, None] > 0)
+    # Superconjunto preferido: o maior (o mesmo critério da poda)
+    superset = np.where(contained, sizes.astype(np.int32)[None, :], -1).argmax(axis=1)
+    has_superset = contained.any(axis=1)
+    equivalent = contained & (sizes[None, :] == sizes[:, None])
+    if kept is None:
+        kept = prune_redundant(catalog, inter)
+    kept_mask = np.zeros(len(sizes), dtype=bool)
+    kept_mask[kept] = True
+    return pd.DataFrame({
+        "Estratégia": catalog.names,
+        "Mercado": [MARKETS[m]['label'] for m in catalog.markets],
+        "Total de Jogos": sizes,
+        "Estratégia Mais Parecida": np.where(jaccard.max(axis=1) >= 0, names[nearest], ""),
+        "Jaccard": np.maximum(jaccard.max(axis=1), 0.0),
+        "Contida Em": np.where(has_superset, names[superset], ""),
+        "Equivalentes": equivalent.sum(axis=1),
+        "Mantida": kept_mask,
+    })
+
+
+def overlap(history, catalog, bits=None, min_jaccard=None, n_jobs=None):
+    """Interseções, relatório de redundância e índices podados de um catálogo sobre o histórico."""
+    if bits is None:
+        bits = match_bits(history, catalog)
+    inter = intersection_matrix(bits, n_jobs=n_jobs)
+    kept = prune_redundant(catalog, inter, min_jaccard=min_jaccard)
+    return inter, redundancy_report(catalog, inter, kept), kept
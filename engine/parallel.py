@@ -0,0 +1,60 @@
+"""Execução de blocos de trabalho em paralelo (processos) com fallback sequencial."""
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+
+def default_jobs():
+    """Número de processos padrão: um por núcleo disponível."""
+    return os.cpu_count() or 1
+
+
+def split_blocks(n_items, n_blocks):
+    """Divide range(n_items) em até n_blocks fatias contíguas (início, fim)."""
+    n_blocks = max(1, min(n_blocks, n_items))
+    edges = [round(i * n_items / n_blocks) for i in range(n_blocks + 1)]
+    return [(a, b) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def map_blocks(func, tasks, n_jobs=None):
+    """Aplica func a cada tarefa; usa um pool de processos quando há mais de um job."""
+    tasks = list(tasks)
+    n_jobs = default_jobs() if n_jobs is None else n_jobs
+    if n_jobs <= 1 or len(tasks) <= 1:
+        return [func(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+        return list(pool.map(func, tasks))
+
+
+@contextmanager
+def shared_array(array, n_jobs):
+    """Referência a ``array`` para as tarefas de map_blocks, sem copiá-lo em cada uma.
+
+    Com um só job é o próprio array. Com vários, o array é gravado uma vez num
+    .npy temporário do armazém (store.default_store_dir) e a referência é o
+    caminho: cada processo o abre mapeado em memória com open_shared, e o
+    cache de páginas do sistema guarda uma só cópia. O arquivo é apagado na
+    saída do bloco ``with``.
+    """
+    if n_jobs <= 1:
+        yield array
+        return
+    from .store import default_store_dir
+    parent = default_store_dir()
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        path = os.path.join(tmp, 'shared.npy')
+        np.save(path, array)
+        yield path
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def open_shared(ref):
+    """Array de uma referência de shared_array (aberto mapeado quando é um caminho)."""
+    return np.load(ref, mmap_mode='r') if isinstance(ref, str) else ref
@@ -0,0 +1,106 @@
+"""Somas prefixadas das apostas de cada estratégia para métricas de qualquer janela.
+
+As apostas de todas as estratégias ficam concatenadas em CSR, cada estratégia
+em ordem cronológica. Guardando a soma acumulada de acertos e lucro de cada
+estratégia, jogos/acertos/lucro de qualquer intervalo de posições dela são a
+diferença de duas entradas: "entre duas datas" ou o total saem em O(1) por
+estratégia, para todas de uma vez.
+
+O lucro acumulado recomeça em cada estratégia (segment_cumsum), então os
+números de uma estratégia não dependem do resto do catálogo. Nas janelas
+"últimos N" o lucro é somado diretamente (window_sums), do mesmo jeito que o
+``tail(N).sum()`` das páginas: a aprovação no limiar exato é a mesma.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .segments import segment_cumsum, segment_owner, window_sums
+
+
+@dataclass
+class BetPrefix:
+    """Apostas em CSR (offsets, linhas, acerto, lucro) com as somas acumuladas de acertos e lucro."""
+    offsets: np.ndarray
+    rows: np.ndarray
+    win: np.ndarray
+    profit: np.ndarray
+    n_rows: int
+    dates: np.ndarray = None
+    owner: np.ndarray = field(init=False, repr=False)
+    cum_hits: np.ndarray = field(init=False, repr=False)
+    cum_profit: np.ndarray = field(init=False, repr=False)
+    seg_first: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.owner = segment_owner(self.offsets)
+        self.cum_hits = np.concatenate([[0], np.cumsum(self.win, dtype=np.int64)])
+        # cum_profit[p]: lucro da estratégia dona da posição p - 1, do começo da lista dela até p - 1
+        self.cum_profit = np.concatenate([[0.0], segment_cumsum(self.profit, self.offsets)])
+        self.seg_first = np.zeros(len(self.rows) + 1, dtype=bool)
+        self.seg_first[self.offsets[:-1]] = True
+
+    def sums(self, start, end):
+        """Jogos, acertos e lucro das posições [start, end) do vetor concatenado (dentro de uma estratégia)."""
+        bets = end - start
+        before = np.where(self.seg_first[start], 0.0, self.cum_profit[start])
+        profit = np.where(bets > 0, self.cum_profit[end] - before, 0.0)
+        return bets, self.cum_hits[end] - self.cum_hits[start], profit
+
+    def last(self, n, end=None, owner=None):
+        """Jogos, acertos e lucro dos últimos n antes da posição ``end``.
+
+        Sem ``end``, a janela termina no fim de cada estratégia; com ``end``,
+        ``owner`` indica a estratégia de cada posição (para não atravessar o
+        começo da lista dela).
+        """
+        if end is None:
+            end, seg_start = self.offsets[1:], self.offsets[:-1]
+        else:
+            seg_start = self.offsets[:-1][owner]
+        start = np.maximum(seg_start, end - n)
+        return end - start, self.cum_hits[end] - self.cum_hits[start], window_sums(self.profit, start, end)
+
+    def window_metrics(self, windows, end=None, owner=None):
+        """Colunas de moving_averages (Jogos, Acertos, Média e Lucro Últimos N) para cada janela.
+
+        As colunas são nomeadas pelo tamanho da janela, então janelas repetidas
+        são recusadas.
+        """
+        if len(set(windows)) != len(windows):
+            raise ValueError(f"As janelas precisam ter tamanhos diferentes: {tuple(windows)}")
+        out = {}
+        for n in windows:
+            bets, hits, profit = self.last(n, end, owner)
+            out[f"Jogos {n}"] = bets
+            out[f"Acertos {n}"] = hits
+            out[f"Média {n}"] = np.where(bets > 0, hits / np.maximum(bets, 1), 0.0)
+            out[f"Lucro Últimos {n}"] = profit
+        return out
+
+    def rolling(self, n):
+        """Jogos, acertos e lucro dos últimos n até cada aposta (inclusive): a curva móvel de cada estratégia."""
+        return self.last(n, np.arange(1, len(self.rows) + 1), self.owner)
+
+    def between_rows(self, lo, hi):
+        """Jogos, acertos e lucro de cada estratégia nas linhas [lo, hi) do histórico."""
+        k = len(self.offsets) - 1
+        key = self.owner * (self.n_rows + 1) + self.rows
+        base = np.arange(k) * (self.n_rows + 1)
+        return self.sums(np.searchsorted(key, base + lo), np.searchsorted(key, base + hi))
+
+    def between_dates(self, start=None, end=None):
+        """Jogos, acertos e lucro de cada estratégia entre duas datas (inclusive; None = sem limite).
+
+        Assume o histórico em ordem cronológica, como o resto do motor.
+        """
+        if self.dates is None:
+            raise ValueError("O histórico não tem a coluna 'Date'.")
+        lo, hi = 0, self.n_rows
+        if start is not None:
+            after = np.flatnonzero(self.dates >= np.datetime64(start, 'D'))
+            lo = after[0] if len(after) else self.n_rows
+        if end is not None:
+            before = np.flatnonzero(self.dates <= np.datetime64(end, 'D'))
+            hi = before[-1] + 1 if len(before) else 0
+        return self.between_rows(lo, max(lo, hi))
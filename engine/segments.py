@@ -0,0 +1,99 @@
+"""Operações acumuladas por segmento sobre listas CSR (uma lista de apostas por estratégia).
+
+Todas as estratégias ficam concatenadas num único vetor; as funções abaixo
+fazem somas, máximos e sequências acumuladas que reiniciam no começo de cada
+estratégia, sem laços em Python.
+"""
+import numpy as np
+
+
+def segment_owner(offsets):
+    """Estratégia dona de cada posição do vetor concatenado."""
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def _segment_scan(ufunc, values, offsets):
+    """Varredura por dobramento (Hillis-Steele) de ``ufunc`` limitada a cada segmento.
+
+    No passo k cada posição combina com a de k posições antes, se ainda for do
+    mesmo segmento: log2(maior segmento) passos vetorizados, sem deslocar os
+    valores nem misturar segmentos.
+    """
+    out = np.array(values, dtype=np.float64)
+    pos = np.arange(len(out)) - np.repeat(offsets[:-1], np.diff(offsets))  # posição dentro do segmento
+    step = 1
+    while len(out) and step <= pos.max():
+        take = np.flatnonzero(pos >= step)
+        out[take] = ufunc(out[take], out[take - step])
+        step *= 2
+    return out
+
+
+def segment_cumsum(values, offsets):
+    """Soma acumulada que recomeça em cada segmento.
+
+    A soma de cada posição só depende dos valores do próprio segmento, então
+    uma estratégia tem os mesmos números sozinha ou dentro de um catálogo
+    maior (subtrair uma soma acumulada global arrastaria o arredondamento das
+    estratégias anteriores).
+    """
+    return _segment_scan(np.add, values, offsets)
+
+
+def segment_cummax(values, offsets):
+    """Máximo acumulado que recomeça em cada segmento.
+
+    Os valores nunca são deslocados, então o resultado é exato para
+    quaisquer magnitudes e quantidades de segmentos.
+    """
+    return _segment_scan(np.maximum, values, offsets)
+
+
+def segment_streak(flags, offsets):
+    """Tamanho da sequência atual de flags verdadeiras, reiniciando em cada segmento."""
+    flags = np.asarray(flags, dtype=bool)
+    idx = np.arange(len(flags))
+    start_minus_one = np.repeat(offsets[:-1] - 1, np.diff(offsets))
+    last_reset = np.maximum.accumulate(np.where(flags, start_minus_one, idx))
+    return np.where(flags, idx - last_reset, 0)
+
+
+def segment_reduce(ufunc, values, offsets, empty_value=0):
+    """Reduz cada segmento (ex.: np.maximum, np.add); segmentos vazios recebem empty_value."""
+    sizes = np.diff(offsets)
+    out = np.full(len(sizes), empty_value, dtype=np.result_type(values, type(empty_value)))
+    nonempty = sizes > 0
+    if nonempty.any():
+        out[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty])
+    return out
+
+
+def segment_shift(values, offsets, fill=0):
+    """Valor da posição anterior dentro do mesmo segmento (fill na primeira posição)."""
+    shifted = np.empty_like(values)
+    shifted[1:] = values[:-1]
+    if len(values):
+        starts = offsets[:-1][np.diff(offsets) > 0]
+        shifted[starts] = fill
+    return shifted
+
+
+def window_sums(values, start, end, block=4096):
+    """Soma de ``values[start[i]:end[i]]`` para cada janela, igual bit a bit a ``values[start:end].sum()``.
+
+    As janelas são agrupadas pelo tamanho e cada grupo vira uma matriz contígua
+    somada por linha, que o NumPy reduz com a mesma soma em pares da soma 1-D
+    (e do ``Series.sum`` do pandas). Diferenças de somas acumuladas divergiriam
+    no último bit e mudariam decisões no limiar exato.
+    """
+    values = np.asarray(values)
+    start, end = np.asarray(start), np.asarray(end)
+    length = end - start
+    out = np.zeros(len(end), dtype=np.result_type(values.dtype, np.float64))
+    for m in np.unique(length[length > 0]):
+        windows = np.flatnonzero(length == m)
+        for i in range(0, len(windows), block):
+            chunk = windows[i:i + block]
+            out[chunk] = values[start[chunk, None] + np.arange(m)].sum(axis=1)
+    return out
+
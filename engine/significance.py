@@ -0,0 +1,137 @@
+"""Significância estatística do lucro de todas as estratégias de uma vez.
+
+* Intervalo de confiança bootstrap: reamostra, com reposição, as apostas de
+  cada estratégia; todas as estratégias de um lote usam a mesma matriz de
+  números aleatórios, convertida em índices dentro de cada estratégia.
+* p-valor de permutação: compara o lucro da estratégia com o de seleções
+  aleatórias do mesmo tamanho no mesmo mercado. Uma única matriz de sorteios
+  com soma acumulada fornece a distribuição nula para todos os tamanhos.
+* Correção de Benjamini-Hochberg (FDR) para as milhares de estratégias.
+
+Os lotes de reamostragens rodam em paralelo em processos separados.
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import eligible_rows, match_bits
+from .bitsets import match_lists
+from .markets import MARKETS
+from .parallel import default_jobs, map_blocks, split_blocks
+
+_MAX_CELLS = 4_000_000  # limite de células por matriz aleatória dentro de um processo
+_SMALL_SEGMENT = 1024  # até este tamanho o viés do sorteio em 16 bits é desprezível
+
+
+def benjamini_hochberg(p_values):
+    """q-valores de Benjamini-Hochberg (taxa de falsas descobertas)."""
+    p = np.asarray(p_values, dtype=np.float64)
+    n = len(p)
+    if n == 0:
+        return p
+    order = np.argsort(p)
+    ranked = p[order] * n / np.arange(1, n + 1)
+    q = np.minimum.accumulate(ranked[::-1])[::-1]
+    out = np.empty(n)
+    out[order] = np.minimum(q, 1.0)
+    return out
+
+
+def _bootstrap_sums(task):
+    """Somas bootstrap (reamostragens x estratégias) para um lote de reamostragens."""
+    values, offsets, n_resamples, seed = task
+    rng = np.random.default_rng(seed)
+    lengths = np.diff(offsets)
+    out = np.zeros((n_resamples, len(lengths)))
+    active = np.flatnonzero(lengths > 0)
+    total = int(lengths.sum())
+    for a, b in split_blocks(len(active), max(1, -(-total * n_resamples // _MAX_CELLS))):
+        chosen = active[a:b]
+        seg_len = lengths[chosen]
+        owner = np.repeat(np.arange(len(chosen)), seg_len)
+        starts = np.concatenate([[0], np.cumsum(seg_len)[:-1]])
+        base = offsets[chosen][owner]
+        if seg_len.max() <= _SMALL_SEGMENT:
+            # Índice = (u16 * tamanho) >> 16: bem mais barato que sortear floats
+            idx = rng.integers(0, 1 << 16, size=(n_resamples, len(owner)), dtype=np.uint16).astype(np.uint32)
+            idx *= seg_len[owner].astype(np.uint32)
+            idx >>= 16
+            idx = idx + base
+        else:
+            idx = base + (rng.random((n_resamples, len(owner))) * seg_len[owner]).astype(np.int64)
+        out[:, chosen] = np.add.reduceat(values[idx], starts, axis=1)
+    return out
+
+
+def _permutation_exceed(task):
+    """Quantas somas nulas (sorteios do mercado) igualam ou superam o lucro observado."""
+    population, sizes, observed, n_resamples, seed = task
+    rng = np.random.default_rng(seed)
+    exceed = np.zeros(len(sizes), dtype=np.int64)
+    active = sizes > 0
+    k_max = int(sizes.max()) if active.any() else 0
+    if k_max == 0:
+        return exceed
+    for a, b in split_blocks(n_resamples, max(1, -(-n_resamples * k_max // _MAX_CELLS))):
+        draws = population[rng.integers(0, len(population), size=(b - a, k_max))]
+        null = np.cumsum(draws, axis=1)[:, sizes[active] - 1]
+        exceed[active] += (null >= observed[active] - 1e-9).sum(axis=0)
+    return exceed
+
+
+def significance(history, catalog, bits=None, n_resamples=10_000, confidence=0.95, alpha=0.05,
+                 seed=None, n_jobs=None, min_odd=None):
+    """IC bootstrap do lucro, p-valor de permutação e q-valor FDR para cada estratégia.
+
+    ``min_odd`` substitui a odd mínima dos mercados de back (match_bits), também
+    na população de onde saem as seleções aleatórias; com ``bits`` prontos,
+    passe a mesma odd usada para montá-los.
+    """
+    if bits is None:
+        bits = match_bits(history, catalog, min_odd=min_odd)
+    n_jobs = default_jobs() if n_jobs is None else n_jobs
+    offsets, rows = match_lists(bits, history.n_rows)
+    sizes = np.diff(offsets)
+    markets = np.array(catalog.markets)
+
+    owner_market = np.repeat(markets, sizes)
+    values = np.empty(len(rows))
+    observed = np.zeros(len(catalog))
+    for market in np.unique(markets):
+        sel = owner_market == market
+        values[sel] = history.settle(market).profit[rows[sel]]
+    nonempty = sizes > 0
+    observed[nonempty] = np.add.reduceat(values, offsets[:-1][nonempty])
+
+    seeds = np.random.SeedSequence(seed)
+    chunks = split_blocks(n_resamples, n_jobs)
+    boot_seeds = seeds.spawn(len(chunks))
+    tasks = [(values, offsets, b - a, s) for (a, b), s in zip(chunks, boot_seeds)]
+    boot = np.concatenate(map_blocks(_bootstrap_sums, tasks, n_jobs), axis=0)
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(boot, [tail, 1 - tail], axis=0)
+
+    exceed = np.zeros(len(catalog), dtype=np.int64)
+    for market in np.unique(markets):
+        population = history.settle(market).profit[eligible_rows(history, market, min_odd)]
+        members = np.flatnonzero(markets == market)
+        if len(population) == 0:
+            continue
+        tasks = [(population, sizes[members], observed[members], b - a, sd)
+                 for (a, b), sd in zip(chunks, seeds.spawn(len(chunks)))]
+        exceed[members] = np.sum(map_blocks(_permutation_exceed, tasks, n_jobs), axis=0)
+    p_values = np.where(nonempty, (1 + exceed) / (1 + n_resamples), 1.0)
+    q_values = benjamini_hochberg(p_values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            "Estratégia": catalog.names,
+            "Mercado": [MARKETS[m]['label'] for m in catalog.markets],
+            "Total de Jogos": sizes,
+            "Lucro Total": observed,
+            "ROI": np.where(nonempty, observed / sizes, 0.0),
+            "IC Lucro Inferior": np.where(nonempty, low, 0.0),
+            "IC Lucro Superior": np.where(nonempty, high, 0.0),
+            "p-valor": p_values,
+            "q-valor (FDR)": q_values,
+            "Significativa": (q_values <= alpha) & nonempty,
+        })
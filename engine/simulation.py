@@ -0,0 +1,136 @@
+"""Simulação de jogos por Poisson a partir das odds.
+
+As odds 1X2 e Over/Under 2.5 viram probabilidades sem a margem da casa. Para
+cada jogo, a média total de gols é a que reproduz a probabilidade de Over 2.5
+e a divisão entre mandante e visitante é a que reproduz P(casa) - P(fora);
+ambas são resolvidas por bissecção vetorizada sobre todos os jogos de uma vez.
+Com as médias (lambdas), a grade de placares 0..max_goals x 0..max_goals sai
+exata do produto das duas Poisson; no modo Monte Carlo, os n_sims jogos
+simulados de cada partida são sorteados como contagens multinomiais sobre a
+grade (mesma distribuição de simular jogo a jogo, sem materializar cada um).
+Dos placares saem as probabilidades de todos os mercados das páginas.
+"""
+import numpy as np
+import pandas as pd
+
+from .io import numeric_column
+from .markets import MARKETS
+
+SIM_METHODS = {
+    'exato': "Grade de Poisson exata",
+    'monte_carlo': "Monte Carlo"
+}
+
+
+def implied_probabilities(odd_home, odd_draw, odd_away, odd_over, odd_under):
+    """Probabilidades sem margem: (casa, empate, fora) do 1X2 e Over 2.5 do par Over/Under."""
+    inv = 1 / np.column_stack([odd_home, odd_draw, odd_away]).astype(np.float64)
+    p_1x2 = inv / inv.sum(axis=1, keepdims=True)
+    inv_over, inv_under = 1 / np.asarray(odd_over, dtype=np.float64), 1 / np.asarray(odd_under, dtype=np.float64)
+    return p_1x2[:, 0], p_1x2[:, 1], p_1x2[:, 2], inv_over / (inv_over + inv_under)
+
+
+def poisson_pmf(lam, max_goals=12):
+    """P(gols = 0..max_goals) de cada média (jogos x max_goals + 1)."""
+    k = np.arange(max_goals + 1)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, max_goals + 1)))])
+    lam = np.maximum(np.asarray(lam, dtype=np.float64), 1e-12)[:, None]
+    return np.exp(k * np.log(lam) - lam - log_fact)
+
+
+def score_grid(lam_home, lam_away, max_goals=12):
+    """Probabilidade de cada placar (jogos x gols casa x gols fora)."""
+    return poisson_pmf(lam_home, max_goals)[:, :, None] * poisson_pmf(lam_away, max_goals)[:, None, :]
+
+
+def _bisect(func, target, lo, hi, n_iter):
+    """Raiz de func(x) = target (func crescente) em [lo, hi] para cada jogo."""
+    lo = np.full(len(target), lo, dtype=np.float64)
+    hi = np.full(len(target), hi, dtype=np.float64)
+    for _ in range(n_iter):
+        mid = (lo + hi) / 2
+        below = func(mid) < target
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    return np.where(np.isfinite(target), (lo + hi) / 2, np.nan)
+
+
+def solve_rates(p_home, p_away, p_over, max_goals=12, n_iter=50):
+    """Médias de gols (casa, fora) que reproduzem P(Over 2.5) e P(casa) - P(fora) de cada jogo."""
+    p_home, p_away, p_over = (np.asarray(p, dtype=np.float64) for p in (p_home, p_away, p_over))
+
+    def over(mu):
+        return 1 - np.exp(-mu) * (1 + mu + mu ** 2 / 2)
+
+    total = _bisect(over, p_over, 0.01, 12.0, n_iter)
+    upper = np.triu(np.ones((max_goals + 1, max_goals + 1), dtype=bool), 1)
+    safe_total = np.nan_to_num(total, nan=1.0)
+
+    def supremacy(share):
+        grid = score_grid(safe_total * share, safe_total * (1 - share), max_goals)
+        return grid[:, upper.T].sum(axis=1) - grid[:, upper].sum(axis=1)
+
+    share = _bisect(supremacy, np.where(np.isfinite(total), p_home - p_away, np.nan), 0.001, 0.999, n_iter)
+    return total * share, total * (1 - share)
+
+
+def sample_grid(grid, n_sims=100_000, seed=0):
+    """Grade empírica de n_sims jogos simulados por partida (contagens multinomiais / n_sims)."""
+    rng = np.random.default_rng(seed)
+    flat = grid.reshape(len(grid), -1)
+    valid = np.isfinite(flat).all(axis=1)
+    pvals = np.where(valid[:, None], flat, 0.0)
+    pvals[~valid, 0] = 1.0
+    pvals = pvals / pvals.sum(axis=1, keepdims=True)
+    counts = rng.multinomial(n_sims, pvals)
+    return np.where(valid[:, None], counts / n_sims, np.nan).reshape(grid.shape)
+
+
+def market_probabilities(grid):
+    """Probabilidade de acerto de cada mercado de MARKETS a partir das grades de placares."""
+    g = np.arange(grid.shape[1])
+    home, away = np.meshgrid(g, g, indexing='ij')
+    masks = {
+        'home': home > away,
+        'away': home < away,
+        'over25': home + away > 2,
+        'under25': home + away < 3,
+        'btts_no': (home == 0) | (away == 0),
+    }
+    probs = {}
+    for market, spec in MARKETS.items():
+        if spec['result'].startswith('cs_'):
+            h, a = (int(x) for x in spec['result'][3:].split('x'))
+            probs[market] = 1 - grid[:, h, a]
+        else:
+            probs[market] = grid[:, masks[spec['result']]].sum(axis=1)
+    return probs
+
+
+def simulate_games(df, method='exato', n_sims=100_000, max_goals=12, seed=0):
+    """Médias de gols, probabilidade do modelo e valor esperado (1 unidade) de cada mercado por jogo.
+
+    Devolve (tabela, grades de placares). Jogos sem odds 1X2 ou Over/Under
+    ficam com NaN.
+    """
+    def col(name):
+        return numeric_column(df[name]) if name in df.columns else np.full(len(df), np.nan)
+
+    p_home, _, p_away, p_over = implied_probabilities(col('Odd_H_Back'), col('Odd_D_Back'), col('Odd_A_Back'),
+                                                      col('Odd_Over25_FT_Back'), col('Odd_Under25_FT_Back'))
+    lam_home, lam_away = solve_rates(p_home, p_away, p_over, max_goals=max_goals)
+    grid = score_grid(lam_home, lam_away, max_goals)
+    grid[~np.isfinite(lam_home)] = np.nan
+    if method == 'monte_carlo':
+        grid = sample_grid(grid, n_sims=n_sims, seed=seed)
+
+    result = pd.DataFrame({"λ Casa": lam_home, "λ Fora": lam_away})
+    for market, prob in market_probabilities(grid).items():
+        spec = MARKETS[market]
+        odd = col(spec['odd'])
+        result[f"Prob. {spec['label']}"] = prob
+        if spec['side'] == 'lay':
+            result[f"VE {spec['label']}"] = prob - (1 - prob) * (odd - 1)
+        else:
+            result[f"VE {spec['label']}"] = prob * odd - 1
+    return result, grid
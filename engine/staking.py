@@ -0,0 +1,106 @@
+"""Simulador de banca: curvas de capital e drawdowns de todas as estratégias.
+
+As apostas de cada estratégia, em ordem cronológica, ficam concatenadas num
+vetor (formato CSR). Curva de capital, topo, drawdown, sequência de derrotas e
+tempo abaixo do topo saem de somas e máximos acumulados por segmento.
+
+Modos de stake:
+
+* ``flat``: stake fixa de ``unit`` por aposta;
+* ``percent``: ``fraction`` da banca atual arriscada em cada aposta;
+* ``kelly``: fração de Kelly ``p - (1 - p) / b`` vezes ``fraction``, em que ``p``
+  é a taxa de acerto observada nas apostas *anteriores* da própria estratégia
+  (sem olhar o futuro) e ``b`` o ganho por unidade arriscada; nada é apostado
+  antes de ``min_bets`` apostas.
+
+O valor arriscado é a stake no back e a responsabilidade no lay: ali
+``b = 1 / (odd - 1)`` e a stake é ``responsabilidade / (odd - 1)``.
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import bet_sequences, match_bits
+from .markets import MARKETS
+from .segments import (segment_cummax, segment_cumsum, segment_reduce, segment_shift,
+                       segment_streak)
+
+STAKING_MODES = ('flat', 'percent', 'kelly')
+
+
+def kelly_fractions(odd, win, offsets, multiplier=0.25, min_bets=20, max_fraction=0.10, lay=None):
+    """Fração de Kelly da banca arriscada em cada aposta, usando apenas o histórico anterior da estratégia.
+
+    ``lay`` marca as apostas lay, em que o valor arriscado é a responsabilidade.
+    """
+    hits_before = segment_shift(segment_cumsum(win, offsets), offsets, 0.0)
+    bets_before = segment_shift(segment_cumsum(np.ones(len(win)), offsets), offsets, 0.0)
+    lay = np.zeros(len(win), dtype=bool) if lay is None else lay
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = np.where(bets_before > 0, hits_before / bets_before, 0.0)
+        b = np.where(lay, 1.0 / (odd - 1.0), odd - 1.0)  # ganho por unidade arriscada
+        kelly = p - (1.0 - p) / b
+    kelly = np.where((bets_before >= min_bets) & np.isfinite(kelly), kelly, 0.0)
+    return np.clip(kelly * multiplier, 0.0, max_fraction)
+
+
+def stake_fractions(risk, odd, lay):
+    """Stake (na unidade do lucro de settle) que arrisca ``risk`` da banca: no lay, responsabilidade / (odd - 1)."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(lay & (risk > 0), risk / (odd - 1.0), risk)
+
+
+def simulate_staking(history, catalog, bits=None, mode='flat', bankroll=100.0, unit=1.0, fraction=0.02,
+                     min_bets=20, max_fraction=0.10):
+    """Simula a banca de todas as estratégias e devolve (resumo, curvas).
+
+    ``curvas`` é um dicionário CSR com ``offsets``, ``rows`` (linha do histórico de
+    cada aposta) e ``equity`` (banca após cada aposta), para desenhar a curva
+    de qualquer estratégia sem recalcular.
+    """
+    if mode not in STAKING_MODES:
+        raise ValueError(f"Modo de stake desconhecido: {mode}")
+    if bits is None:
+        bits = match_bits(history, catalog)
+    offsets, rows, odd, win, profit = bet_sequences(history, catalog, bits)
+    sizes = np.diff(offsets)
+
+    if mode == 'flat':
+        stake_pct = None
+        equity = bankroll + segment_cumsum(unit * profit, offsets)
+    else:
+        lay = np.repeat(np.array([MARKETS[m]['side'] == 'lay' for m in catalog.markets], dtype=bool), sizes)
+        risk = (np.full(len(rows), fraction) if mode == 'percent'
+                else kelly_fractions(odd, win, offsets, fraction, min_bets, max_fraction, lay))
+        stake_pct = stake_fractions(risk, odd, lay)
+        with np.errstate(divide='ignore'):
+            growth = np.log(np.maximum(1.0 + stake_pct * profit, 0.0))
+        equity = bankroll * np.exp(segment_cumsum(growth, offsets))
+
+    peak = np.maximum(segment_cummax(equity, offsets), bankroll)
+    drawdown = peak - equity
+    with np.errstate(invalid='ignore', divide='ignore'):
+        drawdown_pct = np.where(peak > 0, drawdown / peak, 0.0)
+    underwater = drawdown > 1e-9
+    losses = (profit < 0) if stake_pct is None else (profit < 0) & (stake_pct > 0)
+
+    final = np.full(len(sizes), bankroll)
+    nonempty = sizes > 0
+    final[nonempty] = equity[offsets[1:][nonempty] - 1]
+    staked = (segment_reduce(np.add, np.full(len(rows), unit), offsets, 0.0) if stake_pct is None
+              else segment_reduce(np.add, (stake_pct > 0).astype(np.float64), offsets, 0.0))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        summary = pd.DataFrame({
+            "Estratégia": catalog.names,
+            "Mercado": [MARKETS[m]['label'] for m in catalog.markets],
+            "Apostas": sizes if stake_pct is None else staked.astype(np.int64),
+            "Banca Final": final,
+            "Lucro": final - bankroll,
+            "Máx. Drawdown": segment_reduce(np.maximum, drawdown, offsets, 0.0),
+            "Máx. Drawdown %": segment_reduce(np.maximum, drawdown_pct, offsets, 0.0),
+            "Maior Sequência de Derrotas": segment_reduce(np.maximum, segment_streak(losses, offsets), offsets, 0),
+            "Apostas Abaixo do Topo %": np.where(
+                nonempty, segment_reduce(np.add, underwater.astype(np.float64), offsets, 0.0) / np.maximum(sizes, 1), 0.0),
+            "Maior Período Abaixo do Topo": segment_reduce(np.maximum, segment_streak(underwater, offsets), offsets, 0),
+        })
+    return summary, {"offsets": offsets, "rows": rows, "equity": equity}
@@ -0,0 +1,179 @@
+"""Armazém de features em disco: VARs, colunas, liquidações, ligas e chaves das linhas em .npy.
+
+Cada histórico é gravado uma única vez num diretório identificado pelo hash
+do arquivo enviado. Sessões do Streamlit e processos de trabalho abrem os
+mesmos arquivos com ``np.load(mmap_mode='r')``: o cache de páginas do
+sistema operacional guarda uma só cópia, e a memória não cresce com o número
+de usuários. Os arrays abertos são somente leitura; o motor nunca os altera.
+
+O armazém guarda no máximo ``ENGINE_STORE_MAX_ENTRIES`` históricos e
+``ENGINE_STORE_MAX_MB`` megabytes: ao gravar um histórico novo, os usados há
+mais tempo (data do meta.json, renovada a cada abertura) são apagados.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .history import History, prepare_history
+from .io import read_table
+from .leagues import filter_approved
+from .markets import MARKETS, Settlement
+
+STORE_FORMAT = 2  # muda quando o conteúdo gravado muda: históricos antigos são refeitos
+ROW_KEY_COLUMNS = ('Date', 'Time', 'League', 'Home', 'Away')
+SETTLEMENT_FIELDS = ('win', 'profit', 'eligible')
+STORE_MAX_ENTRIES = 8
+STORE_MAX_MB = 4096
+
+
+def default_store_dir():
+    """Diretório do armazém: ``ENGINE_STORE`` ou uma pasta no diretório temporário do sistema."""
+    return os.environ.get('ENGINE_STORE') or os.path.join(tempfile.gettempdir(), 'engine_store')
+
+
+def _store_limit(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def prune_store(directory=None, max_entries=None, max_mb=None, keep=None):
+    """Apaga os históricos usados há mais tempo além de ``max_entries`` ou ``max_mb``; devolve os apagados.
+
+    Os limites padrão vêm de ENGINE_STORE_MAX_ENTRIES e ENGINE_STORE_MAX_MB.
+    ``keep`` (o histórico recém-aberto) nunca é apagado. Processos que ainda
+    tenham arrays de um histórico apagado mapeados continuam lendo normalmente.
+    """
+    directory = directory or default_store_dir()
+    max_entries = _store_limit('ENGINE_STORE_MAX_ENTRIES', STORE_MAX_ENTRIES) if max_entries is None else max_entries
+    max_mb = _store_limit('ENGINE_STORE_MAX_MB', STORE_MAX_MB) if max_mb is None else max_mb
+    entries = []
+    for name in os.listdir(directory) if os.path.isdir(directory) else []:
+        path = os.path.join(directory, name)
+        try:
+            entries.append((os.path.getmtime(os.path.join(path, 'meta.json')), path))
+        except OSError:
+            continue  # pacotes, temporários e pastas alheias ficam
+    entries.sort(reverse=True)
+    keep = os.path.abspath(keep) if keep else None
+    removed, count, size = [], 0, 0
+    for _, path in entries:
+        entry_size = _dir_size(path)
+        if os.path.abspath(path) != keep and (count >= max_entries or size + entry_size > max_mb * 2 ** 20):
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path)
+            continue
+        count, size = count + 1, size + entry_size
+    return removed
+
+
+def store_key(content):
+    """Identificador do histórico: hash do conteúdo do arquivo (e do formato do armazém)."""
+    return hashlib.sha1(f'{STORE_FORMAT}:'.encode() + content).hexdigest()[:20]
+
+
+def row_keys(df):
+    """Chave uint64 de cada linha, pelo hash de data, horário, liga e times (as colunas presentes)."""
+    cols = [col for col in ROW_KEY_COLUMNS if col in df.columns]
+    if not cols:
+        return np.arange(len(df), dtype=np.uint64)
+    return np.asarray(pd.util.hash_pandas_object(df[cols], index=False), dtype=np.uint64)
+
+
+def save_history(history, keys, directory):
+    """Grava o histórico preparado (com todas as liquidações) em ``directory``.
+
+    A gravação é feita numa pasta temporária renomeada no fim: quem abre o
+    armazém nunca vê arquivos pela metade, e se dois processos gravarem o
+    mesmo histórico ao mesmo tempo, o primeiro a terminar vence.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        np.save(os.path.join(tmp, 'features.npy'), history.features)
+        for i, name in enumerate(history.columns):
+            np.save(os.path.join(tmp, f'col{i}.npy'), history.columns[name])
+        markets = [m for m in MARKETS if MARKETS[m]['odd'] in history.columns]
+        for market in markets:
+            s = history.settle(market)
+            for f in SETTLEMENT_FIELDS:
+                np.save(os.path.join(tmp, f'{market}.{f}.npy'), getattr(s, f))
+        if history.dates is not None:
+            np.save(os.path.join(tmp, 'dates.npy'), history.dates)
+        if history.leagues is not None:
+            np.save(os.path.join(tmp, 'leagues.npy'), history.leagues)
+        np.save(os.path.join(tmp, 'keys.npy'), keys)
+        np.save(os.path.join(tmp, 'key_order.npy'), np.argsort(keys, kind='stable'))
+        meta = {'columns': list(history.columns), 'markets': markets, 'dates': history.dates is not None,
+                'league_names': history.league_names}
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        try:
+            os.rename(tmp, directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+            shutil.rmtree(tmp, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return directory
+
+
+def load_history(directory):
+    """Abre um histórico gravado por save_history com todos os arrays mapeados em memória."""
+    def load(name):
+        return np.load(os.path.join(directory, name), mmap_mode='r')
+
+    with open(os.path.join(directory, 'meta.json')) as f:
+        meta = json.load(f)
+    columns = {name: load(f'col{i}.npy') for i, name in enumerate(meta['columns'])}
+    history = History(features=load('features.npy'), columns=columns,
+                      dates=load('dates.npy') if meta['dates'] else None,
+                      leagues=load('leagues.npy') if meta['league_names'] is not None else None,
+                      league_names=meta['league_names'], keys=load('keys.npy'), store=directory)
+    for market in meta['markets']:
+        fields = {f: load(f'{market}.{f}.npy') for f in SETTLEMENT_FIELDS}
+        history._settlements[market] = Settlement(odd=columns[MARKETS[market]['odd']], **fields)
+    return history
+
+
+def open_history(file_name, file_content, directory=None):
+    """Histórico do arquivo enviado (filtro de ligas + VARs), preparado uma vez e compartilhado via disco."""
+    path = os.path.join(directory or default_store_dir(), store_key(file_content))
+    meta = os.path.join(path, 'meta.json')
+    if os.path.isfile(meta):
+        try:
+            os.utime(meta)  # último uso, para prune_store
+        except OSError:
+            pass
+    else:
+        df = filter_approved(read_table(file_name, file_content)).reset_index(drop=True)
+        save_history(prepare_history(df), row_keys(df), path)
+        prune_store(directory, keep=path)
+    return load_history(path)
+
+
+def find_rows(history, keys):
+    """Posição no histórico de cada chave (row_keys); -1 quando a linha não está lá."""
+    if history.keys is None:
+        raise ValueError("O histórico não tem chaves de linha (abra-o pelo armazém).")
+    keys = np.asarray(keys, dtype=np.uint64)
+    if history.store is not None:
+        order = np.load(os.path.join(history.store, 'key_order.npy'), mmap_mode='r')
+    else:
+        order = np.argsort(history.keys, kind='stable')
+    if len(order) == 0:
+        return np.full(len(keys), -1)
+    sorted_keys = np.asarray(history.keys)[order]
+    pos = np.minimum(np.searchsorted(sorted_keys, keys), len(order) - 1)
+    return np.where(sorted_keys[pos] == keys, order[pos], -1)
@@ -0,0 +1,94 @@
+"""Backtest em streaming: históricos maiores que a memória, lidos em blocos de linhas.
+
+As VARs dependem só da própria linha, então cada bloco é filtrado, preparado
+e avaliado sozinho. Por estratégia ficam apenas contadores (jogos, acertos,
+lucro) e um buffer com as últimas ``max(windows)`` apostas (acerto e lucro),
+atualizado a cada bloco. A memória fica limitada a um bloco mais
+estratégias x janela, qualquer que seja o tamanho do histórico, e o
+resultado é o mesmo da leitura completa (evaluate_approval).
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import above_thresholds, bet_sequences, match_bits, strategy_totals
+from .history import prepare_history
+from .io import iter_table
+from .leagues import filter_approved
+from .markets import MARKETS
+from .segments import segment_owner
+
+
+def _tail_buffer(offsets, win, profit, width):
+    """Últimas ``width`` apostas de cada estratégia, alinhadas à direita (estratégias x width)."""
+    k = len(offsets) - 1
+    owner = segment_owner(offsets)
+    end = offsets[1:][owner]
+    keep = end - np.arange(len(owner)) <= width
+    col = width - (end - np.arange(len(owner)))[keep]
+    valid = np.zeros((k, width), dtype=bool)
+    wins = np.zeros((k, width), dtype=bool)
+    profits = np.zeros((k, width))
+    valid[owner[keep], col] = True
+    wins[owner[keep], col] = win[keep]
+    profits[owner[keep], col] = profit[keep]
+    return valid, wins, profits
+
+
+def _merge_buffers(old, new, width):
+    """Junta dois buffers alinhados à direita mantendo as últimas ``width`` apostas de cada estratégia."""
+    valid, wins, profits = (np.concatenate([a, b], axis=1) for a, b in zip(old, new))
+    # Ordenação estável por "válida": as inválidas vão para a esquerda, as válidas mantêm a ordem
+    order = np.argsort(valid, axis=1, kind='stable')[:, -width:]
+    return tuple(np.take_along_axis(a, order, axis=1) for a in (valid, wins, profits))
+
+
+def stream_backtest(chunks, catalog, windows=(8, 40), min_profit=(0.1, 0.1), min_rate=(0.5, 0.5), strict=None):
+    """Backtest, médias móveis e aprovação de um histórico dado como sequência de blocos (DataFrames).
+
+    Devolve (jogos nas ligas aprovadas, tabela com as colunas de evaluate_approval).
+    """
+    k = len(catalog)
+    width = max(windows)
+    bets = np.zeros(k, dtype=np.int64)
+    hits = np.zeros(k, dtype=np.int64)
+    gain = np.zeros(k)
+    buffer = (np.zeros((k, width), dtype=bool), np.zeros((k, width), dtype=bool), np.zeros((k, width)))
+    n_rows = 0
+    for chunk in chunks:
+        df = filter_approved(chunk).reset_index(drop=True)
+        if df.empty:
+            continue
+        history = prepare_history(df)
+        bits = match_bits(history, catalog)
+        b, h, g = strategy_totals(history, catalog, bits)
+        bets += b
+        hits += h
+        gain += g
+        offsets, _, _, win, profit = bet_sequences(history, catalog, bits)
+        buffer = _merge_buffers(buffer, _tail_buffer(offsets, win, profit, width), width)
+        n_rows += history.n_rows
+
+    table = pd.DataFrame({
+        "Estratégia": catalog.names,
+        "Mercado": [MARKETS[m]['label'] for m in catalog.markets],
+        "Total de Jogos": bets,
+        "Acertos": hits,
+        "Taxa de Acerto": np.where(bets > 0, hits / np.maximum(bets, 1), 0.0),
+        "Lucro Total": gain,
+        "ROI": np.where(bets > 0, gain / np.maximum(bets, 1), 0.0),
+    })
+    valid, wins, profits = buffer
+    for n in windows:
+        n_bets = valid[:, -n:].sum(axis=1)
+        n_hits = (wins & valid)[:, -n:].sum(axis=1)
+        table[f"Jogos {n}"] = n_bets
+        table[f"Acertos {n}"] = n_hits
+        table[f"Média {n}"] = np.where(n_bets > 0, n_hits / np.maximum(n_bets, 1), 0.0)
+        table[f"Lucro Últimos {n}"] = np.where(valid, profits, 0.0)[:, -n:].sum(axis=1)
+    table["Acima dos Limiares"] = above_thresholds(table, windows, min_profit, min_rate, strict)
+    return n_rows, table
+
+
+def stream_file(path, catalog, chunksize=100_000, name=None, **rule):
+    """stream_backtest de um arquivo lido em blocos de ``chunksize`` linhas (ver io.iter_table)."""
+    return stream_backtest(iter_table(path, chunksize=chunksize, name=name), catalog, **rule)
@@ -0,0 +1,92 @@
+"""Varredura da odd mínima: a curva de lucro/acerto de cada estratégia em uma passada.
+
+O run_backtest das páginas descarta jogos abaixo de uma odd mínima fixa
+(1.30). Com as apostas de todas as estratégias sem esse filtro (ApprovalData),
+cada estratégia tem suas apostas ordenadas por odd uma única vez; as apostas
+com odd >= corte formam um sufixo do segmento, e jogos/acertos/lucro de
+qualquer corte saem de diferenças de somas acumuladas dentro do segmento
+(segment_cumsum), então uma estratégia tem os mesmos números sozinha ou no
+catálogo inteiro. Os cortes de todas as estratégias são localizados juntos
+por ``np.searchsorted`` numa chave (estratégia, odd).
+"""
+import numpy as np
+import pandas as pd
+
+from .markets import MARKETS
+from .segments import segment_cumsum, segment_owner
+
+DEFAULT_CUTOFFS = (1.20, 1.30, 1.40, 1.60, 2.00)
+
+
+def _sorted_bets(data):
+    """Apostas ordenadas por (estratégia, odd) com a chave de busca e as somas acumuladas."""
+    owner = segment_owner(data.offsets)
+    odd = np.where(np.isnan(data.odd), -np.inf, data.odd)  # sem odd: nunca passa em corte nenhum
+    order = np.lexsort((odd, owner))
+    odd = odd[order]
+    finite = odd[np.isfinite(odd)]
+    # Cada estratégia ocupa uma faixa [i * escala, (i + 1) * escala) da chave
+    scale = (np.ceil(finite.max()) + 1.0) if len(finite) else 1.0
+    key = owner * scale + np.clip(odd, 0.0, scale - 1.0)
+    cum_hits = np.concatenate([[0], np.cumsum(data.win[order], dtype=np.int64)])
+    cum_profit = np.concatenate([[0.0], segment_cumsum(data.profit[order], data.offsets)])
+    return odd, key, scale, cum_hits, cum_profit
+
+
+def _suffix_profit(data, cum_profit, start, end):
+    """Lucro das apostas [start, end) de cada estratégia; a soma acumulada recomeça no início do segmento."""
+    first = np.zeros(len(cum_profit), dtype=bool)
+    first[data.offsets[:-1]] = True
+    return np.where(end > start, cum_profit[end] - np.where(first[start], 0.0, cum_profit[start]), 0.0)
+
+
+def sweep_min_odds(data, cutoffs=DEFAULT_CUTOFFS):
+    """Jogos, acertos, taxa, lucro e ROI de cada estratégia para cada odd mínima (formato longo).
+
+    Corte c mantém as apostas com odd >= c, como o filtro do run_backtest.
+    """
+    _, key, scale, cum_hits, cum_profit = _sorted_bets(data)
+    k = len(data.offsets) - 1
+    cutoffs = np.asarray(cutoffs, dtype=np.float64)
+    query = np.clip(cutoffs, 1e-12, scale - 0.5)  # cortes acima de todas as odds não invadem a faixa seguinte
+    end = np.repeat(data.offsets[1:], len(cutoffs))
+    start = np.searchsorted(key, (np.arange(k)[:, None] * scale + query[None, :]).ravel())
+    bets = end - start
+    hits = cum_hits[end] - cum_hits[start]
+    profit = _suffix_profit(data, cum_profit, start, end)
+    return pd.DataFrame({
+        "Estratégia": np.repeat(data.names, len(cutoffs)),
+        "Mercado": np.repeat([MARKETS[m]['label'] for m in data.markets], len(cutoffs)),
+        "Odd Mínima": np.tile(cutoffs, k),
+        "Total de Jogos": bets,
+        "Acertos": hits,
+        "Taxa de Acerto": np.where(bets > 0, hits / np.maximum(bets, 1), 0.0),
+        "Lucro Total": profit,
+        "ROI": np.where(bets > 0, profit / np.maximum(bets, 1), 0.0),
+    })
+
+
+def odds_curve(data, index):
+    """Curva completa de uma estratégia: um ponto por odd distinta das suas apostas (da menor para a maior)."""
+    odd, _, _, cum_hits, cum_profit = _sorted_bets(data)
+    lo, hi = data.offsets[index], data.offsets[index + 1]
+    seg = odd[lo:hi]
+    valid = np.isfinite(seg)
+    first = lo + np.flatnonzero(valid & np.r_[True, seg[1:] != seg[:-1]])
+    bets = hi - first
+    hits = cum_hits[hi] - cum_hits[first]
+    profit = _suffix_profit(data, cum_profit, first, np.full(len(first), hi))
+    return pd.DataFrame({
+        "Odd Mínima": odd[first],
+        "Total de Jogos": bets,
+        "Taxa de Acerto": np.where(bets > 0, hits / np.maximum(bets, 1), 0.0),
+        "Lucro Total": profit,
+        "ROI": np.where(bets > 0, profit / np.maximum(bets, 1), 0.0),
+    })
+
+
+def best_min_odds(sweep, min_bets=1):
+    """Para cada estratégia, o corte com maior lucro entre os que mantêm pelo menos ``min_bets`` jogos."""
+    ok = sweep[sweep["Total de Jogos"] >= min_bets]
+    best = ok.sort_values("Lucro Total", ascending=False, kind='stable').drop_duplicates(["Mercado", "Estratégia"])
+    return best.sort_index().reset_index(drop=True)
@@ -0,0 +1,126 @@
+"""Aprendizado de regras por árvores de gradiente sobre VARs em bins (histogramas).
+
+As VARs são discretizadas uma única vez por quantis (como na mineração 2-D).
+Em cada nó, contagem e soma do gradiente de todas as VARs x bins saem de um
+único ``np.bincount``; somas acumuladas dão o ganho de todos os cortes
+"bin <= t" de uma vez, como nos histogramas do LightGBM. As árvores são rasas
+e ajustadas em sequência sobre os resíduos (boosting com perda quadrática),
+tendo como alvo o lucro ou o acerto liquidado do mercado.
+
+Cada caminho raiz-folha é um E de faixas contíguas de bins — exatamente uma
+estratégia ``estrategia_N`` com cláusulas ``VAR in [lo, hi]``. Jogos com VAR
+NaN não passam por nenhum corte nessa VAR (como nas páginas, onde NaN falha
+as comparações).
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import match_bits, strategy_totals
+from .bitsets import pack_rows
+from .catalog import Catalog
+from .features import VAR_NAMES
+from .markets import MARKETS
+from .miner2d import _range_bounds, quantile_bins
+
+TARGETS = {
+    'lucro': "Lucro",
+    'acerto': "Acerto"
+}
+
+
+def _best_split(bins, grad, n_bins, min_leaf):
+    """Melhor corte (VAR, t) do nó: esquerda bin <= t, direita t < bin < n_bins.
+
+    Devolve (ganho, var, t) ou None quando nenhum corte respeita ``min_leaf``.
+    """
+    n, n_vars = bins.shape
+    width = n_bins + 1  # o bin extra guarda os NaN e é descartado
+    cell = (bins.astype(np.int64) + np.arange(n_vars) * width).ravel()
+    size = n_vars * width
+    counts = np.bincount(cell, minlength=size).reshape(n_vars, width)[:, :n_bins]
+    sums = np.bincount(cell, weights=np.repeat(grad, n_vars), minlength=size).reshape(n_vars, width)[:, :n_bins]
+    n_left, s_left = counts.cumsum(axis=1)[:, :-1], sums.cumsum(axis=1)[:, :-1]
+    n_total, s_total = counts.sum(axis=1, keepdims=True), sums.sum(axis=1, keepdims=True)
+    n_right, s_right = n_total - n_left, s_total - s_left
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gain = s_left ** 2 / n_left + s_right ** 2 / n_right - s_total ** 2 / n_total
+    gain = np.where((n_left >= min_leaf) & (n_right >= min_leaf), gain, -np.inf)
+    v, t = np.unravel_index(np.argmax(gain), gain.shape)
+    if not np.isfinite(gain[v, t]) or gain[v, t] <= 0:
+        return None
+    return gain[v, t], int(v), int(t)
+
+
+def fit_tree(bins, grad, n_bins, max_depth=3, min_leaf=30):
+    """Árvore rasa sobre os bins; devolve as folhas como (faixas, linhas, valor).
+
+    ``faixas`` mapeia VAR -> (bin inicial, bin final) ao longo do caminho e
+    ``valor`` é a média do gradiente nos jogos da folha.
+    """
+    leaves = []
+    stack = [({}, np.arange(len(bins)), 0)]
+    while stack:
+        ranges, rows, depth = stack.pop()
+        split = _best_split(bins[rows], grad[rows], n_bins, min_leaf) if depth < max_depth else None
+        if split is None:
+            if ranges:
+                leaves.append((ranges, rows, float(grad[rows].mean())))
+            continue
+        _, v, t = split
+        a, b = ranges.get(v, (0, n_bins - 1))
+        col = bins[rows, v]
+        stack.append(({**ranges, v: (a, t)}, rows[col <= t], depth + 1))
+        stack.append(({**ranges, v: (t + 1, b)}, rows[(col > t) & (col < n_bins)], depth + 1))
+    return leaves
+
+
+def learn_rules(history, market, target='lucro', n_trees=10, max_depth=3, n_bins=32, min_leaf=30,
+                learning_rate=0.3, min_profit=1.0, min_roi=0.0, rows=None):
+    """Regras (caminhos raiz-folha) de árvores de gradiente ajustadas ao mercado, com backtest exato.
+
+    ``rows`` restringe as linhas usadas (ex.: só o treino). Ficam as folhas
+    distintas com pelo menos ``min_leaf`` jogos, lucro e ROI mínimos, da mais
+    lucrativa para a menos; as faixas vão na coluna interna ``_grupos``.
+    """
+    s = history.settle(market)
+    rows = np.arange(history.n_rows) if rows is None else np.asarray(rows)
+    rows = rows[s.eligible[rows]]
+    bins, bin_min, bin_max = quantile_bins(history.features, rows, n_bins=n_bins)
+    bins = bins[rows]
+    y = (s.profit if target == 'lucro' else s.win.astype(np.float64))[rows]
+
+    prediction = np.full(len(rows), y.mean() if len(rows) else 0.0)
+    paths = {}
+    for _ in range(n_trees):
+        leaves = fit_tree(bins, y - prediction, n_bins, max_depth=max_depth, min_leaf=min_leaf)
+        if not leaves:
+            break
+        for ranges, leaf_rows, value in leaves:
+            prediction[leaf_rows] += learning_rate * value
+            paths.setdefault(tuple(sorted(ranges.items())), len(paths))
+
+    columns = ["Mercado", "Regra", "Cláusulas", "Total de Jogos", "Acertos", "Taxa de Acerto", "Lucro Total",
+               "ROI", "_grupos"]
+    if not paths:
+        return pd.DataFrame(columns=columns)
+    groups = [[[(VAR_NAMES[v], *_range_bounds(bin_min[v], bin_max[v], a, b))] for v, (a, b) in path]
+              for path in paths]
+    catalog = Catalog.from_rules([(f"Regra {k + 1}", market, g) for k, g in enumerate(groups)])
+    in_rows = np.zeros(history.n_rows, dtype=bool)
+    in_rows[rows] = True
+    bets, hits, gain = strategy_totals(history, catalog, match_bits(history, catalog) & pack_rows(in_rows)[0])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = pd.DataFrame({
+            "Mercado": MARKETS[market]['label'],
+            "Regra": [" & ".join(f"{var} in [{lo:.4f}, {hi:.4f}]" for (var, lo, hi), in g) for g in groups],
+            "Cláusulas": [len(g) for g in groups],
+            "Total de Jogos": bets,
+            "Acertos": hits,
+            "Taxa de Acerto": np.where(bets > 0, hits / bets, 0.0),
+            "Lucro Total": gain,
+            "ROI": np.where(bets > 0, gain / bets, 0.0),
+            "_grupos": groups,
+        })
+    result = result[(result["Total de Jogos"] >= min_leaf) & (result["Lucro Total"] >= min_profit)
+                    & (result["ROI"] >= min_roi)]
+    return result.sort_values("Lucro Total", ascending=False, kind='stable').reset_index(drop=True)
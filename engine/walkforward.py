@@ -0,0 +1,112 @@
+"""Validação walk-forward (fora da amostra) de todas as estratégias de um catálogo.
+
+O histórico é dividido em folds cronológicos treino/teste. As somas de jogos,
+acertos e lucro de cada estratégia são obtidas por segmento entre as fronteiras
+dos folds numa única passada sobre os bitsets; os totais de cada fold saem de
+diferenças de somas acumuladas. Blocos de estratégias rodam em processos
+separados.
+"""
+import numpy as np
+import pandas as pd
+
+from .backtest import match_bits
+from .bitsets import weighted_sums
+from .markets import MARKETS
+from .parallel import default_jobs, map_blocks, split_blocks
+
+_MIN_BLOCK = 256
+
+
+def make_folds(n_rows, n_folds=5, train_size=0.5, anchored=False):
+    """Lista de folds (treino_ini, treino_fim, teste_fim) em ordem cronológica.
+
+    O primeiro treino ocupa ``train_size`` do histórico e o restante é dividido
+    em ``n_folds`` blocos de teste. Com ``anchored=True`` o treino sempre começa
+    na primeira linha (janela expansiva); senão a janela de treino desliza.
+    """
+    first_train = int(round(n_rows * train_size))
+    test_len = (n_rows - first_train) // n_folds if n_folds > 0 else 0
+    if first_train < 1 or test_len < 1:
+        raise ValueError("Histórico curto demais para a quantidade de folds pedida.")
+    folds = []
+    for k in range(n_folds):
+        train_end = first_train + k * test_len
+        test_end = n_rows if k == n_folds - 1 else train_end + test_len
+        folds.append((0 if anchored else train_end - first_train, train_end, test_end))
+    return folds
+
+
+def _segment_sums(task):
+    """Jogos, acertos e lucro por segmento para um bloco de estratégias -> (k, S, 3)."""
+    bits, n_rows, segment, n_segments, win, profit = task
+    rows = np.arange(n_rows)
+    weights = np.zeros((n_rows, n_segments, 3))
+    weights[rows, segment, 0] = 1.0
+    weights[rows, segment, 1] = win
+    weights[rows, segment, 2] = profit
+    sums = weighted_sums(bits, n_rows, weights.reshape(n_rows, -1), block=64)
+    return sums.reshape(len(bits), n_segments, 3)
+
+
+def walk_forward(history, catalog, folds=None, bits=None, n_jobs=None, **fold_options):
+    """Métricas de treino e teste por fold e o agregado fora da amostra por estratégia.
+
+    Retorna ``(por_fold, resumo)``. No resumo, "Lucro OOS Selecionado" soma o
+    lucro de teste apenas dos folds em que a estratégia teve lucro no treino,
+    simulando a regra "só aposto no que estava lucrando".
+    """
+    n = history.n_rows
+    folds = folds or make_folds(n, **fold_options)
+    if bits is None:
+        bits = match_bits(history, catalog)
+    edges = np.unique([0, n] + [edge for fold in folds for edge in fold])
+    segment = np.searchsorted(edges, np.arange(n), side='right') - 1
+    n_segments = len(edges) - 1
+
+    n_jobs = default_jobs() if n_jobs is None else n_jobs
+    sums = np.zeros((len(catalog), n_segments, 3))
+    markets = np.array(catalog.markets)
+    for market in np.unique(markets):
+        rows = np.flatnonzero(markets == market)
+        s = history.settle(market)
+        blocks = split_blocks(len(rows), min(n_jobs, -(-len(rows) // _MIN_BLOCK)))
+        profit = np.where(np.isnan(s.profit), 0.0, s.profit)  # 0 x NaN contaminaria a soma densa
+        tasks = [(bits[rows[a:b]], n, segment, n_segments, s.win.astype(np.float64), profit)
+                 for a, b in blocks]
+        for (a, b), block_sums in zip(blocks, map_blocks(_segment_sums, tasks, n_jobs)):
+            sums[rows[a:b]] = block_sums
+
+    cum = np.concatenate([np.zeros((len(catalog), 1, 3)), np.cumsum(sums, axis=1)], axis=1)
+    pos = {edge: i for i, edge in enumerate(edges)}
+    train = np.stack([cum[:, pos[b]] - cum[:, pos[a]] for a, b, _ in folds], axis=1)
+    test = np.stack([cum[:, pos[c]] - cum[:, pos[b]] for _, b, c in folds], axis=1)
+
+    n_folds = len(folds)
+    labels = [MARKETS[m]['label'] for m in catalog.markets]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_fold = pd.DataFrame({
+            "Estratégia": np.repeat(catalog.names, n_folds),
+            "Mercado": np.repeat(labels, n_folds),
+            "Fold": np.tile(np.arange(1, n_folds + 1), len(catalog)),
+            "Jogos Treino": train[..., 0].ravel().astype(np.int64),
+            "Acertos Treino": train[..., 1].ravel().astype(np.int64),
+            "Lucro Treino": train[..., 2].ravel(),
+            "Jogos Teste": test[..., 0].ravel().astype(np.int64),
+            "Acertos Teste": test[..., 1].ravel().astype(np.int64),
+            "Lucro Teste": test[..., 2].ravel(),
+        })
+        oos = test.sum(axis=1)
+        selected = np.where(train[..., 2] > 0, test[..., 2], 0.0).sum(axis=1)
+        summary = pd.DataFrame({
+            "Estratégia": catalog.names,
+            "Mercado": labels,
+            "Jogos In-Sample": cum[:, -1, 0].astype(np.int64),
+            "Lucro In-Sample": cum[:, -1, 2],
+            "Jogos OOS": oos[:, 0].astype(np.int64),
+            "Taxa de Acerto OOS": np.where(oos[:, 0] > 0, oos[:, 1] / oos[:, 0], 0.0),
+            "Lucro OOS": oos[:, 2],
+            "ROI OOS": np.where(oos[:, 0] > 0, oos[:, 2] / oos[:, 0], 0.0),
+            "Folds Positivos": (test[..., 2] > 0).sum(axis=1),
+            "Lucro OOS Selecionado": selected,
+        })
+    return per_fold, summary
@@ -0,0 +1,87 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from engine import MARKETS, filter_approved, read_table, simulate_games
+from engine.simulation import SIM_METHODS
+
+# --- Função com cache: a simulação só é refeita quando o arquivo ou os parâmetros mudam ---
+@st.cache_data(show_spinner=False)
+def run_simulation(file_name, file_content, only_approved, method, n_sims, seed):
+    """Lê os jogos do dia e simula todos de uma vez a partir das odds."""
+    df = read_table(file_name, file_content)
+    if only_approved:
+        df = filter_approved(df)
+    df = df.reset_index(drop=True)
+    result, grids = simulate_games(df, method=method, n_sims=n_sims, seed=seed)
+    return df, result, grids
+
+# Título da aplicação
+st.title("Simulações de Jogos")
+st.write("""
+    Para cada jogo do dia, as odds 1X2 e Over/Under 2.5 (sem a margem da casa) definem as médias de gols de
+    mandante e visitante num modelo de Poisson. Da grade de placares saem as probabilidades do modelo para todos
+    os mercados das páginas e o valor esperado (VE) de 1 unidade apostada em cada um, na odd do arquivo.
+""")
+
+st.header("Upload dos Jogos do Dia")
+uploaded_daily = st.file_uploader(
+    "Faça upload da planilha com os jogos do dia (.xlsx ou .csv)",
+    type=["xlsx", "csv"],
+    key="daily_simulacoes"
+)
+
+if uploaded_daily is not None:
+    col1, col2, col3 = st.columns(3)
+    method = col1.radio("Método", options=list(SIM_METHODS), format_func=SIM_METHODS.get)
+    n_sims = col2.select_slider("Simulações por jogo", options=[1_000, 10_000, 100_000, 1_000_000], value=100_000,
+                                disabled=method != 'monte_carlo')
+    only_approved = col3.checkbox("Somente ligas aprovadas", value=True)
+
+    try:
+        with st.spinner("Simulando os jogos..."):
+            df_daily, resultado, grades = run_simulation(uploaded_daily.name, uploaded_daily.getvalue(),
+                                                         only_approved, method, n_sims, 0)
+    except Exception as e:
+        st.error(f"Erro ao simular os jogos do dia: {e}")
+        resultado = None
+
+    if resultado is not None and resultado.empty:
+        st.info("Nenhum jogo do dia para simular.")
+    elif resultado is not None:
+        sem_odds = int(resultado["λ Casa"].isna().sum())
+        if sem_odds:
+            st.warning(f"{sem_odds} jogos sem odds 1X2 ou Over/Under 2.5 ficaram sem simulação.")
+
+        mercados = st.multiselect("Mercados", options=list(MARKETS), format_func=lambda m: MARKETS[m]['label'],
+                                  default=list(MARKETS)[:5])
+        so_valor = st.checkbox("Somente jogos com VE positivo em algum mercado escolhido", value=False)
+
+        cols = [col for col in ('Time', 'League', 'Home', 'Away') if col in df_daily.columns]
+        colunas = ["λ Casa", "λ Fora"] + [f"{prefixo} {MARKETS[m]['label']}" for m in mercados
+                                          for prefixo in ("Prob.", "VE")]
+        tabela = pd.concat([df_daily[cols], resultado[colunas]], axis=1)
+        if so_valor:
+            ve = resultado[[f"VE {MARKETS[m]['label']}" for m in mercados]]
+            tabela = tabela[(ve > 0).any(axis=1)]
+
+        st.header("🎲 Probabilidades do Modelo")
+        st.dataframe(tabela.style.format({
+            col: ("{:.2%}" if col.startswith(("Prob.", "VE")) else "{:.2f}")
+            for col in colunas
+        }))
+
+        with st.expander("🔢 Grade de placares de um jogo"):
+            times = [c for c in ('Home', 'Away') if c in df_daily.columns]
+            rotulos = [" x ".join(str(df_daily.at[i, c]) for c in times) or f"Jogo {i + 1}"
+                       for i in range(len(df_daily))]
+            jogo = st.selectbox("Jogo", options=range(len(df_daily)), format_func=rotulos.__getitem__)
+            if np.isfinite(grades[jogo]).all():
+                exibidos = 7  # placares de 0 a 6 gols por equipe
+                fig = px.imshow(grades[jogo][:exibidos, :exibidos] * 100, text_auto=".1f", aspect="auto",
+                                labels={'x': "Gols Fora", 'y': "Gols Casa", 'color': "%"},
+                                color_continuous_scale="Greens")
+                st.plotly_chart(fig)
+            else:
+                st.write("Jogo sem odds suficientes para a simulação.")
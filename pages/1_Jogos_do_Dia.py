@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import io # Necessário para ler o buffer do arquivo carregado
 
+from engine import (MARKETS, ODDS_COLUMNS, approval_data, compile_expression, compute_features, evaluate_approval,
+                    expressions_catalog, filter_approved, prepare_history, read_table)
+
 # --- Função Auxiliar para Carregar Dados ---
 def load_dataframe(uploaded_file):
     """Carrega um DataFrame de um arquivo XLSX ou CSV carregado via Streamlit."""
@@ -65,32 +67,66 @@ APPROVED_LEAGUES = set([
 ])
 # --- FIM: Definição das Ligas Aprovadas ---
 
-# --- Função Removida: run_backtest ---
-# --- Função Removida: check_moving_averages ---
+# --- Backtest e Médias Móveis no Histórico (motor vetorizado) ---
+# Mercado em que cada estratégia é liquidada. "Over 0.5" é liquidada como Lay 0x0:
+# o lay ganha sempre que sai gol e perde a responsabilidade no 0x0.
+STRATEGY_MARKETS = {
+    "Lay 0x0_(98%)": 'lay_cs_0x0',
+    "Lay 1x1(96%)": 'lay_cs_1x1',
+    "Over 0.5_(95%)": 'lay_cs_0x0'
+}
+
+# Estratégias na linguagem de expressões do motor (engine/expr.py): "VARxx in [lo, hi]", and, or e parênteses.
+# Cada texto é lido e compilado uma vez; a avaliação não cria uma máscara por & / |.
+STRATEGY_EXPRESSIONS = {
+    #"Lay0x0_1(95%)": "VAR24 in [0.274, 0.33] and VAR39 in [0.84, 4.0]",
+    #"Lay0x0_2(95%)": "VAR25 in [0.44, 0.60] and VAR39 in [0.84, 4.0]",
+    "Lay 0x0_(98%)": "(VAR41 in [0.2335, 0.3310] or VAR75 in [0.4838, 0.7777])"
+                     " and (VAR68 in [1.891, 2.406] or VAR14 in [0.954, 1.03] or VAR60 in [0.0664, 0.084]"
+                     " or VAR06 in [0.403, 0.53])",
+    "Lay 1x1(96%)": "VAR29 in [0.09, 0.10]"
+                    " and (VAR30 in [0.4333, 0.8636] or VAR05 in [2.8571, 5.5944] or VAR62 in [10.4432, 16.0214]"
+                    " or VAR69 in [-2.3481, -1.0145] or VAR19 in [0.9826, 1.3819])",
+    "Over 0.5_(95%)": "(VAR24 in [0.274, 0.33] or VAR25 in [0.44, 0.60]) and VAR39 in [0.84, 4.0]",
+}
+STRATEGIES = {nome: compile_expression(texto) for nome, texto in STRATEGY_EXPRESSIONS.items()}
+
+@st.cache_data(show_spinner=False)
+def run_backtest(file_name, file_content):
+    """Apostas das estratégias desta página no histórico, com lucro de lay (acerto +1, erro -(odd-1)).
+
+    Retorna (jogos no histórico, apostas prontas para evaluate_approval, estratégias sem coluna de odd).
+    Janelas e limiares da barra lateral são aplicados depois, sem refazer o backtest.
+    """
+    df = filter_approved(read_table(file_name, file_content)).reset_index(drop=True)
+    mercados = {nome: m for nome, m in STRATEGY_MARKETS.items() if MARKETS[m]['odd'] in df.columns}
+    sem_odd = [nome for nome in STRATEGY_MARKETS if nome not in mercados]
+
+    historico = prepare_history(df)
+    catalogo = expressions_catalog(STRATEGIES, mercados)
+    return historico.n_rows, approval_data(historico, catalogo), sem_odd
 
 # Analisar jogos do dia
-def analyze_daily_games(df_daily, estrategia_func):
-    """Aplica uma função de estratégia a um DataFrame e retorna os jogos filtrados."""
-    # Verifica se colunas necessárias existem antes de aplicar a estratégia
-    required_cols = ['Odd_H_Back', 'Odd_D_Back', 'Odd_A_Back', 'Odd_Over25_FT_Back', 'Odd_Under25_FT_Back',
-                     'Odd_BTTS_Yes_Back', 'Odd_BTTS_No_Back', 'Odd_CS_0x0_Lay', 'Odd_CS_0x1_Lay', 'Odd_CS_1x0_Lay']
-    missing_cols = [col for col in required_cols if col not in df_daily.columns]
+def daily_features(df_daily):
+    """VARs usadas pelas estratégias nos jogos do dia, calculadas uma vez para todas; None se faltar odd."""
+    # Verifica se colunas necessárias existem antes de aplicar as estratégias
+    missing_cols = [col for col in ODDS_COLUMNS if col not in df_daily.columns]
     if missing_cols:
         #st.warning(f"Colunas necessárias para as estratégias não encontradas no arquivo: {', '.join(missing_cols)}. Pulando análise.")
-        # Retorna None ou DataFrame vazio para indicar falha
-        return pd.DataFrame() # Retorna DataFrame vazio para consistência
-
-    # Calcula as variáveis *apenas para os jogos do dia*
+        return None
     try:
-        vars_dict = pre_calculate_all_vars(df_daily)
-        # Aplica a função da estratégia específica
-        # A função estrategia_func agora opera diretamente sobre df_daily usando as vars_dict calculadas
-        df_filtrado = estrategia_func(df_daily, vars_dict) # Passa vars_dict para a função
+        return compute_features(df_daily, sorted({i for e in STRATEGIES.values() for i in e.var_indices}))
     except Exception as e:
-        st.error(f"Erro ao calcular variáveis ou aplicar estratégia nos jogos do dia: {e}")
-        return pd.DataFrame() # Retorna DataFrame vazio em caso de erro
+        st.error(f"Erro ao calcular variáveis nos jogos do dia: {e}")
+        return None
 
-    if df_filtrado is not None and not df_filtrado.empty:
+def analyze_daily_games(df_daily, expressao, features):
+    """Aplica uma estratégia compilada aos jogos do dia e retorna os jogos filtrados."""
+    if features is None:
+        return pd.DataFrame() # Retorna DataFrame vazio para consistência
+    df_filtrado = df_daily[expressao.evaluate(features)]
+
+    if not df_filtrado.empty:
         # Ajuste para incluir colunas relevantes se existirem
         cols_to_return = ['Time', 'League', 'Home', 'Away'] # Adiciona League por padrão
         # Garante que apenas colunas existentes sejam selecionadas
@@ -102,139 +138,50 @@ def analyze_daily_games(df_daily, estrategia_func):
              return pd.DataFrame()
     return pd.DataFrame() # Retorna DataFrame vazio se não houver jogos aprovados
 
-# Pre-calcular variáveis (mantida como estava, pois é necessária para as estratégias)
-
-
-# Pre-calcular variáveis
-def pre_calculate_all_vars(df):
-    probs = {
-        'pH': 1 / df['Odd_H_Back'],
-        'pD': 1 / df['Odd_D_Back'],
-        'pA': 1 / df['Odd_A_Back'],
-        'pOver': 1 / df['Odd_Over25_FT_Back'],
-        'pUnder': 1 / df['Odd_Under25_FT_Back'],
-        'pBTTS_Y': 1 / df['Odd_BTTS_Yes_Back'],
-        'pBTTS_N': 1 / df['Odd_BTTS_No_Back'],
-        'p0x0': 1 / df['Odd_CS_0x0_Lay'],
-        'p0x1': 1 / df['Odd_CS_0x1_Lay'],
-        'p1x0': 1 / df['Odd_CS_1x0_Lay']
-    }
-    
-    vars_dict = {
-        'VAR01': probs['pH'] / probs['pD'],
-        'VAR02': probs['pH'] / probs['pA'],
-        'VAR03': probs['pD'] / probs['pH'],
-        'VAR04': probs['pD'] / probs['pA'],
-        'VAR05': probs['pA'] / probs['pH'],
-        'VAR06': probs['pA'] / probs['pD'],
-        'VAR07': probs['pOver'] / probs['pUnder'],
-        'VAR08': probs['pUnder'] / probs['pOver'],
-        'VAR09': probs['pBTTS_Y'] / probs['pBTTS_N'],
-        'VAR10': probs['pBTTS_N'] / probs['pBTTS_Y'],
-        'VAR11': probs['pH'] / probs['pOver'],
-        'VAR12': probs['pD'] / probs['pOver'],
-        'VAR13': probs['pA'] / probs['pOver'],
-        'VAR14': probs['pH'] / probs['pUnder'],
-        'VAR15': probs['pD'] / probs['pUnder'],
-        'VAR16': probs['pA'] / probs['pUnder'],
-        'VAR17': probs['pH'] / probs['pBTTS_Y'],
-        'VAR18': probs['pD'] / probs['pBTTS_Y'],
-        'VAR19': probs['pA'] / probs['pBTTS_Y'],
-        'VAR20': probs['pH'] / probs['pBTTS_N'],
-        'VAR21': probs['pD'] / probs['pBTTS_N'],
-        'VAR22': probs['pA'] / probs['pBTTS_N'],
-        'VAR23': probs['p0x0'] / probs['pH'],
-        'VAR24': probs['p0x0'] / probs['pD'],
-        'VAR25': probs['p0x0'] / probs['pA'],
-        'VAR26': probs['p0x0'] / probs['pOver'],
-        'VAR27': probs['p0x0'] / probs['pUnder'],
-        'VAR28': probs['p0x0'] / probs['pBTTS_Y'],
-        'VAR29': probs['p0x0'] / probs['pBTTS_N'],
-        'VAR30': probs['p0x1'] / probs['pH'],
-        'VAR31': probs['p0x1'] / probs['pD'],
-        'VAR32': probs['p0x1'] / probs['pA'],
-        'VAR33': probs['p0x1'] / probs['pOver'],
-        'VAR34': probs['p0x1'] / probs['pUnder'],
-        'VAR35': probs['p0x1'] / probs['pBTTS_Y'],
-        'VAR36': probs['p0x1'] / probs['pBTTS_N'],
-        'VAR37': probs['p1x0'] / probs['pH'],
-        'VAR38': probs['p1x0'] / probs['pD'],
-        'VAR39': probs['p1x0'] / probs['pA'],
-        'VAR40': probs['p1x0'] / probs['pOver'],
-        'VAR41': probs['p1x0'] / probs['pUnder'],
-        'VAR42': probs['p1x0'] / probs['pBTTS_Y'],
-        'VAR43': probs['p1x0'] / probs['pBTTS_N'],
-        'VAR44': probs['p0x0'] / probs['p0x1'],
-        'VAR45': probs['p0x0'] / probs['p1x0'],
-        'VAR46': probs['p0x1'] / probs['p0x0'],
-        'VAR47': probs['p0x1'] / probs['p1x0'],
-        'VAR48': probs['p1x0'] / probs['p0x0'],
-        'VAR49': probs['p1x0'] / probs['p0x1'],
-        'VAR50': (probs['pH'].to_frame().join(probs['pD'].to_frame()).join(probs['pA'].to_frame())).std(axis=1) /
-                 (probs['pH'].to_frame().join(probs['pD'].to_frame()).join(probs['pA'].to_frame())).mean(axis=1),
-        'VAR51': (probs['pOver'].to_frame().join(probs['pUnder'].to_frame())).std(axis=1) /
-                 (probs['pOver'].to_frame().join(probs['pUnder'].to_frame())).mean(axis=1),
-        'VAR52': (probs['pBTTS_Y'].to_frame().join(probs['pBTTS_N'].to_frame())).std(axis=1) /
-                 (probs['pBTTS_Y'].to_frame().join(probs['pBTTS_N'].to_frame())).mean(axis=1),
-        'VAR53': (probs['p0x0'].to_frame().join(probs['p0x1'].to_frame()).join(probs['p1x0'].to_frame())).std(axis=1) /
-                 (probs['p0x0'].to_frame().join(probs['p0x1'].to_frame()).join(probs['p1x0'].to_frame())).mean(axis=1),
-        'VAR54': abs(probs['pH'] - probs['pA']),
-        'VAR55': abs(probs['pH'] - probs['pD']),
-        'VAR56': abs(probs['pD'] - probs['pA']),
-        'VAR57': abs(probs['pOver'] - probs['pUnder']),
-        'VAR58': abs(probs['pBTTS_Y'] - probs['pBTTS_N']),
-        'VAR59': abs(probs['p0x0'] - probs['p0x1']),
-        'VAR60': abs(probs['p0x0'] - probs['p1x0']),
-        'VAR61': abs(probs['p0x1'] - probs['p1x0']),
-        'VAR62': np.arctan((probs['pA'] - probs['pH']) / 2) * 180 / np.pi,
-        'VAR63': np.arctan((probs['pD'] - probs['pH']) / 2) * 180 / np.pi,
-        'VAR64': np.arctan((probs['pA'] - probs['pD']) / 2) * 180 / np.pi,
-        'VAR65': np.arctan((probs['pUnder'] - probs['pOver']) / 2) * 180 / np.pi,
-        'VAR66': np.arctan((probs['pBTTS_N'] - probs['pBTTS_Y']) / 2) * 180 / np.pi,
-        'VAR67': np.arctan((probs['p0x1'] - probs['p0x0']) / 2) * 180 / np.pi,
-        'VAR68': np.arctan((probs['p1x0'] - probs['p0x0']) / 2) * 180 / np.pi,
-        'VAR69': np.arctan((probs['p1x0'] - probs['p0x1']) / 2) * 180 / np.pi,
-        'VAR70': abs(probs['pH'] - probs['pA']) / probs['pA'],
-        'VAR71': abs(probs['pH'] - probs['pD']) / probs['pD'],
-        'VAR72': abs(probs['pD'] - probs['pA']) / probs['pA'],
-        'VAR73': abs(probs['pOver'] - probs['pUnder']) / probs['pUnder'],
-        'VAR74': abs(probs['pBTTS_Y'] - probs['pBTTS_N']) / probs['pBTTS_N'],
-        'VAR75': abs(probs['p0x0'] - probs['p0x1']) / probs['p0x1'],
-        'VAR76': abs(probs['p0x0'] - probs['p1x0']) / probs['p1x0'],
-        'VAR77': abs(probs['p0x1'] - probs['p1x0']) / probs['p1x0']
-    }
-    return vars_dict
-
-# Definição das estratégias
-# Modificado para aceitar df e vars_dict como argumentos
-def define_strategies():
-    """Retorna uma lista de tuplas (função_estrategia, nome_estrategia)."""
-    #def estrategia_1(df, vars_dict): return df[(vars_dict['VAR24'] >= 0.274) & (vars_dict['VAR24'] <= 0.33) & (vars_dict['VAR39'] >= 0.84) & (vars_dict['VAR39'] <= 4.0)].copy()
-    #def estrategia_2(df, vars_dict): return df[(vars_dict['VAR25'] >= 0.44) & (vars_dict['VAR25'] <= 0.60) & (vars_dict['VAR39'] >= 0.84) & (vars_dict['VAR39'] <= 4.0)].copy()
-    def estrategia_3(df, vars_dict): return df[((vars_dict['VAR41'] >= 0.2335) & (vars_dict['VAR41'] <= 0.3310) | (vars_dict['VAR75'] >= 0.4838) & (vars_dict['VAR75'] <= 0.7777)) 
-                                               & ((vars_dict['VAR68'] >= 1.891) & (vars_dict['VAR68'] <= 2.406) | (vars_dict['VAR14'] >= 0.954) & (vars_dict['VAR14'] <= 1.03) | (vars_dict['VAR60'] >= 0.0664) & (vars_dict['VAR60'] <= 0.084) | (vars_dict['VAR06'] >= 0.403) & (vars_dict['VAR06'] <= 0.53))].copy()
-    def estrategia_4(df, vars_dict):
-     return df[((vars_dict['VAR29'] >= 0.09) & (vars_dict['VAR29'] <= 0.10)) &
-              ((vars_dict['VAR30'] >= 0.4333) & (vars_dict['VAR30'] <= 0.8636) |
-               (vars_dict['VAR05'] >= 2.8571) & (vars_dict['VAR05'] <= 5.5944) |
-               (vars_dict['VAR62'] >= 10.4432) & (vars_dict['VAR62'] <= 16.0214) |
-               (vars_dict['VAR69'] >= -2.3481) & (vars_dict['VAR69'] <= -1.0145) |
-               (vars_dict['VAR19'] >= 0.9826) & (vars_dict['VAR19'] <= 1.3819))].copy()
-    
-    def estrategia_5(df, vars_dict):
-     return df[((vars_dict['VAR24'] >= 0.274) & (vars_dict['VAR24'] <= 0.33) | (vars_dict['VAR25'] >= 0.44) & (vars_dict['VAR25'] <= 0.60)) &
-              ((vars_dict['VAR39'] >= 0.84) & (vars_dict['VAR39'] <= 4.0))].copy()
-                                               
+# --- Interface Streamlit ---
+st.title("Análise de Jogos do Dia por Estratégia")
 
+st.header("Validação no Histórico (opcional)")
+uploaded_historical = st.file_uploader(
+    "Faça upload da planilha histórica (.xlsx ou .csv) para revalidar as estratégias",
+    type=["xlsx", "csv"],
+    key="hist_jogos_do_dia"
+)
 
-    return [
-        #(estrategia_1, "Lay0x0_1(95%)"), (estrategia_2, "Lay0x0_2(95%)"),
-        (estrategia_3, "Lay 0x0_(98%)"),(estrategia_4, "Lay 1x1(96%)"), (estrategia_5, "Over 0.5_(95%)")
-        
-   ]
+# Critério de aprovação do Lay de placar exato (padrão: acima de 95% nos últimos 80 e 170 jogos)
+st.sidebar.header("⚙️ Regra de Aprovação")
+col1, col2 = st.sidebar.columns(2)
+janela_curta = col1.number_input("Janela curta", min_value=1, value=80, step=10)
+janela_longa = col2.number_input("Janela longa", min_value=1, value=170, step=10)
+media_curta = col1.number_input("Acerto curta (>)", min_value=0.0, max_value=1.0, value=0.95, step=0.01)
+media_longa = col2.number_input("Acerto longa (>)", min_value=0.0, max_value=1.0, value=0.95, step=0.01)
 
-# --- Interface Streamlit ---
-st.title("Análise de Jogos do Dia por Estratégia")
+estrategias_aprovadas = None # None = sem histórico, nenhuma estratégia é marcada
+if uploaded_historical is not None:
+    try:
+        total_historico, apostas, sem_odd = run_backtest(uploaded_historical.name, uploaded_historical.getvalue())
+        janelas = (int(janela_curta), int(janela_longa))
+        avaliacao = evaluate_approval(apostas, windows=janelas, min_profit=None, min_rate=(media_curta, media_longa),
+                                      strict=(True, True))
+    except Exception as e:
+        st.error(f"Erro ao processar o histórico '{uploaded_historical.name}': {e}")
+    else:
+        if sem_odd:
+            st.warning(f"Coluna de odd ausente no histórico; estratégias não validadas: {', '.join(sem_odd)}")
+        if total_historico == 0:
+            st.info("Não há dados históricos nas ligas aprovadas para validar.")
+        else:
+            st.success(f"{total_historico} jogos históricos nas ligas aprovadas.")
+            estrategias_aprovadas = set(avaliacao.loc[avaliacao["Acima dos Limiares"], "Estratégia"])
+            colunas_backtest = ["Total de Jogos", "Acertos", "Taxa de Acerto", "Lucro Total", "ROI"]
+            resultados_backtest = avaliacao[["Estratégia", "Mercado"] + colunas_backtest[:-1]]
+            medias_moveis = avaliacao.drop(columns=colunas_backtest)
+            with st.expander("Resultados do Backtest"):
+                st.dataframe(resultados_backtest.style.format({"Taxa de Acerto": "{:.2%}", "Lucro Total": "{:.2f}"}))
+            with st.expander("Médias Móveis"):
+                formatos = {f"Média {n}": "{:.2%}" for n in janelas}
+                formatos.update({f"Lucro Últimos {n}": "{:.2f}" for n in janelas})
+                st.dataframe(medias_moveis.style.format(formatos))
 
 st.header("Upload da Planilha dos Jogos do Dia")
 uploaded_daily = st.file_uploader(
@@ -250,10 +197,8 @@ if uploaded_daily is not None:
         # Filtro de Ligas (Jogos do Dia)
         df_daily = df_daily_original.copy() # Começa com todos os jogos
         if 'League' in df_daily_original.columns:
-            # Garante que a coluna League seja string para comparação
-            df_daily_original['League'] = df_daily_original['League'].astype(str).str.upper().str.strip()
-            # Filtra pelas ligas aprovadas
-            df_daily = df_daily_original[df_daily_original['League'].isin(APPROVED_LEAGUES)].copy()
+            # Filtra pelas ligas aprovadas (nomes normalizados pelo motor: maiúsculas, sem espaços nas pontas)
+            df_daily = filter_approved(df_daily_original, APPROVED_LEAGUES)
             if df_daily.empty and not df_daily_original.empty:
                  st.warning("Nenhum jogo na planilha pertence às ligas aprovadas listadas.")
             elif not df_daily.empty:
@@ -263,22 +208,24 @@ if uploaded_daily is not None:
             # df_daily já é a cópia original neste caso
 
         if not df_daily.empty:
-            # Define as estratégias
-            estrategias = define_strategies()
+            # VARs dos jogos do dia, calculadas uma vez para todas as estratégias
+            features = daily_features(df_daily)
             jogos_aprovados_por_estrategia = {}
             algum_jogo_aprovado = False
 
             st.header("Resultados da Análise")
 
             # Itera sobre cada estratégia definida
-            for estrategia_func, estrategia_nome in estrategias:
+            for estrategia_nome, expressao in STRATEGIES.items():
                 # Roda a análise para a estratégia atual nos jogos do dia filtrados
-                # A função analyze_daily_games agora lida com o cálculo de VARs internamente
-                jogos_aprovados = analyze_daily_games(df_daily.copy(), estrategia_func) # Passa a função diretamente
+                jogos_aprovados = analyze_daily_games(df_daily, expressao, features)
 
                 # Verifica se a análise retornou algum jogo
                 if jogos_aprovados is not None and not jogos_aprovados.empty:
-                    st.subheader(f"✅ {estrategia_nome}")
+                    if estrategias_aprovadas is None or estrategia_nome in estrategias_aprovadas:
+                        st.subheader(f"✅ {estrategia_nome}")
+                    else:
+                        st.subheader(f"⚠️ {estrategia_nome} (não aprovada no histórico)")
                     st.dataframe(jogos_aprovados)
                     jogos_aprovados_por_estrategia[estrategia_nome] = jogos_aprovados
                     algum_jogo_aprovado = True
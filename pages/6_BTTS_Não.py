@@ -2,6 +2,12 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import io # Necessário para ler o buffer do arquivo carregado
+import os
+
+from engine import (MARKETS, PAGE_MARKETS, approval_data, evaluate_approval, filter_approved,
+                    load_page_catalog, prepare_history, read_table)
+
+PAGE = os.path.basename(__file__)  # estratégias e mercado desta página no motor
 
 # --- Função Auxiliar para Carregar Dados ---
 def load_dataframe(uploaded_file):
@@ -61,92 +67,22 @@ APPROVED_LEAGUES = set([
 # Título da aplicação
 st.title("Ambas Marcam-Não")
 
-# Função genérica de Backtest (mantida como no seu exemplo)
-def run_backtest(df, estrategia_func, estrategia_nome):
-     # Filtrar pela Odd_H_Back maior que 1.30
-    df = df[df['Odd_BTTS_No_Back'] >= 1.3]
-     # Aplicar a estratégia
-    df_filtrado = estrategia_func(df)
-    df_filtrado['Total_Goals'] = df_filtrado['Goals_H'] + df_filtrado['Goals_A']
-    
-    # Verifica se o df_filtrado não está vazio antes de calcular o Profit
-    if not df_filtrado.empty:
-        df_filtrado['Profit'] = df_filtrado.apply(
-            lambda row: (row['Odd_BTTS_No_Back'] - 1) if row['Goals_H'] == 0 or row['Goals_A'] == 0 else -1,
-            axis=1
-        )
-        total_jogos = len(df_filtrado)
-        acertos = len(df_filtrado[(df_filtrado['Goals_H'] == 0) | (df_filtrado['Goals_A'] == 0)])
-        taxa_acerto = acertos / total_jogos if total_jogos > 0 else 0
-        lucro_total = df_filtrado['Profit'].sum()
-    else:
-        # Define valores padrão se não houver jogos após o filtro da estratégia
-        total_jogos = 0
-        acertos = 0
-        taxa_acerto = 0
-        lucro_total = 0.0
-        # Retorna um DataFrame vazio com as colunas esperadas se necessário, 
-        # ou ajusta a lógica downstream para lidar com df_filtrado vazio.
-        # Aqui, vamos garantir que df_filtrado tenha a coluna Profit se não estiver vazio
-        # Se estiver vazio, o retorno abaixo lida com isso.
-
-    return {
-        "Estratégia": estrategia_nome,
-        "Total de Jogos": total_jogos,
-        "Taxa de Acerto": f"{taxa_acerto:.2%}",
-        "Lucro Total": f"{lucro_total:.2f}",
-        "Dataframe": df_filtrado # Pode ser um DataFrame vazio
-    }
-
-# Análise das médias E LUCROS RECENTES <--- MODIFICADA
-def check_moving_averages(df_filtrado, estrategia_nome):
-    # Garante que a coluna 'Profit' existe se o DataFrame não for vazio
-    # Se df_filtrado veio de run_backtest e não estava vazio, 'Profit' deve existir.
-    # Se df_filtrado estava vazio, as operações abaixo retornarão 0 ou médias 0.
-
-    if df_filtrado.empty:
-        # Retorna valores padrão se não houver dados para analisar
-        return {
-            "Estratégia": estrategia_nome,
-            "Média 8": "0.00% (0 acertos em 0)",
-            "Média 40": "0.00% (0 acertos em 0)",
-            "Lucro Últimos 8": "0.00 (em 0 jogos)",
-            "Lucro Últimos 40": "0.00 (em 0 jogos)",
-            "Acima dos Limiares": False
-        }
-        
-    # Calcula acerto (como antes)
-    df_filtrado['Acerto'] = (df_filtrado['Goals_H'] == 0) | (df_filtrado['Goals_A'] == 0).astype(int)
-    
-    # Seleciona os últimos jogos
-    ultimos_8 = df_filtrado.tail(8) 
-    ultimos_40 = df_filtrado.tail(40) 
-    
-    # Calcula a média de acertos (usando .mean() para robustez)
-    media_8 = ultimos_8['Acerto'].mean() if not ultimos_8.empty else 0
-    media_40 = ultimos_40['Acerto'].mean() if not ultimos_40.empty else 0
-    
-    # --- NOVO: Calcula o lucro dos últimos jogos ---
-    lucro_8 = ultimos_8['Profit'].sum()
-    lucro_40 = ultimos_40['Profit'].sum()
-    # ---------------------------------------------
-    
-    # Verifica se as médias estão acima dos limiares (usando médias calculadas com .mean())
-    # acima_das_medias = media_8 >= 0.70 and media_40 > 0.7 
-    acima_das_medias = lucro_8 >= 0.1 and lucro_40 > 0.1 and media_8 >= 0.5 and media_40 > 0.5
+# Backtest do histórico pelo motor: VARs, estratégias (as funções estrategia_N desta página) e liquidação
+@st.cache_data(show_spinner=False)
+def run_backtest(file_name, file_content):
+    """Apostas das estratégias desta página no histórico (filtro de ligas + VARs calculadas uma vez).
 
-    # Retorna o dicionário com as novas informações de lucro
-    return {
-        "Estratégia": estrategia_nome,
-        # Formatando médias como porcentagem e incluindo contagem
-        "Média 8": f"{media_8:.2%} ({ultimos_8['Acerto'].sum()} acertos em {len(ultimos_8)})", 
-        "Média 40": f"{media_40:.2%} ({ultimos_40['Acerto'].sum()} acertos em {len(ultimos_40)})", 
-        # --- NOVO: Incluindo os lucros formatados ---
-        "Lucro Últimos 8": f"{lucro_8:.2f} (em {len(ultimos_8)} jogos)",
-        "Lucro Últimos 40": f"{lucro_40:.2f} (em {len(ultimos_40)} jogos)",
-        # ------------------------------------------
-        "Acima dos Limiares": acima_das_medias
-    }
+    Retorna (jogos no arquivo, jogos nas ligas aprovadas, apostas prontas para evaluate_approval,
+    sem coluna 'League'). Janelas, limiares e odd mínima da barra lateral são aplicados depois,
+    sem refazer o backtest.
+    """
+    df = read_table(file_name, file_content)
+    total_arquivo = len(df)
+    sem_liga = 'League' not in df.columns
+    if not sem_liga:
+        df = filter_approved(df, APPROVED_LEAGUES).reset_index(drop=True)
+    historico = prepare_history(df)
+    return total_arquivo, historico.n_rows, approval_data(historico, load_page_catalog(PAGE)), sem_liga
 
 # Analisar jogos do dia - Verifique se esta função já está como abaixo (incluindo 'League')
 def analyze_daily_games(df_daily, estrategia_func, estrategia_nome):
@@ -1073,6 +1009,19 @@ st.title("Ambas *Não Marcam* ")
 
 
 # --- Interface Streamlit ---
+# Regra de aprovação (padrão: lucro e acerto dos últimos 8 e 40 jogos); mudar não refaz o backtest
+st.sidebar.header("⚙️ Regra de Aprovação")
+col1, col2 = st.sidebar.columns(2)
+janela_curta = col1.number_input("Janela curta", min_value=1, value=8, step=1)
+janela_longa = col2.number_input("Janela longa", min_value=1, value=40, step=5)
+lucro_curta = col1.number_input("Lucro curta (>=)", value=0.1, step=0.5)
+lucro_longa = col2.number_input("Lucro longa (>)", value=0.1, step=0.5)
+media_curta = col1.number_input("Acerto curta (>=)", min_value=0.0, max_value=1.0, value=0.5, step=0.05)
+media_longa = col2.number_input("Acerto longa (>)", min_value=0.0, max_value=1.0, value=0.5, step=0.05)
+odd_minima = st.sidebar.number_input(f"Odd mínima ({MARKETS[PAGE_MARKETS[PAGE]]['odd']})", min_value=1.01,
+                                     value=MARKETS[PAGE_MARKETS[PAGE]]['min_odd'], step=0.05)
+janelas = (int(janela_curta), int(janela_longa))
+
 st.header("Upload da Planilha Histórica")
 # --- MODIFICAÇÃO 1: Permitir XLSX e CSV no upload histórico ---
 uploaded_historical = st.file_uploader(
@@ -1082,145 +1031,117 @@ uploaded_historical = st.file_uploader(
 )
 
 if uploaded_historical is not None:
-    # --- MODIFICAÇÃO 2: Usar a função load_dataframe ---
-    df_historico_original = load_dataframe(uploaded_historical)
-    # --- Fim da Modificação 2 ---
+    try:
+        total_arquivo, total_historico, apostas, sem_liga = run_backtest(uploaded_historical.name, uploaded_historical.getvalue())
+        avaliacao = evaluate_approval(apostas, windows=janelas, min_profit=(lucro_curta, lucro_longa),
+                                      min_rate=(media_curta, media_longa), min_odd=odd_minima)
+    except Exception as e:
+        st.error(f"Erro ao processar o histórico '{uploaded_historical.name}': {e}")
+        avaliacao = None
 
-    if df_historico_original is not None:
-        # Filtro Simples de Ligas (Histórico) - Mantém como estava
-        if 'League' in df_historico_original.columns:
-            df_historico = df_historico_original[df_historico_original['League'].isin(APPROVED_LEAGUES)].copy()
-            if df_historico.empty and not df_historico_original.empty:
-                 st.warning("Nenhum jogo do histórico pertence às ligas aprovadas.")
-        else:
+    if avaliacao is not None:
+        if sem_liga:
             st.warning("Coluna 'League' não encontrada no arquivo histórico. Filtro de ligas não aplicado.")
-            df_historico = df_historico_original.copy()
-
-        if not df_historico.empty:
-            # Restante do código do backtest (mantém como estava)
-            try:
-                estrategias = apply_strategies(df_historico.copy())
-            except Exception as e:
-                st.error(f"Erro ao pré-calcular variáveis ou aplicar estratégias no histórico: {e}")
-                estrategias = []
-
-            if estrategias:
-                st.header("Resultados do Backtest (Ligas Filtradas)")
-                backtest_results = []
-                medias_results = []
-                resultados = {}
+        elif total_historico == 0 and total_arquivo > 0:
+            st.warning("Nenhum jogo do histórico pertence às ligas aprovadas.")
 
-                for estrategia_func, estrategia_nome in estrategias:
-                    backtest_result = run_backtest(df_historico.copy(), estrategia_func, estrategia_nome)
-                    if backtest_result["Dataframe"] is not None and not backtest_result["Dataframe"].empty:
-                         medias_result = check_moving_averages(backtest_result["Dataframe"].copy(), estrategia_nome)
-                    else:
-                         medias_result = {
-                            "Estratégia": estrategia_nome, "Média 8": "N/A", "Média 40": "N/A", "Acima dos Limiares": False
-                        }
-                    backtest_results.append(backtest_result)
-                    medias_results.append(medias_result)
-                    resultados[estrategia_nome] = (backtest_result["Dataframe"], medias_result["Acima dos Limiares"])
+        if total_historico > 0:
+            st.header("Resultados do Backtest (Ligas Filtradas)")
+            colunas_backtest = ["Total de Jogos", "Acertos", "Taxa de Acerto", "Lucro Total", "ROI"]
 
-                # Exibir resultados (mantém como estava)
-                with st.expander("📊 Resultados do Backtest"):
-                     st.subheader("Resumo do Backtest")
-                     df_summary = pd.DataFrame([r for r in backtest_results if r["Total de Jogos"] > 0]).drop(columns=["Dataframe"], errors='ignore') # Added errors='ignore'
-                     if not df_summary.empty:
-                         st.dataframe(df_summary)
-                     else:
-                         st.write("Nenhum jogo encontrado para as estratégias após filtros.")
+            with st.expander("📊 Resultados do Backtest"):
+                 st.subheader("Resumo do Backtest")
+                 df_summary = avaliacao.loc[avaliacao["Total de Jogos"] > 0, ["Estratégia"] + colunas_backtest]
+                 if not df_summary.empty:
+                     st.dataframe(df_summary.style.format({"Taxa de Acerto": "{:.2%}", "Lucro Total": "{:.2f}",
+                                                           "ROI": "{:.2%}"}))
+                 else:
+                     st.write("Nenhum jogo encontrado para as estratégias após filtros.")
 
-                #with st.expander("📈 Análise das Médias"):
-                    #st.subheader("Detalhes das Médias")
-                    #st.dataframe(pd.DataFrame(medias_results))
-                   # Exibir análise das médias (o DataFrame resultante já terá as novas colunas)
-                with st.expander("📈 Análise das Médias e Lucros Recentes"): # Nome atualizado
+            with st.expander("📈 Análise das Médias e Lucros Recentes"):
                  st.subheader("Detalhes das Médias e Lucros Recentes")
-                # Cria o DataFrame a partir dos resultados, incluindo as novas chaves
-                 df_medias = pd.DataFrame(medias_results) 
-                 st.dataframe(df_medias) # O dataframe exibido agora incluirá as colunas de lucro    
+                 formatos = {f"Média {n}": "{:.2%}" for n in janelas}
+                 formatos.update({f"Lucro Últimos {n}": "{:.2f}" for n in janelas})
+                 st.dataframe(avaliacao.drop(columns=["Mercado"] + colunas_backtest).style.format(formatos))
 
-                # Upload dos jogos do dia
-                estrategias_aprovadas = [nome for nome, (_, acima) in resultados.items() if acima]
-                if estrategias_aprovadas:
-                    st.header("Upload dos Jogos do Dia")
-                    # --- MODIFICAÇÃO 3: Permitir XLSX e CSV no upload diário ---
-                    uploaded_daily = st.file_uploader(
-                        "Faça upload da planilha com os jogos do dia (.xlsx ou .csv)",
-                        type=["xlsx", "csv"], # Permitir ambos os tipos
-                        key="daily_simple_csv"
-                    )
+            # Upload dos jogos do dia
+            estrategias_aprovadas = avaliacao.loc[avaliacao["Acima dos Limiares"], "Estratégia"].tolist()
+            if estrategias_aprovadas:
+                st.header("Upload dos Jogos do Dia")
+                # --- MODIFICAÇÃO 3: Permitir XLSX e CSV no upload diário ---
+                uploaded_daily = st.file_uploader(
+                    "Faça upload da planilha com os jogos do dia (.xlsx ou .csv)",
+                    type=["xlsx", "csv"], # Permitir ambos os tipos
+                    key="daily_simple_csv"
+                )
 
-                    if uploaded_daily is not None:
-                        # --- MODIFICAÇÃO 4: Usar a função load_dataframe ---
-                        df_daily_original = load_dataframe(uploaded_daily)
-                        # --- Fim da Modificação 4 ---
+                if uploaded_daily is not None:
+                    # --- MODIFICAÇÃO 4: Usar a função load_dataframe ---
+                    df_daily_original = load_dataframe(uploaded_daily)
+                    # --- Fim da Modificação 4 ---
 
-                        if df_daily_original is not None:
-                            # Filtro Simples de Ligas (Jogos do Dia) - Mantém como estava
-                            if 'League' in df_daily_original.columns:
-                                df_daily = df_daily_original[df_daily_original['League'].isin(APPROVED_LEAGUES)].copy()
-                                if df_daily.empty and not df_daily_original.empty:
-                                     st.warning("Nenhum jogo do dia pertence às ligas aprovadas.")
-                            else:
-                                st.warning("Coluna 'League' não encontrada no arquivo de jogos do dia. Filtro de ligas não aplicado.")
-                                df_daily = df_daily_original.copy()
+                    if df_daily_original is not None:
+                        # Filtro Simples de Ligas (Jogos do Dia) - Mantém como estava
+                        if 'League' in df_daily_original.columns:
+                            df_daily = filter_approved(df_daily_original, APPROVED_LEAGUES)
+                            if df_daily.empty and not df_daily_original.empty:
+                                 st.warning("Nenhum jogo do dia pertence às ligas aprovadas.")
+                        else:
+                            st.warning("Coluna 'League' não encontrada no arquivo de jogos do dia. Filtro de ligas não aplicado.")
+                            df_daily = df_daily_original.copy()
 
-                            if not df_daily.empty:
-                                # Restante da análise diária (mantém como estava)
-                                st.header("Jogos Aprovados para Hoje (Ligas Filtradas)")
-                                jogos_aprovados_total = []
-                                mapa_estrategias_diarias = {} # Reset map
+                        if not df_daily.empty:
+                            # Restante da análise diária (mantém como estava)
+                            st.header("Jogos Aprovados para Hoje (Ligas Filtradas)")
+                            jogos_aprovados_total = []
+                            mapa_estrategias_diarias = {} # Reset map
 
-                                try:
-                                    estrategias_diarias_funcs = apply_strategies(df_daily.copy())
-                                    mapa_estrategias_diarias = {nome: func for func, nome in estrategias_diarias_funcs}
-                                except Exception as e:
-                                    st.error(f"Erro ao pré-calcular variáveis ou aplicar estratégias nos jogos do dia: {e}")
-                                    # Keep mapa_estrategias_diarias as empty
+                            try:
+                                estrategias_diarias_funcs = apply_strategies(df_daily.copy())
+                                mapa_estrategias_diarias = {nome: func for func, nome in estrategias_diarias_funcs}
+                            except Exception as e:
+                                st.error(f"Erro ao pré-calcular variáveis ou aplicar estratégias nos jogos do dia: {e}")
+                                # Keep mapa_estrategias_diarias as empty
 
-                                if mapa_estrategias_diarias:
-                                    for estrategia_nome in estrategias_aprovadas:
-                                         if estrategia_nome in mapa_estrategias_diarias:
-                                             estrategia_func_diaria = mapa_estrategias_diarias[estrategia_nome]
-                                             jogos_aprovados = analyze_daily_games(df_daily.copy(), estrategia_func_diaria, estrategia_nome)
-                                             if jogos_aprovados is not None and not jogos_aprovados.empty:
-                                                 # st.subheader(f"{estrategia_nome}")
-                                                 # st.dataframe(jogos_aprovados)
-                                                 jogos_aprovados_total.extend(jogos_aprovados.to_dict('records'))
-                                         else:
-                                             st.info(f"Estratégia '{estrategia_nome}' não aplicável aos dados do dia.")
+                            if mapa_estrategias_diarias:
+                                for estrategia_nome in estrategias_aprovadas:
+                                     if estrategia_nome in mapa_estrategias_diarias:
+                                         estrategia_func_diaria = mapa_estrategias_diarias[estrategia_nome]
+                                         jogos_aprovados = analyze_daily_games(df_daily.copy(), estrategia_func_diaria, estrategia_nome)
+                                         if jogos_aprovados is not None and not jogos_aprovados.empty:
+                                             # st.subheader(f"{estrategia_nome}")
+                                             # st.dataframe(jogos_aprovados)
+                                             jogos_aprovados_total.extend(jogos_aprovados.to_dict('records'))
+                                     else:
+                                         st.info(f"Estratégia '{estrategia_nome}' não aplicável aos dados do dia.")
 
 
-                                    if jogos_aprovados_total:
-                                        df_jogos_aprovados_final = pd.DataFrame(jogos_aprovados_total)
-                                        cols_to_check_duplicates = ['Time', 'Home', 'Away']
-                                        if 'League' in df_jogos_aprovados_final.columns:
-                                            cols_to_check_duplicates.insert(1, 'League')
-                                        # Remove duplicates based on existing columns only
-                                        cols_exist_check = [col for col in cols_to_check_duplicates if col in df_jogos_aprovados_final.columns]
-                                        if cols_exist_check:
-                                            df_jogos_aprovados_final = df_jogos_aprovados_final.drop_duplicates(subset=cols_exist_check)
+                                if jogos_aprovados_total:
+                                    df_jogos_aprovados_final = pd.DataFrame(jogos_aprovados_total)
+                                    cols_to_check_duplicates = ['Time', 'Home', 'Away']
+                                    if 'League' in df_jogos_aprovados_final.columns:
+                                        cols_to_check_duplicates.insert(1, 'League')
+                                    # Remove duplicates based on existing columns only
+                                    cols_exist_check = [col for col in cols_to_check_duplicates if col in df_jogos_aprovados_final.columns]
+                                    if cols_exist_check:
+                                        df_jogos_aprovados_final = df_jogos_aprovados_final.drop_duplicates(subset=cols_exist_check)
 
-                                        st.header("🏆 Lista Unificada de Jogos Aprovados")
-                                        st.dataframe(df_jogos_aprovados_final)
-                                    elif estrategias_aprovadas:
-                                        st.write("Nenhum jogo do dia (nas ligas aprovadas) atende aos critérios das estratégias aprovadas.")
-                                else: # Se o mapa não foi criado devido a erro em apply_strategies
-                                     st.warning("Não foi possível aplicar estratégias aos jogos do dia devido a erro anterior.")
+                                    st.header("🏆 Lista Unificada de Jogos Aprovados")
+                                    st.dataframe(df_jogos_aprovados_final)
+                                elif estrategias_aprovadas:
+                                    st.write("Nenhum jogo do dia (nas ligas aprovadas) atende aos critérios das estratégias aprovadas.")
+                            else: # Se o mapa não foi criado devido a erro em apply_strategies
+                                 st.warning("Não foi possível aplicar estratégias aos jogos do dia devido a erro anterior.")
 
 
-                            else: # Se df_daily vazio após filtro
-                                st.info("Não há jogos do dia nas ligas aprovadas para analisar.")
-                        # else: # df_daily_original is None (erro na leitura) - Mensagem já dada por load_dataframe
-                        #    pass
-                else: # Se não há estratégias aprovadas
-                     st.info("Nenhuma estratégia foi aprovada na análise de médias.")
-            else: # Se apply_strategies retornou vazio ou deu erro
-                st.info("Não foi possível processar o backtest devido a erro nas estratégias/variáveis.")
+                        else: # Se df_daily vazio após filtro
+                            st.info("Não há jogos do dia nas ligas aprovadas para analisar.")
+                    # else: # df_daily_original is None (erro na leitura) - Mensagem já dada por load_dataframe
+                    #    pass
+            else: # Se não há estratégias aprovadas
+                 st.info("Nenhuma estratégia foi aprovada na análise de médias.")
 
-        else: # Se df_historico vazio após filtro
+        else: # Se o histórico ficou vazio após o filtro de ligas
             st.info("Não há dados históricos nas ligas aprovadas para realizar o backtest.")
-    # else: # df_historico_original is None (erro na leitura) - Mensagem já dada por load_dataframe
+    # else: # erro na leitura ou no backtest - mensagem já dada acima
     #    pass
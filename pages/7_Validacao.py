@@ -0,0 +1,327 @@
+import streamlit as st
+import pandas as pd
+from functools import partial
+
+from engine import (MARKETS, PAGE_MARKETS, Catalog, above_thresholds, approval_data, load_page_catalog, make_folds,
+                    match_bits, meta_backtest, minhash_clusters, open_history, overlap, significance, simulate_staking,
+                    walk_forward)
+
+# --- Funções com cache: o histórico e as estratégias só são processados uma vez por arquivo ---
+@st.cache_resource(show_spinner=False)
+def load_history(file_name, file_content):
+    """Lê o histórico, aplica o filtro de ligas e pré-calcula as VARs (no armazém em disco, compartilhado)."""
+    return open_history(file_name, file_content)
+
+@st.cache_resource(show_spinner=False)
+def load_catalog(pages):
+    """Junta os catálogos das páginas de backtest escolhidas."""
+    return Catalog.concat([load_page_catalog(page) for page in pages])
+
+@st.cache_resource(show_spinner=False)
+def load_bits(file_name, file_content, pages, min_odd):
+    """Jogos de cada estratégia escolhida (bitsets), com a odd mínima da barra lateral nos mercados de back."""
+    return match_bits(load_history(file_name, file_content), load_catalog(pages), min_odd=min_odd)
+
+@st.cache_data(show_spinner=False)
+def run_walk_forward(file_name, file_content, pages, folds, min_odd):
+    """Walk-forward de todas as estratégias escolhidas (refeito só quando algo muda)."""
+    historico = load_history(file_name, file_content)
+    return walk_forward(historico, load_catalog(pages), folds=folds,
+                        bits=load_bits(file_name, file_content, pages, min_odd))
+
+@st.cache_data(show_spinner=False)
+def run_significance(file_name, file_content, pages, n_resamples, confidence, alpha, min_odd):
+    """IC bootstrap, p-valor de permutação e FDR de todas as estratégias escolhidas."""
+    historico = load_history(file_name, file_content)
+    return significance(historico, load_catalog(pages), bits=load_bits(file_name, file_content, pages, min_odd),
+                        n_resamples=n_resamples, confidence=confidence, alpha=alpha, seed=0, min_odd=min_odd)
+
+@st.cache_data(show_spinner=False)
+def run_staking(file_name, file_content, pages, mode, bankroll, unit, fraction, min_bets, max_fraction, min_odd):
+    """Curvas de banca e drawdowns de todas as estratégias escolhidas."""
+    historico = load_history(file_name, file_content)
+    return simulate_staking(historico, load_catalog(pages), bits=load_bits(file_name, file_content, pages, min_odd),
+                            mode=mode, bankroll=bankroll, unit=unit, fraction=fraction, min_bets=min_bets,
+                            max_fraction=max_fraction)
+
+@st.cache_data(show_spinner=False)
+def run_overlap(file_name, file_content, pages, min_jaccard, min_odd):
+    """Sobreposição entre as estratégias escolhidas e o conjunto podado."""
+    historico = load_history(file_name, file_content)
+    _, relatorio, mantidas = overlap(historico, load_catalog(pages),
+                                     bits=load_bits(file_name, file_content, pages, min_odd), min_jaccard=min_jaccard)
+    return relatorio, mantidas
+
+@st.cache_data(show_spinner=False)
+def run_minhash(file_name, file_content, pages, threshold, min_odd):
+    """Grupos aproximados (MinHash/LSH) de estratégias que escolhem os mesmos jogos."""
+    historico = load_history(file_name, file_content)
+    return minhash_clusters(historico, load_catalog(pages), bits=load_bits(file_name, file_content, pages, min_odd),
+                            threshold=threshold)
+
+@st.cache_resource(show_spinner=False)
+def load_bets(file_name, file_content, pages):
+    """Apostas das estratégias escolhidas sem odd mínima (a odd mínima é aplicada depois)."""
+    historico = load_history(file_name, file_content)
+    return approval_data(historico, load_catalog(pages))
+
+@st.cache_data(show_spinner=False)
+def run_meta_backtest(file_name, file_content, pages, windows, min_profit, min_rate, min_odd):
+    """Replay dia a dia da regra de aprovação por médias móveis das estratégias escolhidas."""
+    historico = load_history(file_name, file_content)
+    regra = partial(above_thresholds, windows=windows, min_profit=min_profit, min_rate=min_rate)
+    prefixo = load_bets(file_name, file_content, pages).prefix(min_odd)
+    return meta_backtest(historico, load_catalog(pages), windows=windows, rule=regra, prefix=prefixo)
+
+# Modos de stake exibidos na tela
+STAKING_LABELS = {
+    'flat': "Stake fixa",
+    'percent': "Percentual da banca",
+    'kelly': "Kelly fracionado"
+}
+
+# Título da aplicação
+st.title("Validação de Estratégias (Fora da Amostra)")
+st.write("""
+    O backtest das páginas mede cada estratégia no mesmo histórico em que as faixas foram encontradas.
+    Aqui o histórico é dividido em folds cronológicos: cada estratégia é medida no bloco de teste
+    seguinte ao bloco de treino, sem nunca ver o futuro.
+""")
+
+# Regra de aprovação reencenada na aba "Regra de Aprovação"; a odd mínima vale para todas as abas
+st.sidebar.header("⚙️ Regra de Aprovação")
+col1, col2 = st.sidebar.columns(2)
+janela_curta = col1.number_input("Janela curta", min_value=1, value=8, step=1)
+janela_longa = col2.number_input("Janela longa", min_value=1, value=40, step=5)
+lucro_curta = col1.number_input("Lucro curta (>=)", value=0.1, step=0.5)
+lucro_longa = col2.number_input("Lucro longa (>)", value=0.1, step=0.5)
+media_curta = col1.number_input("Acerto curta (>=)", min_value=0.0, max_value=1.0, value=0.5, step=0.05)
+media_longa = col2.number_input("Acerto longa (>)", min_value=0.0, max_value=1.0, value=0.5, step=0.05)
+odd_minima = st.sidebar.number_input("Odd mínima (mercados de back)", min_value=1.01, value=1.30, step=0.05,
+                                     help="Vale para todas as abas: só entram as apostas com odd a partir deste valor.")
+
+st.header("Upload da Planilha Histórica")
+uploaded_historical = st.file_uploader(
+    "Faça upload da planilha histórica (.xlsx ou .csv)",
+    type=["xlsx", "csv"],
+    key="hist_validacao"
+)
+
+if uploaded_historical is not None:
+    try:
+        historico = load_history(uploaded_historical.name, uploaded_historical.getvalue())
+    except Exception as e:
+        st.error(f"Erro ao ler o arquivo '{uploaded_historical.name}': {e}")
+        historico = None
+
+    if historico is not None and historico.n_rows == 0:
+        st.info("Não há dados históricos nas ligas aprovadas para validar.")
+    elif historico is not None:
+        st.success(f"{historico.n_rows} jogos nas ligas aprovadas.")
+
+        paginas = st.multiselect(
+            "Estratégias das páginas",
+            options=list(PAGE_MARKETS),
+            default=list(PAGE_MARKETS)[:1],
+            format_func=lambda page: MARKETS[PAGE_MARKETS[page]]['label']
+        )
+        if not paginas:
+            st.info("Escolha ao menos uma página de estratégias.")
+        else:
+            aba_wf, aba_sig, aba_banca, aba_red, aba_meta = st.tabs(["🔁 Walk-Forward", "🎲 Significância",
+                                                                     "💰 Gestão de Banca", "🧬 Redundância",
+                                                                     "🕰️ Regra de Aprovação"])
+
+            with aba_wf:
+                col1, col2, col3 = st.columns(3)
+                n_folds = col1.slider("Folds de teste", min_value=2, max_value=20, value=5)
+                train_size = col2.slider("Fração do primeiro treino", min_value=0.2, max_value=0.8, value=0.5, step=0.05)
+                anchored = col3.checkbox("Treino expansivo (ancorado no início)", value=False)
+
+                try:
+                    folds = make_folds(historico.n_rows, n_folds=n_folds, train_size=train_size, anchored=anchored)
+                    with st.spinner(f"Validando as estratégias em {len(folds)} folds..."):
+                        por_fold, resumo = run_walk_forward(uploaded_historical.name, uploaded_historical.getvalue(),
+                                                            tuple(paginas), folds, odd_minima)
+                except Exception as e:
+                    st.error(f"Erro na validação walk-forward: {e}")
+                    folds = None
+
+                if folds is not None:
+                    st.header("Resumo Fora da Amostra")
+                    resumo = resumo[resumo["Jogos OOS"] > 0].sort_values("Lucro OOS", ascending=False)
+                    st.dataframe(resumo.style.format({
+                        "Lucro In-Sample": "{:.2f}", "Taxa de Acerto OOS": "{:.2%}", "Lucro OOS": "{:.2f}",
+                        "ROI OOS": "{:.2%}", "Lucro OOS Selecionado": "{:.2f}"
+                    }))
+
+                    with st.expander("📅 Folds"):
+                        datas = historico.dates
+                        st.dataframe(pd.DataFrame([{
+                            "Fold": k + 1,
+                            "Treino": f"{a} a {b - 1}" if datas is None else f"{datas[a]} a {datas[b - 1]}",
+                            "Teste": f"{b} a {c - 1}" if datas is None else f"{datas[b]} a {datas[c - 1]}",
+                            "Jogos Teste": c - b
+                        } for k, (a, b, c) in enumerate(folds)]))
+
+                    with st.expander("📊 Resultados por Fold"):
+                        opcoes = (resumo["Mercado"] + " | " + resumo["Estratégia"]).tolist()
+                        escolha = st.selectbox("Estratégia", options=opcoes)
+                        if escolha:
+                            mercado, estrategia = escolha.split(" | ", 1)
+                            st.dataframe(por_fold[(por_fold["Mercado"] == mercado) & (por_fold["Estratégia"] == estrategia)])
+
+            with aba_sig:
+                st.write("""
+                    Com milhares de estratégias, algumas parecem lucrativas só por sorte. O p-valor compara o lucro
+                    de cada estratégia com o de seleções aleatórias do mesmo tamanho no mesmo mercado, e o q-valor
+                    corrige para a quantidade de estratégias testadas (FDR de Benjamini-Hochberg).
+                """)
+                col1, col2, col3 = st.columns(3)
+                n_resamples = col1.select_slider("Reamostragens", options=[1000, 2000, 5000, 10000], value=2000)
+                confidence = col2.slider("Confiança do intervalo", min_value=0.80, max_value=0.99, value=0.95, step=0.01)
+                alpha = col3.slider("FDR máximo (q-valor)", min_value=0.01, max_value=0.20, value=0.05, step=0.01)
+
+                if st.button("Calcular significância", key="calc_significancia"):
+                    st.session_state["significancia"] = (n_resamples, confidence, alpha)
+
+                if "significancia" in st.session_state:
+                    try:
+                        with st.spinner("Reamostrando o lucro de todas as estratégias..."):
+                            df_sig = run_significance(uploaded_historical.name, uploaded_historical.getvalue(),
+                                                      tuple(paginas), *st.session_state["significancia"], odd_minima)
+                    except Exception as e:
+                        st.error(f"Erro no cálculo de significância: {e}")
+                        df_sig = None
+
+                    if df_sig is not None:
+                        df_sig = df_sig[df_sig["Total de Jogos"] > 0].sort_values("p-valor")
+                        st.write(f"{int(df_sig['Significativa'].sum())} de {len(df_sig)} estratégias com lucro significativo.")
+                        st.dataframe(df_sig.style.format({
+                            "Lucro Total": "{:.2f}", "ROI": "{:.2%}", "IC Lucro Inferior": "{:.2f}",
+                            "IC Lucro Superior": "{:.2f}", "p-valor": "{:.4f}", "q-valor (FDR)": "{:.4f}"
+                        }))
+
+            with aba_banca:
+                col1, col2, col3 = st.columns(3)
+                mode = col1.selectbox("Gestão de stake", options=list(STAKING_LABELS), format_func=STAKING_LABELS.get)
+                bankroll = col2.number_input("Banca inicial", min_value=1.0, value=100.0, step=10.0)
+                unit, fraction, min_bets, max_fraction = 1.0, 0.02, 20, 0.10
+                if mode == 'flat':
+                    unit = col3.number_input("Stake por aposta", min_value=0.01, value=1.0, step=0.5)
+                elif mode == 'percent':
+                    fraction = col3.slider("% da banca por aposta", min_value=0.005, max_value=0.10, value=0.02, step=0.005)
+                else:
+                    fraction = col3.slider("Multiplicador de Kelly", min_value=0.05, max_value=1.0, value=0.25, step=0.05)
+                    col4, col5 = st.columns(2)
+                    min_bets = col4.number_input("Apostas mínimas antes de usar Kelly", min_value=1, value=20, step=1)
+                    max_fraction = col5.slider("Stake máxima (% da banca)", min_value=0.01, max_value=0.25, value=0.10, step=0.01)
+
+                try:
+                    with st.spinner("Simulando a banca de todas as estratégias..."):
+                        df_banca, curvas = run_staking(uploaded_historical.name, uploaded_historical.getvalue(),
+                                                       tuple(paginas), mode, bankroll, unit, fraction, min_bets, max_fraction,
+                                                       odd_minima)
+                except Exception as e:
+                    st.error(f"Erro na simulação de banca: {e}")
+                    df_banca = None
+
+                if df_banca is not None:
+                    ordem = df_banca[df_banca["Apostas"] > 0].sort_values("Lucro", ascending=False)
+                    st.dataframe(ordem.style.format({
+                        "Banca Final": "{:.2f}", "Lucro": "{:.2f}", "Máx. Drawdown": "{:.2f}",
+                        "Máx. Drawdown %": "{:.2%}", "Apostas Abaixo do Topo %": "{:.2%}"
+                    }))
+
+                    opcoes = {f"{row['Mercado']} | {row['Estratégia']}": idx for idx, row in ordem.iterrows()}
+                    escolha = st.selectbox("Curva de capital da estratégia", options=list(opcoes), key="curva_banca")
+                    if escolha:
+                        i = opcoes[escolha]
+                        inicio, fim = curvas["offsets"][i], curvas["offsets"][i + 1]
+                        curva = pd.DataFrame({"Banca": curvas["equity"][inicio:fim]})
+                        if historico.dates is not None:
+                            curva.index = pd.Index(historico.dates[curvas["rows"][inicio:fim]], name="Data")
+                        st.line_chart(curva)
+
+            with aba_red:
+                st.write("""
+                    Estratégias contidas em outra do mesmo mercado (todos os seus jogos também são selecionados pela
+                    outra) são removidas: a cobertura de jogos do histórico continua idêntica com menos estratégias.
+                    Opcionalmente, remove também as quase duplicadas pelo índice de Jaccard.
+                """)
+                metodo = st.radio("Método", options=["Exato", "Aproximado (MinHash/LSH)"], horizontal=True,
+                                  help="O método aproximado agrupa catálogos muito grandes em tempo quase linear.")
+                df_red, df_grupos = None, None
+                if metodo == "Exato":
+                    col1, col2 = st.columns(2)
+                    usar_jaccard = col1.checkbox("Remover também quase duplicadas", value=False)
+                    min_jaccard = col2.slider("Jaccard mínimo", min_value=0.50, max_value=0.99, value=0.90, step=0.01,
+                                              disabled=not usar_jaccard)
+                    try:
+                        with st.spinner("Cruzando os jogos de todas as estratégias..."):
+                            df_red, mantidas = run_overlap(uploaded_historical.name, uploaded_historical.getvalue(),
+                                                           tuple(paginas), min_jaccard if usar_jaccard else None, odd_minima)
+                    except Exception as e:
+                        st.error(f"Erro no cálculo de sobreposição: {e}")
+                else:
+                    limiar = st.slider("Jaccard estimado mínimo", min_value=0.50, max_value=0.99, value=0.80, step=0.01)
+                    try:
+                        with st.spinner("Calculando as assinaturas MinHash..."):
+                            df_grupos = run_minhash(uploaded_historical.name, uploaded_historical.getvalue(),
+                                                    tuple(paginas), limiar, odd_minima)
+                    except Exception as e:
+                        st.error(f"Erro no agrupamento MinHash: {e}")
+
+                if df_grupos is not None:
+                    ativos = df_grupos[df_grupos["Grupo"] >= 0]
+                    st.write(f"{int(ativos['Representante'].sum())} grupos para {len(ativos)} estratégias com jogos.")
+                    st.dataframe(ativos.sort_values(["Tamanho do Grupo", "Grupo", "Total de Jogos"],
+                                                    ascending=[False, True, False]))
+                    st.download_button(
+                        "Baixar representantes dos grupos (.csv)",
+                        data=ativos[ativos["Representante"]][["Mercado", "Estratégia"]].to_csv(index=False).encode('utf-8'),
+                        file_name="estrategias_representantes.csv",
+                        mime="text/csv"
+                    )
+
+                if df_red is not None:
+                    st.write(f"{len(mantidas)} de {len(df_red)} estratégias mantidas.")
+                    st.dataframe(df_red.groupby("Mercado").agg(**{
+                        "Estratégias": ("Estratégia", "count"),
+                        "Mantidas": ("Mantida", "sum")
+                    }))
+                    st.dataframe(df_red.style.format({"Jaccard": "{:.2f}"}))
+                    st.download_button(
+                        "Baixar estratégias mantidas (.csv)",
+                        data=df_red[df_red["Mantida"]][["Mercado", "Estratégia"]].to_csv(index=False).encode('utf-8'),
+                        file_name="estrategias_mantidas.csv",
+                        mime="text/csv"
+                    )
+
+            with aba_meta:
+                st.write("""
+                    A regra das páginas aprova uma estratégia quando o lucro e a taxa de acerto dos últimos jogos
+                    (8 e 40 por padrão) passam dos limiares, e os jogos dela são apostados no dia seguinte. Aqui o
+                    histórico é reencenado rodada a rodada: a aprovação usa só os jogos anteriores e só as rodadas
+                    aprovadas são liquidadas — o lucro que a regra teria dado de fato. Janelas, limiares e odd mínima
+                    vêm da barra lateral.
+                """)
+                try:
+                    with st.spinner("Reencenando a regra de aprovação..."):
+                        df_meta, carteira = run_meta_backtest(
+                            uploaded_historical.name, uploaded_historical.getvalue(), tuple(paginas),
+                            (int(janela_curta), int(janela_longa)), (lucro_curta, lucro_longa),
+                            (media_curta, media_longa), odd_minima)
+                except Exception as e:
+                    st.error(f"Erro no meta-backtest: {e}")
+                    df_meta = None
+
+                if df_meta is not None:
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Lucro da Regra", f"{df_meta['Lucro Meta'].sum():.2f}")
+                    col2.metric("Apostas Aprovadas", int(df_meta["Apostas Aprovadas"].sum()))
+                    col3.metric("Lucro Apostando Tudo", f"{df_meta['Lucro Total'].sum():.2f}")
+                    st.line_chart(carteira["Lucro Acumulado"])
+                    st.dataframe(df_meta[df_meta["Total de Jogos"] > 0].sort_values("Lucro Meta", ascending=False)
+                                 .style.format({"Lucro Total": "{:.2f}", "Taxa de Acerto": "{:.2%}",
+                                                "Lucro Meta": "{:.2f}", "ROI Meta": "{:.2%}"}))
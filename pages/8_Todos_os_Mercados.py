@@ -0,0 +1,244 @@
+import streamlit as st
+import pandas as pd
+import os
+import plotly.express as px
+
+from engine import (MARKETS, PAGE_MARKETS, BetCache, StrategyLibrary, best_min_odds, breakdown, breakdown_matrix,
+                    build_index, compute_features, daily_games, evaluate_approval, filter_approved, market_breakdown,
+                    neighbor_games, neighbor_outcomes, odds_curve, open_history, read_table, sweep_min_odds)
+from engine.breakdown import BREAKDOWNS
+from engine.sweep import DEFAULT_CUTOFFS
+
+# --- Funções com cache: histórico, VARs e liquidação são feitos uma única vez por arquivo ---
+@st.cache_resource(show_spinner=False)
+def load_library():
+    """Estratégias das cinco páginas de backtest e de strategies/*.txt, relidas quando um arquivo muda."""
+    return StrategyLibrary.open()
+
+def load_catalog():
+    """Catálogo atual: a biblioteca já foi conferida (refresh) no início desta execução."""
+    return load_library().catalog
+
+@st.cache_resource(show_spinner=False)
+def load_history(file_name, file_content):
+    """Lê o histórico, aplica o filtro de ligas e pré-calcula as VARs (no armazém em disco, compartilhado)."""
+    return open_history(file_name, file_content)
+
+@st.cache_resource(show_spinner=False)
+def load_index(file_name, file_content):
+    """Índice de similaridade (VARs padronizadas + PCA) montado uma vez por histórico."""
+    return build_index(load_history(file_name, file_content))
+
+@st.cache_resource(show_spinner=False)
+def load_bet_cache(file_name, file_content):
+    """Apostas por estratégia (sem odd mínima) guardadas pela chave de conteúdo, uma vez por arquivo."""
+    return BetCache(load_history(file_name, file_content))
+
+def load_bets(file_name, file_content):
+    """Apostas de todas as estratégias: só as novas ou alteradas desde a última execução são avaliadas."""
+    cache = load_bet_cache(file_name, file_content)
+    biblioteca = load_library()
+    apostas, novas = cache.approval_data(biblioteca.catalog, biblioteca.keys)
+    return cache.history.n_rows, apostas, novas
+
+# Título da aplicação
+st.title("Todos os Mercados")
+st.write(f"""
+    Um único upload do histórico avalia as estratégias de {', '.join(MARKETS[m]['label'] for m in PAGE_MARKETS.values())}
+    de uma vez: as VARs são calculadas uma vez, cada mercado é liquidado uma vez e o resultado é um ranking único.
+""")
+
+# Regra de aprovação das páginas de back, ajustável: a reavaliação usa as apostas já calculadas
+st.sidebar.header("⚙️ Regra de Aprovação")
+col1, col2 = st.sidebar.columns(2)
+janela_curta = col1.number_input("Janela curta", min_value=1, value=8, step=1)
+janela_longa = col2.number_input("Janela longa", min_value=1, value=40, step=5)
+lucro_curta = col1.number_input("Lucro curta (>=)", value=0.1, step=0.5)
+lucro_longa = col2.number_input("Lucro longa (>)", value=0.1, step=0.5)
+media_curta = col1.number_input("Acerto curta (>=)", min_value=0.0, max_value=1.0, value=0.5, step=0.05)
+media_longa = col2.number_input("Acerto longa (>)", min_value=0.0, max_value=1.0, value=0.5, step=0.05)
+odd_minima = st.sidebar.number_input("Odd mínima (mercados de back)", min_value=1.01, value=1.30, step=0.05)
+janelas = (int(janela_curta), int(janela_longa))
+
+# Arquivos de estratégias alterados desde a última execução são relidos aqui
+try:
+    relidos = load_library().refresh()
+except Exception as e:
+    st.error(f"Erro ao ler as estratégias: {e}")
+    st.stop()
+st.sidebar.caption(f"{len(load_catalog())} estratégias carregadas das páginas de backtest e de strategies/.")
+if relidos:
+    st.sidebar.caption("Relidos: " + ", ".join(os.path.basename(p) for p in relidos))
+
+st.header("Upload da Planilha Histórica")
+uploaded_historical = st.file_uploader(
+    "Faça upload da planilha histórica (.xlsx ou .csv)",
+    type=["xlsx", "csv"],
+    key="hist_todos_mercados"
+)
+
+if uploaded_historical is not None:
+    try:
+        with st.spinner("Avaliando todas as estratégias..."):
+            total_jogos, apostas, novas = load_bets(uploaded_historical.name, uploaded_historical.getvalue())
+        ranking = evaluate_approval(apostas, windows=janelas, min_profit=(lucro_curta, lucro_longa),
+                                    min_rate=(media_curta, media_longa), min_odd=odd_minima)
+        ranking = ranking.sort_values("Lucro Total", ascending=False, kind='stable')
+    except Exception as e:
+        st.error(f"Erro ao processar o arquivo '{uploaded_historical.name}': {e}")
+        ranking = None
+
+    if ranking is not None and total_jogos == 0:
+        st.info("Não há dados históricos nas ligas aprovadas para analisar.")
+    elif ranking is not None:
+        st.success(f"{total_jogos} jogos nas ligas aprovadas, {len(ranking)} estratégias avaliadas.")
+        if 0 < novas < len(set(load_library().keys)):
+            st.info(f"{novas} estratégias novas ou alteradas avaliadas agora; as demais vieram do cache.")
+
+        col1, col2 = st.columns(2)
+        mercados = col1.multiselect("Mercados", options=list(ranking["Mercado"].unique()),
+                                    default=list(ranking["Mercado"].unique()))
+        so_aprovadas = col2.checkbox("Somente estratégias acima dos limiares", value=False)
+
+        filtrado = ranking[(ranking["Total de Jogos"] > 0) & ranking["Mercado"].isin(mercados)]
+        if so_aprovadas:
+            filtrado = filtrado[filtrado["Acima dos Limiares"]]
+
+        st.header("🏆 Ranking Entre Mercados")
+        formatos = {"Taxa de Acerto": "{:.2%}", "Lucro Total": "{:.2f}", "ROI": "{:.2%}"}
+        formatos.update({f"Média {n}": "{:.2%}" for n in janelas})
+        formatos.update({f"Lucro Últimos {n}": "{:.2f}" for n in janelas})
+        st.dataframe(filtrado.style.format(formatos))
+
+        with st.expander("📊 Resumo por Mercado"):
+            ativos = ranking[ranking["Total de Jogos"] > 0]
+            st.dataframe(ativos.groupby("Mercado").agg(**{
+                "Estratégias": ("Estratégia", "count"),
+                "Aprovadas": ("Acima dos Limiares", "sum"),
+                "Lucro Total": ("Lucro Total", "sum"),
+                "Melhor Lucro": ("Lucro Total", "max")
+            }))
+
+        with st.expander("📉 Varredura de Odd Mínima"):
+            st.write("""
+                Desempenho de cada estratégia para vários cortes de odd mínima, calculado de uma vez a partir das
+                apostas já ordenadas por odd (sem refazer o backtest para cada corte).
+            """)
+            col1, col2 = st.columns(2)
+            cortes = col1.multiselect("Cortes de odd mínima", options=[1.01, 1.10, 1.20, 1.30, 1.40, 1.50, 1.60, 1.80,
+                                                                       2.00, 2.50, 3.00],
+                                      default=list(DEFAULT_CUTOFFS))
+            min_jogos = col2.number_input("Mínimo de jogos para o melhor corte", min_value=1, value=30, step=5)
+            if cortes:
+                varredura = sweep_min_odds(apostas, sorted(cortes))
+                varredura = varredura[varredura["Mercado"].isin(mercados)]
+                st.dataframe(varredura.pivot_table(index=["Mercado", "Estratégia"], columns="Odd Mínima",
+                                                   values="Lucro Total", sort=False).style.format("{:.2f}"))
+                st.subheader("Melhor corte por estratégia")
+                st.dataframe(best_min_odds(varredura, min_bets=min_jogos).style.format({
+                    "Odd Mínima": "{:.2f}", "Taxa de Acerto": "{:.2%}", "Lucro Total": "{:.2f}", "ROI": "{:.2%}"
+                }))
+
+            opcoes = {f"{row['Mercado']} | {row['Estratégia']}": idx for idx, row in filtrado.iterrows()}
+            escolha = st.selectbox("Curva completa da estratégia", options=list(opcoes), key="curva_odd_minima")
+            if escolha:
+                curva = odds_curve(apostas, opcoes[escolha]).set_index("Odd Mínima")
+                st.line_chart(curva[["Lucro Total"]])
+
+        with st.expander("🗺️ Desempenho por Liga e Temporada"):
+            st.write("""
+                Onde cada estratégia ganha ou perde: jogos, acerto e lucro por liga ou por temporada, calculados para
+                todas as estratégias de uma vez a partir das apostas já feitas (com a odd mínima da barra lateral).
+            """)
+            col1, col2, col3, col4 = st.columns(4)
+            por = col1.radio("Agrupar por", options=list(BREAKDOWNS), format_func=BREAKDOWNS.get)
+            metrica = col2.selectbox("Métrica", options=["Lucro Total", "ROI", "Taxa de Acerto", "Total de Jogos"])
+            n_top = col3.number_input("Estratégias no mapa", min_value=5, max_value=200, value=30, step=5)
+            inicio = col4.number_input("Mês de início da temporada", min_value=1, max_value=12, value=7, step=1)
+            try:
+                quebra = breakdown(load_history(uploaded_historical.name, uploaded_historical.getvalue()),
+                                   load_catalog(), by=por, prefix=apostas.prefix(odd_minima), start_month=int(inicio))
+            except ValueError as e:
+                st.warning(str(e))
+                quebra = None
+            if quebra is not None:
+                quebra = quebra[quebra["Mercado"].isin(mercados)]
+                formato = {"Lucro Total": ".2f", "ROI": ".0%", "Taxa de Acerto": ".0%", "Total de Jogos": "d"}[metrica]
+
+                st.subheader("Por mercado")
+                st.write("Soma de todas as estratégias do mercado em cada grupo: ajuda a revisar as ligas aprovadas.")
+                por_mercado = market_breakdown(quebra)
+                mapa = por_mercado.pivot_table(index="Mercado", columns=BREAKDOWNS[por], values=metrica, sort=False)
+                fig = px.imshow(mapa.sort_index(axis=1), text_auto=formato, aspect="auto",
+                                color_continuous_scale="RdYlGn", labels={'color': metrica})
+                st.plotly_chart(fig)
+
+                st.subheader("Por estratégia")
+                topo = [quebra.loc[[i]] for i in filtrado.index[:int(n_top)] if i in quebra.index]
+                if topo:
+                    topo = pd.concat(topo)  # na ordem do ranking
+                    mapa = breakdown_matrix(topo, metrica)
+                    mapa.index = [f"{mercado} | {nome}" for mercado, nome in mapa.index]
+                    fig = px.imshow(mapa, text_auto=formato, aspect="auto", color_continuous_scale="RdYlGn",
+                                    labels={'color': metrica}, height=max(400, 22 * len(mapa)))
+                    st.plotly_chart(fig)
+                st.dataframe(quebra.style.format({"Taxa de Acerto": "{:.2%}", "Lucro Total": "{:.2f}",
+                                                  "ROI": "{:.2%}"}))
+
+        aprovadas = ranking.index[ranking["Acima dos Limiares"] & ranking["Mercado"].isin(mercados)].tolist()
+        if aprovadas:
+            st.header("Upload dos Jogos do Dia")
+            uploaded_daily = st.file_uploader(
+                "Faça upload da planilha com os jogos do dia (.xlsx ou .csv)",
+                type=["xlsx", "csv"],
+                key="daily_todos_mercados"
+            )
+
+            if uploaded_daily is not None:
+                try:
+                    df_daily = filter_approved(read_table(uploaded_daily.name, uploaded_daily.getvalue()))
+                    jogos = daily_games(df_daily, load_catalog(), aprovadas) if not df_daily.empty else pd.DataFrame()
+                except Exception as e:
+                    st.error(f"Erro ao processar os jogos do dia: {e}")
+                    jogos = None
+
+                if jogos is not None and jogos.empty:
+                    st.write("Nenhum jogo do dia (nas ligas aprovadas) atende aos critérios das estratégias aprovadas.")
+                elif jogos is not None:
+                    st.header("🏆 Jogos Aprovados para Hoje")
+                    st.dataframe(jogos)
+
+                if jogos is not None and not df_daily.empty:
+                    st.header("🔎 Jogos Parecidos no Histórico")
+                    st.write("""
+                        Para cada jogo do dia, os jogos do histórico mais próximos no espaço das VARs e como
+                        terminaram: taxa de acerto e lucro médio de cada mercado entre os vizinhos.
+                    """)
+                    vizinhos = st.slider("Vizinhos por jogo", min_value=5, max_value=200, value=50, step=5)
+                    try:
+                        historico = load_history(uploaded_historical.name, uploaded_historical.getvalue())
+                        indice = load_index(uploaded_historical.name, uploaded_historical.getvalue())
+                        df_dia = df_daily.reset_index(drop=True)
+                        vars_dia = compute_features(df_dia)
+                        resumo = neighbor_outcomes(historico, indice, vars_dia, k=vizinhos)
+                    except Exception as e:
+                        st.error(f"Erro na busca de jogos parecidos: {e}")
+                        resumo = None
+
+                    if resumo is not None:
+                        cols = [col for col in ('Time', 'League', 'Home', 'Away') if col in df_dia.columns]
+                        resumo = pd.concat([df_dia[cols], resumo], axis=1)
+                        st.dataframe(resumo.style.format({
+                            col: ("{:.2%}" if col.startswith("Acerto") else "{:.2f}")
+                            for col in resumo.columns if col.startswith(("Acerto", "Lucro", "Distância"))
+                        }))
+
+                        with st.expander("📋 Vizinhos de um jogo"):
+                            times = [c for c in ('Home', 'Away') if c in df_dia.columns]
+                            rotulos = [" x ".join(str(df_dia.at[i, c]) for c in times) or f"Jogo {i + 1}"
+                                       for i in range(len(df_dia))]
+                            jogo = st.selectbox("Jogo", options=range(len(df_dia)), format_func=rotulos.__getitem__)
+                            st.dataframe(neighbor_games(historico, indice, vars_dia[jogo], k=vizinhos).style.format(
+                                {"Distância": "{:.3f}"}, precision=2))
+        else:
+            st.info("Nenhuma estratégia foi aprovada na análise de médias.")
@@ -0,0 +1,146 @@
+import streamlit as st
+import numpy as np
+
+from engine import (MARKETS, PAGE_MARKETS, VAR_NAMES, candidates_catalog, load_page_catalog, learn_rules, match_bits,
+                    mine_pairs, mine_rules, open_history, page_code, rules_catalog)
+from engine.backtest import strategy_totals
+from engine.bitsets import pack_rows
+from engine.tree import TARGETS
+
+# --- Funções com cache: o histórico só é processado uma vez por arquivo ---
+@st.cache_resource(show_spinner=False)
+def load_history(file_name, file_content):
+    """Lê o histórico, aplica o filtro de ligas e pré-calcula as VARs (no armazém em disco, compartilhado)."""
+    return open_history(file_name, file_content)
+
+def mined_catalog(candidatas, mode, market, start=1):
+    """Catálogo do motor com as candidatas de qualquer um dos modos de mineração."""
+    if mode == 'pares':
+        return candidates_catalog(candidatas, market, start)
+    return rules_catalog(candidatas, market, start)
+
+@st.cache_data(show_spinner=False)
+def run_mining(file_name, file_content, mode, market, n_bins, min_bets, min_profit, min_roi, test_fraction, extra):
+    """Minera as candidatas no treino e mede cada uma no período de teste (se houver).
+
+    ``extra`` traz os parâmetros próprios de cada modo como pares (nome, valor).
+    """
+    historico = load_history(file_name, file_content)
+    corte = int(round(historico.n_rows * (1 - test_fraction)))
+    opcoes = dict(extra)
+    if mode == 'pares':
+        candidatas = mine_pairs(historico, market, n_bins=n_bins, min_bets=min_bets, min_profit=min_profit,
+                                min_roi=min_roi, bases=list(opcoes['bases']) or None, rows=np.arange(corte))
+    elif mode == 'regras':
+        candidatas = mine_rules(historico, market, max_clauses=opcoes['max_clauses'], n_bins=n_bins,
+                                min_support=min_bets, min_profit=min_profit, beam=opcoes['beam'],
+                                rows=np.arange(corte))
+        candidatas = candidatas[candidatas["ROI"] >= min_roi].reset_index(drop=True)
+    else:
+        candidatas = learn_rules(historico, market, target=opcoes['target'], n_trees=opcoes['n_trees'],
+                                 max_depth=opcoes['max_depth'], n_bins=n_bins, min_leaf=min_bets,
+                                 min_profit=min_profit, min_roi=min_roi, rows=np.arange(corte))
+    if test_fraction > 0 and len(candidatas):
+        catalogo = mined_catalog(candidatas, mode, market)
+        teste = pack_rows(np.arange(historico.n_rows) >= corte)[0]
+        jogos, acertos, lucro = strategy_totals(historico, catalogo, match_bits(historico, catalogo) & teste)
+        candidatas["Jogos Teste"] = jogos
+        candidatas["Taxa de Acerto Teste"] = np.where(jogos > 0, acertos / np.maximum(jogos, 1), 0.0)
+        candidatas["Lucro Teste"] = lucro
+    return corte, candidatas
+
+# Modos de mineração exibidos na tela
+MINING_MODES = {
+    'pares': "Pares de faixas (VAR A x VAR B)",
+    'regras': "Regras com várias cláusulas (Apriori)",
+    'arvores': "Árvores de gradiente (histogramas)"
+}
+
+# Título da aplicação
+st.title("Mineração de Estratégias")
+st.write("""
+    Cada VAR é dividida em faixas por quantis. No modo de pares, todos os pares "faixa de VAR A x faixa de VAR B"
+    são pontuados de uma vez e fica a melhor combinação de cada par de VARs. No modo de regras, as faixas são
+    combinadas nível a nível (3, 4 ou mais cláusulas), descartando cedo as regras sem jogos ou lucro possível
+    suficientes. No modo de árvores, árvores rasas são ajustadas em sequência ao lucro (ou acerto) do mercado e
+    cada caminho até uma folha vira uma estratégia. O código gerado segue o formato das páginas de backtest.
+""")
+
+st.header("Upload da Planilha Histórica")
+uploaded_historical = st.file_uploader(
+    "Faça upload da planilha histórica (.xlsx ou .csv)",
+    type=["xlsx", "csv"],
+    key="hist_mineracao"
+)
+
+if uploaded_historical is not None:
+    try:
+        historico = load_history(uploaded_historical.name, uploaded_historical.getvalue())
+    except Exception as e:
+        st.error(f"Erro ao ler o arquivo '{uploaded_historical.name}': {e}")
+        historico = None
+
+    if historico is not None and historico.n_rows == 0:
+        st.info("Não há dados históricos nas ligas aprovadas para minerar.")
+    elif historico is not None:
+        st.success(f"{historico.n_rows} jogos nas ligas aprovadas.")
+
+        paginas = {market: page for page, market in PAGE_MARKETS.items()}
+        mode = st.radio("Modo", options=list(MINING_MODES), format_func=MINING_MODES.get, horizontal=True)
+        col1, col2, col3 = st.columns(3)
+        market = col1.selectbox("Mercado", options=list(paginas), format_func=lambda m: MARKETS[m]['label'])
+        n_bins = col2.slider("Faixas por VAR (quantis)", min_value=4, max_value=30,
+                             value={'pares': 20, 'regras': 8}.get(mode, 30))
+        test_fraction = col3.slider("Final do histórico reservado para teste", min_value=0.0, max_value=0.5,
+                                    value=0.3, step=0.05)
+        col1, col2, col3 = st.columns(3)
+        min_bets = col1.number_input("Mínimo de jogos", min_value=5, value=30, step=5)
+        min_profit = col2.number_input("Lucro mínimo", value=1.0, step=1.0)
+        min_roi = col3.number_input("ROI mínimo", value=0.0, step=0.01, format="%.2f")
+        if mode == 'pares':
+            extra = (('bases', tuple(st.multiselect("VARs base (vazio = todas)", options=VAR_NAMES))),)
+        elif mode == 'regras':
+            col1, col2 = st.columns(2)
+            extra = (('max_clauses', col1.slider("Máximo de cláusulas", min_value=2, max_value=6, value=3)),
+                     ('beam', col2.select_slider("Regras expandidas por nível", options=[50, 100, 200, 500, 1000],
+                                                 value=200)))
+        else:
+            col1, col2, col3 = st.columns(3)
+            extra = (('target', col1.selectbox("Alvo", options=list(TARGETS), format_func=TARGETS.get)),
+                     ('n_trees', col2.slider("Árvores", min_value=1, max_value=50, value=10)),
+                     ('max_depth', col3.slider("Profundidade máxima", min_value=1, max_value=6, value=3)))
+
+        if st.button("Minerar", key="minerar"):
+            st.session_state["mineracao"] = (mode, market, n_bins, min_bets, min_profit, min_roi, test_fraction,
+                                             extra)
+
+        if "mineracao" in st.session_state:
+            params = st.session_state["mineracao"]
+            try:
+                with st.spinner("Minerando as candidatas..."):
+                    corte, candidatas = run_mining(uploaded_historical.name, uploaded_historical.getvalue(), *params)
+            except Exception as e:
+                st.error(f"Erro na mineração: {e}")
+                candidatas = None
+
+            if candidatas is not None and candidatas.empty:
+                st.info("Nenhuma candidata atendeu aos critérios.")
+            elif candidatas is not None:
+                mode, market = params[0], params[1]
+                st.header(f"Candidatas {MARKETS[market]['label']}")
+                st.write(f"Treino: {corte} jogos. {len(candidatas)} candidatas.")
+                top = st.slider("Candidatas exibidas e exportadas", min_value=1, max_value=len(candidatas),
+                                value=min(50, len(candidatas)))
+                selecionadas = candidatas.head(top)
+                st.dataframe(selecionadas.drop(columns=["_grupos"], errors='ignore').style.format({
+                    "Taxa de Acerto": "{:.2%}", "Lucro Total": "{:.2f}", "ROI": "{:.2%}",
+                    "Taxa de Acerto Teste": "{:.2%}", "Lucro Teste": "{:.2f}"
+                }))
+
+                with st.expander("🧾 Código para a página"):
+                    inicio = st.number_input("Numerar a partir de", min_value=1, step=1,
+                                             value=len(load_page_catalog(paginas[market])) + 1)
+                    codigo = page_code(mined_catalog(selecionadas, mode, market, int(inicio)), start=int(inicio))
+                    st.code(codigo, language="python")
+                    st.download_button("Baixar código (.py)", data=codigo.encode('utf-8'),
+                                       file_name=f"estrategias_{market}.py", mime="text/x-python")
@@ -0,0 +1,56 @@
+"""Históricos sintéticos para os testes do motor (odds coerentes com um modelo de Poisson)."""
+import os
+import sys
+from math import factorial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_history(n=5000, seed=0):
+    """DataFrame no formato das planilhas: datas, ligas, times, as 11 odds e os gols."""
+    rng = np.random.default_rng(seed)
+    lh, la = rng.uniform(0.5, 2.6, n), rng.uniform(0.3, 2.0, n)
+    g = np.arange(11)
+    fact = np.array([factorial(k) for k in g], dtype=float)
+    grid = (np.exp(-lh)[:, None] * lh[:, None] ** g / fact)[:, :, None] * \
+           (np.exp(-la)[:, None] * la[:, None] ** g / fact)[:, None, :]
+    home = np.tril(np.ones((11, 11)), -1)
+    total = g[:, None] + g[None, :]
+    p_h, p_d, p_a = (grid * home).sum((1, 2)), (grid * np.eye(11)).sum((1, 2)), (grid * home.T).sum((1, 2))
+    p_over = (grid * (total > 2)).sum((1, 2))
+    p_btts_no = (grid * ((g[:, None] == 0) | (g[None, :] == 0))).sum((1, 2))
+
+    def back(p):
+        return np.round(np.clip(1 / (p * 1.04), 1.01, 1000), 2)
+
+    def lay(p):
+        return np.round(np.clip(1 / (p * 0.98), 1.01, 1000), 2)
+
+    goals_h, goals_a = rng.poisson(lh), rng.poisson(la)
+    dates = pd.Timestamp("2021-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 1200, n)), unit="D")
+    return pd.DataFrame({
+        "Date": dates.strftime("%d/%m/%Y"), "Time": "15:00",
+        "League": rng.choice(["ENGLAND 1", "SPAIN 1", "BRAZIL 1", "ITALY 1", "FRANCE 1"], n),
+        "Home": [f"T{i % 97}" for i in range(n)], "Away": [f"T{(i * 7) % 89}" for i in range(n)],
+        "Odd_H_Back": back(p_h), "Odd_D_Back": back(p_d), "Odd_A_Back": back(p_a),
+        "Odd_Over25_FT_Back": back(p_over), "Odd_Under25_FT_Back": back(1 - p_over),
+        "Odd_BTTS_Yes_Back": back(1 - p_btts_no), "Odd_BTTS_No_Back": back(p_btts_no),
+        "Odd_CS_0x0_Lay": lay(grid[:, 0, 0]), "Odd_CS_0x1_Lay": lay(grid[:, 0, 1]),
+        "Odd_CS_1x0_Lay": lay(grid[:, 1, 0]), "Odd_CS_1x1_Lay": lay(grid[:, 1, 1]),
+        "Goals_H": goals_h, "Goals_A": goals_a, "Total_Goals": goals_h + goals_a,
+    })
+
+
+@pytest.fixture(autouse=True)
+def engine_store(tmp_path_factory, monkeypatch):
+    """Armazém e pacotes do motor numa pasta temporária dos testes."""
+    monkeypatch.setenv('ENGINE_STORE', str(tmp_path_factory.getbasetemp() / 'engine_store'))
+
+
+@pytest.fixture(scope='session')
+def history_df():
+    return make_history()
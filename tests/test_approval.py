@@ -0,0 +1,75 @@
+"""Aprovação ajustável: paridade com o run_backtest + check_moving_averages das páginas 2-6."""
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_history
+from test_backtest import _page_strategies
+
+from engine import MARKETS, approval_data, evaluate_approval, load_page_catalog, prepare_history
+from engine.catalog import PAGE_MARKETS
+
+BACK_PAGES = ['2_Back_Home.py', '3_Back_Away.py', '4_Over_2.5.py', '5_Under_2.5.py', '6_BTTS_Não.py']
+
+
+@pytest.fixture(scope='module')
+def history_20k():
+    return make_history(20000, 2)
+
+
+def _page_selections(df, page, min_odd):
+    """Acerto e lucro (Series do pandas) de cada estratégia, como no run_backtest das páginas."""
+    spec = MARKETS[PAGE_MARKETS[page]]
+    base = df[df[spec['odd']] >= min_odd]
+    out = []
+    for func, _ in _page_strategies(page)(df.copy()):
+        selected = func(base.copy())
+        goals_h, goals_a = selected['Goals_H'], selected['Goals_A']
+        total = goals_h + goals_a
+        win = {'home': goals_h > goals_a, 'away': goals_h < goals_a, 'over25': total > 2, 'under25': total < 3,
+               'btts_no': (goals_h == 0) | (goals_a == 0)}[spec['result']]
+        out.append((win, pd.Series(np.where(win, selected[spec['odd']] - 1, -1.0), index=selected.index)))
+    return out
+
+
+def _page_approval(selections, windows, min_profit, min_rate):
+    """check_moving_averages das páginas: >= na janela curta e > na longa."""
+    (short, long_), (p_short, p_long), (r_short, r_long) = windows, min_profit, min_rate
+    return [len(win) > 0 and profit.tail(short).sum() >= p_short and profit.tail(long_).sum() > p_long
+            and win.tail(short).mean() >= r_short and win.tail(long_).mean() > r_long
+            for win, profit in selections]
+
+
+@pytest.mark.filterwarnings('ignore:Boolean Series key')  # máscaras das páginas indexadas por vars_dict
+@pytest.mark.parametrize('page', BACK_PAGES)
+def test_page_parity(history_20k, page):
+    df = history_20k.reset_index(drop=True)
+    data = approval_data(prepare_history(df), load_page_catalog(page))
+    min_odd = MARKETS[PAGE_MARKETS[page]]['min_odd']
+    selections = _page_selections(df, page, min_odd)
+
+    table = evaluate_approval(data, min_odd=min_odd)
+    np.testing.assert_array_equal(table["Total de Jogos"], [len(w) for w, _ in selections])
+    np.testing.assert_array_equal(table["Acertos"], [int(w.sum()) for w, _ in selections])
+    np.testing.assert_allclose(table["Lucro Total"], [p.sum() for _, p in selections], atol=1e-9)
+    for n in (8, 40):  # bit a bit: a aprovação no limiar exato é a mesma das páginas
+        np.testing.assert_array_equal(table[f"Lucro Últimos {n}"], [p.tail(n).sum() for _, p in selections])
+    np.testing.assert_array_equal(table["Acima dos Limiares"],
+                                  _page_approval(selections, (8, 40), (0.1, 0.1), (0.5, 0.5)))
+
+    # Limiares exatamente sobre valores observados: empates decidem pelo >= / > das páginas
+    active = table[table["Total de Jogos"] >= 40]
+    observed = {col: float(np.sort(active[col])[len(active) // 2])
+                for col in ("Lucro Últimos 8", "Lucro Últimos 40", "Média 8", "Média 40")}
+    min_profit = (observed["Lucro Últimos 8"], observed["Lucro Últimos 40"])
+    min_rate = (observed["Média 8"], observed["Média 40"])
+    table = evaluate_approval(data, min_profit=min_profit, min_rate=min_rate, min_odd=min_odd)
+    np.testing.assert_array_equal(table["Acima dos Limiares"],
+                                  _page_approval(selections, (8, 40), min_profit, min_rate))
+
+
+def test_windows_must_differ(history_df):
+    data = approval_data(prepare_history(history_df), load_page_catalog('2_Back_Home.py'))
+    with pytest.raises(ValueError):
+        evaluate_approval(data, windows=(40, 40))
+    table = evaluate_approval(data, windows=(5, 30), min_odd=1.5)
+    assert {"Lucro Últimos 5", "Média 30"} <= set(table.columns)
@@ -0,0 +1,46 @@
+"""Regras E mineradas: backtest exato, nível 1 contra força bruta e resultado igual em paralelo."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import backtest_catalog, prepare_history
+from engine.apriori import mine_rules, range_predicates, rules_catalog
+from engine.bitsets import unpack_rows
+from engine.store import default_store_dir
+
+
+@pytest.fixture(scope='module')
+def history(history_df):
+    return prepare_history(history_df)
+
+
+def test_rules_reproduce_in_backtest(history):
+    rules = mine_rules(history, 'back_home', max_clauses=3, n_bins=4, min_support=40, min_profit=5.0,
+                       beam=50, max_rules=300, n_jobs=1)
+    assert (rules["Cláusulas"] == 3).any()
+    assert (rules["Total de Jogos"] >= 40).all() and (rules["Lucro Total"] >= 5.0).all()
+    board = backtest_catalog(history, rules_catalog(rules, 'back_home'))
+    np.testing.assert_array_equal(board["Total de Jogos"], rules["Total de Jogos"])
+    np.testing.assert_array_equal(board["Acertos"], rules["Acertos"])
+    np.testing.assert_allclose(board["Lucro Total"], rules["Lucro Total"], atol=1e-9)
+
+    parallel = mine_rules(history, 'back_home', max_clauses=3, n_bins=4, min_support=40, min_profit=5.0,
+                          beam=50, max_rules=300, n_jobs=2)
+    pd.testing.assert_frame_equal(parallel.drop(columns="_grupos"), rules.drop(columns="_grupos"))
+    # O arquivo temporário que levou os bitsets aos processos não fica no armazém
+    assert not [name for name in os.listdir(default_store_dir()) if name.startswith('.tmp-')]
+
+
+def test_single_clauses_match_brute_force(history):
+    s = history.settle('back_home')
+    _, _, _, bits = range_predicates(history, 'back_home', n_bins=4)
+    masks = unpack_rows(bits, history.n_rows)
+    profit = np.where(s.eligible, s.profit, 0.0)
+    totals = np.array([profit[m].sum() for m in masks])
+    expected = np.sort(totals[(masks.sum(axis=1) >= 40) & (totals >= 5.0)])[::-1]
+
+    rules = mine_rules(history, 'back_home', max_clauses=1, n_bins=4, min_support=40, min_profit=5.0,
+                       max_rules=10_000, n_jobs=1)
+    np.testing.assert_allclose(rules["Lucro Total"], expected, atol=1e-9)
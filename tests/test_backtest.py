@@ -0,0 +1,115 @@
+"""Backtest vetorizado: odds ausentes e paridade com o run_backtest das páginas."""
+import ast
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import (MARKETS, Catalog, approval_data, backtest_catalog, expressions_catalog, load_page_catalog,
+                    match_bits, moving_averages, prepare_history)
+from engine.backtest import above_thresholds
+from engine.bitsets import popcount
+from engine.catalog import PAGE_MARKETS, PAGES_DIR
+from engine.stream import stream_backtest
+from engine.walkforward import walk_forward
+
+
+def _with_nan_odd(df, market='back_home'):
+    """Cópia do histórico com a odd de um jogo vencedor do mercado apagada."""
+    df = df.copy()
+    row = np.flatnonzero(df['Goals_H'] > df['Goals_A'])[10]
+    df.loc[row, MARKETS[market]['odd']] = np.nan
+    return df
+
+
+def _masked(history, market='back_home'):
+    """O mesmo histórico com lucro 0 nas linhas inelegíveis (referência sem NaN)."""
+    s = history.settle(market)
+    history._settlements[market] = dataclasses.replace(s, profit=np.where(s.eligible, s.profit, 0.0))
+    return history
+
+
+def test_nan_odd_does_not_poison_market(history_df):
+    df = _with_nan_odd(history_df)
+    catalog = load_page_catalog('2_Back_Home.py')
+    board = backtest_catalog(prepare_history(df), catalog)
+    assert np.isfinite(board["Lucro Total"]).all()
+    expected = backtest_catalog(_masked(prepare_history(df)), catalog)
+    pd.testing.assert_frame_equal(board, expected)
+
+    _, table = stream_backtest([df.iloc[:2000], df.iloc[2000:]], catalog)
+    assert np.isfinite(table["Lucro Total"]).all()
+    np.testing.assert_allclose(table["Lucro Total"], board["Lucro Total"], atol=1e-9)
+
+
+def test_nan_odd_walk_forward(history_df):
+    df = _with_nan_odd(history_df)
+    catalog = load_page_catalog('2_Back_Home.py')
+    per_fold, summary = walk_forward(prepare_history(df), catalog, n_jobs=1)
+    assert np.isfinite(per_fold[["Lucro Treino", "Lucro Teste"]].to_numpy()).all()
+    _, expected = walk_forward(_masked(prepare_history(df)), catalog, n_jobs=1)
+    pd.testing.assert_frame_equal(summary, expected)
+
+
+def _page_strategies(page):
+    """pre_calculate_all_vars e apply_strategies da página, sem executar o Streamlit."""
+    path = f"{PAGES_DIR}/{page}"
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    funcs = [node for node in tree.body if isinstance(node, ast.FunctionDef)
+             and node.name in ('pre_calculate_all_vars', 'apply_strategies')]
+    namespace = {'np': np, 'pd': pd}
+    exec(compile(ast.Module(body=funcs, type_ignores=[]), path, 'exec'), namespace)
+    return namespace['apply_strategies']
+
+
+def _reference(df, strategy, market):
+    """run_backtest das páginas de back: odd mínima do mercado, lucro odd-1 no acerto e -1 no erro."""
+    spec = MARKETS[market]
+    selected = strategy(df[df[spec['odd']] >= spec['min_odd']].copy())
+    goals_h, goals_a = selected['Goals_H'], selected['Goals_A']
+    total = goals_h + goals_a
+    win = {'home': goals_h > goals_a, 'away': goals_h < goals_a, 'over25': total > 2, 'under25': total < 3,
+           'btts_no': (goals_h == 0) | (goals_a == 0)}[spec['result']]
+    profit = pd.Series(np.where(win, selected[spec['odd']] - 1, -1.0), index=selected.index)
+    return win, profit
+
+
+def _approved(win, profit):
+    """check_moving_averages das páginas de back (janelas 8 e 40)."""
+    return bool(len(win) > 0 and profit.tail(8).sum() >= 0.1 and profit.tail(40).sum() > 0.1
+                and win.tail(8).mean() >= 0.5 and win.tail(40).mean() > 0.5)
+
+
+@pytest.mark.filterwarnings('ignore:Boolean Series key')  # máscaras das páginas indexadas por vars_dict
+@pytest.mark.parametrize('page', ['2_Back_Home.py', '4_Over_2.5.py'])
+def test_page_parity(history_df, page):
+    df = history_df.reset_index(drop=True)
+    market = PAGE_MARKETS[page]
+    catalog = load_page_catalog(page)
+    history = prepare_history(df)
+    board = backtest_catalog(history, catalog)
+    recent = moving_averages(history, catalog)
+
+    strategies = _page_strategies(page)(df.copy())
+    assert [name for _, name in strategies] == catalog.names
+    reference = [_reference(df, func, market) for func, _ in strategies]
+    np.testing.assert_array_equal(board["Total de Jogos"], [len(win) for win, _ in reference])
+    np.testing.assert_array_equal(board["Acertos"], [int(win.sum()) for win, _ in reference])
+    np.testing.assert_allclose(board["Lucro Total"], [profit.sum() for _, profit in reference], atol=1e-9)
+    for n in (8, 40):  # mesma soma das páginas, bit a bit: decisões no limiar exato não mudam
+        np.testing.assert_array_equal(recent[f"Lucro Últimos {n}"], [profit.tail(n).sum() for _, profit in reference])
+    np.testing.assert_array_equal(above_thresholds(recent), [_approved(win, profit) for win, profit in reference])
+    assert (board["Total de Jogos"] > 0).sum() > 50  # o histórico sintético exercita as estratégias
+
+
+def test_match_bits_min_odd(history_df):
+    # A odd mínima da barra lateral substitui a dos mercados de back, como em ApprovalData.prefix
+    history = prepare_history(history_df)
+    lay = expressions_catalog({"L1": "VAR01 >= 0", "L2": "VAR41 >= 0.3"}, 'lay_cs_0x0')
+    catalog = Catalog.concat([load_page_catalog('2_Back_Home.py').subset(range(50)), lay])
+    np.testing.assert_array_equal(match_bits(history, catalog, min_odd=1.30), match_bits(history, catalog))
+    raised = match_bits(history, catalog, min_odd=1.8)
+    np.testing.assert_array_equal(popcount(raised), np.diff(approval_data(history, catalog).prefix(1.8).offsets))
+    np.testing.assert_array_equal(raised[-2:], match_bits(history, catalog)[-2:])
@@ -0,0 +1,47 @@
+"""Breakdown por liga e temporada contra o backtest das páginas agrupado pelo pandas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import load_page_catalog, prepare_history
+from engine.breakdown import breakdown, breakdown_matrix, market_breakdown
+from engine.catalog import PAGE_MARKETS
+from test_backtest import _page_strategies, _reference
+
+
+@pytest.mark.filterwarnings('ignore:Boolean Series key')
+def test_breakdown_matches_pandas_groupby(history_df):
+    page = '2_Back_Home.py'
+    df = history_df.reset_index(drop=True)
+    catalog = load_page_catalog(page)
+    history = prepare_history(df)
+    season = pd.to_datetime(df["Date"], dayfirst=True)
+    df["Temporada"] = [f"{y}/{(y + 1) % 100:02d}" for y in np.where(season.dt.month >= 7, season.dt.year, season.dt.year - 1)]
+
+    rows = []
+    for func, name in _page_strategies(page)(df.copy()):
+        win, profit = _reference(df, func, PAGE_MARKETS[page])
+        rows.append(pd.DataFrame({"Estratégia": name, "Liga": df.loc[win.index, "League"],
+                                  "Temporada": df.loc[win.index, "Temporada"], "win": win, "profit": profit}))
+    bets = pd.concat(rows)
+
+    for by, col in (('liga', "Liga"), ('temporada', "Temporada")):
+        table = breakdown(history, catalog, by=by).set_index(["Estratégia", col]).sort_index()
+        expected = bets.groupby(["Estratégia", col]).agg(n=("win", "size"), hits=("win", "sum"), lucro=("profit", "sum"))
+        assert table.index.equals(expected.index)
+        np.testing.assert_array_equal(table["Total de Jogos"], expected["n"])
+        np.testing.assert_array_equal(table["Acertos"], expected["hits"])
+        np.testing.assert_allclose(table["Lucro Total"], expected["lucro"], atol=1e-9)
+
+    table = breakdown(history, catalog, by='liga')
+    matrix = breakdown_matrix(table)
+    assert list(matrix.columns) == sorted(df["League"].unique())
+    np.testing.assert_allclose(np.nansum(matrix.to_numpy()), table["Lucro Total"].sum())
+    totals = market_breakdown(table)
+    assert totals["Total de Jogos"].sum() == len(bets)
+
+
+def test_breakdown_requires_column(history_df):
+    history = prepare_history(history_df.drop(columns=["League"]))
+    with pytest.raises(ValueError):
+        breakdown(history, load_page_catalog('2_Back_Home.py'), by='liga')
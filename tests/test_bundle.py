@@ -0,0 +1,51 @@
+"""Pacotes binários do catálogo: leitura igual ao catálogo das páginas."""
+import numpy as np
+
+from engine import PAGE_MARKETS, load_page_catalog, parse_strategies
+from engine.bundle import cached_catalog, catalog_keys, load_bundle, save_bundle
+from engine.catalog import PAGES_DIR
+
+
+def _parse(text):
+    return parse_strategies(text, PAGE_MARKETS['3_Back_Away.py'])
+
+
+def test_bundle_round_trip(tmp_path):
+    path = f"{PAGES_DIR}/3_Back_Away.py"
+    with open(path, encoding='utf-8') as f:
+        catalog = _parse(f.read())
+    bundle = str(tmp_path / "pacote.npz")
+    save_bundle(catalog, bundle)
+    loaded, keys = load_bundle(bundle)
+    assert keys == catalog_keys(catalog)
+    assert list(loaded.rules()) == list(catalog.rules())
+    for field in ("group_strategy", "clause_group", "clause_var", "clause_lo", "clause_hi"):
+        assert getattr(loaded, field).dtype == getattr(catalog, field).dtype
+        np.testing.assert_array_equal(getattr(loaded, field), getattr(catalog, field))
+
+
+def test_cached_catalog_reads_once(tmp_path):
+    path = f"{PAGES_DIR}/3_Back_Away.py"
+    calls = []
+
+    def read(text):
+        calls.append(1)
+        return _parse(text)
+
+    first = cached_catalog(path, read, directory=str(tmp_path))
+    second = cached_catalog(path, read, directory=str(tmp_path))
+    assert len(calls) == 1
+    assert second[1] == first[1] and second[0].names == first[0].names
+
+    for bundle in (tmp_path / "bundles").iterdir():
+        bundle.write_bytes(b"corrompido")
+    assert cached_catalog(path, read, directory=str(tmp_path))[0].names == first[0].names
+    assert len(calls) == 2
+
+
+def test_cached_catalog_with_read_only_store():
+    # Armazém em que não se pode criar a pasta dos pacotes (ex.: ENGINE_STORE=/proc/x)
+    path = f"{PAGES_DIR}/2_Back_Home.py"
+    catalog, keys = cached_catalog(path, lambda text: parse_strategies(text, 'back_home'), directory='/proc/x')
+    assert catalog.names == load_page_catalog('2_Back_Home.py').names
+    assert len(keys) == len(catalog.names)
@@ -0,0 +1,65 @@
+"""Linguagem de expressões: leitura, simplificação e avaliação contra as máscaras escritas à mão."""
+import numpy as np
+import pytest
+
+from engine import MARKETS, backtest_catalog, prepare_history
+from engine.expr import compile_expression, expressions_catalog, format_expression, parse_expression, simplify
+from engine.features import VAR_INDEX
+
+
+@pytest.fixture(scope='module')
+def history(history_df):
+    return prepare_history(history_df)
+
+
+def _var(features, name):
+    return features[:, VAR_INDEX[name]]
+
+
+def test_evaluate_matches_hand_written_mask(history):
+    f = history.features
+    lo, hi = np.nanquantile(_var(f, 'VAR41'), [0.2, 0.6])
+    cut = float(np.nanmedian(_var(f, 'VAR39')))
+    expression = compile_expression(f"(VAR41 in [{lo}, {hi}] or VAR75 >= 0.5) and var39 < {cut}")
+    expected = (((_var(f, 'VAR41') >= lo) & (_var(f, 'VAR41') <= hi)) | (_var(f, 'VAR75') >= 0.5)) \
+        & (_var(f, 'VAR39') < cut)
+    assert expected.any() and not expected.all()
+    np.testing.assert_array_equal(expression.evaluate(f), expected)
+    assert expression.var_indices == sorted(VAR_INDEX[v] for v in ('VAR39', 'VAR41', 'VAR75'))
+    assert compile_expression("VAR01 >= -1e9").evaluate(f).all()
+
+
+def test_simplify():
+    assert simplify(parse_expression("VAR01 >= 1 and VAR01 <= 2")) == [[('VAR01', 1.0, 2.0)]]
+    assert simplify(parse_expression("VAR01 in [1, 2] or VAR01 in [1.5, 3]")) == [[('VAR01', 1.0, 3.0)]]
+    # (A or B) and A: o grupo que contém outro inteiro é redundante
+    assert simplify(parse_expression("(VAR01 >= 1 or VAR02 >= 1) and VAR01 >= 1")) == [[('VAR01', 1.0, np.inf)]]
+    groups = simplify(parse_expression("(VAR01 in [1, 2] or VAR02 <= 3) and VAR03 >= 0.5"))
+    assert simplify(parse_expression(format_expression(groups))) == groups
+
+
+@pytest.mark.parametrize('text', ["VAR01 >=", "VAR99 >= 1", "VAR01 in [1 2]", "(VAR01 >= 1", "VAR01 >= 1 VAR02", "VAR01 ! 2"])
+def test_parse_errors(text):
+    with pytest.raises(ValueError):
+        parse_expression(text)
+
+
+def test_expressions_catalog_matches_evaluate(history):
+    texts = {"a": "VAR41 >= 0.3 and VAR39 <= 2", "b": "VAR75 in [0.4, 0.8] or VAR41 < 0.2", "c": "VAR20 > 1"}
+    catalog = expressions_catalog(texts, {"a": 'over25', "b": 'over25'})
+    assert catalog.names == ["a", "b"]
+    board = backtest_catalog(history, catalog)
+    odd = history.columns[MARKETS['over25']['odd']]
+    for i, label in enumerate(catalog.names):
+        rows = compile_expression(texts[label]).evaluate(history.features) & (odd >= MARKETS['over25']['min_odd'])
+        assert board["Total de Jogos"].iloc[i] == rows.sum()
+
+
+@pytest.mark.parametrize('text', ["VAR01 >= 2 and VAR01 <= 1", "VAR01 in [2, 1] and VAR02 >= 0",
+                                  "(VAR01 in [3, 1] or VAR02 < 5 and VAR02 > 6) and VAR03 >= 0"])
+def test_empty_group_is_always_false(history, text):
+    expression = compile_expression(text)
+    assert expression.source == "False"
+    assert not expression.evaluate(history.features).any()
+    board = backtest_catalog(history, expressions_catalog({"x": expression}, 'over25'))
+    assert board["Total de Jogos"].iloc[0] == 0
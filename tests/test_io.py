@@ -0,0 +1,17 @@
+"""Esquema compacto: mesmo backtest com bem menos memória."""
+import numpy as np
+
+from engine import load_page_catalog, prepare_history, read_table
+from engine.all_markets import verify_compact_schema
+
+
+def test_compact_schema_is_lossless(history_df):
+    content = history_df.to_csv(index=False).encode()
+    raw, compact = read_table('h.csv', content, compact=False), read_table('h.csv', content)
+    assert raw.memory_usage(deep=True).sum() > 3 * compact.memory_usage(deep=True).sum()
+    assert compact['Date'].dtype == 'category' and compact['Odd_H_Back'].dtype == np.float32
+
+    a, b = prepare_history(raw), prepare_history(compact)
+    np.testing.assert_array_equal(a.features, b.features)
+    np.testing.assert_array_equal(a.dates, b.dates)
+    assert verify_compact_schema(raw, load_page_catalog('4_Over_2.5.py')) == []
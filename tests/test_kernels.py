@@ -0,0 +1,32 @@
+"""Kernel fundido contra o caminho NumPy (sem Numba o kernel roda como Python puro)."""
+import numpy as np
+import pytest
+
+from conftest import make_history
+from engine import kernels
+from engine.all_markets import totals_board
+from engine.backtest import match_bits, strategy_totals
+from engine.catalog import load_page_catalog
+from engine.history import prepare_history
+
+
+@pytest.mark.parametrize('eligible', [True, False])
+def test_fused_kernel_matches_numpy_path(monkeypatch, eligible):
+    df = make_history(400, seed=3)
+    df.loc[5, 'Odd_H_Back'] = np.nan
+    catalog = load_page_catalog('2_Back_Home.py').subset(range(150))
+    history = prepare_history(df)
+    expected = strategy_totals(history, catalog, match_bits(history, catalog, eligible=eligible))
+    monkeypatch.setattr(kernels, 'HAS_NUMBA', True)
+    bets, hits, profit = kernels.fused_totals(df, catalog, eligible=eligible, n_blocks=3)
+    np.testing.assert_array_equal(bets, expected[0])
+    np.testing.assert_array_equal(hits, expected[1])
+    np.testing.assert_allclose(profit, expected[2], atol=1e-9)
+
+
+def test_totals_board(history_df):
+    catalog = load_page_catalog('4_Over_2.5.py')
+    n_rows, board = totals_board(history_df, catalog)
+    assert n_rows == len(history_df)
+    assert board["Lucro Total"].is_monotonic_decreasing
+    assert np.isfinite(board["ROI"]).all()
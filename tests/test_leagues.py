@@ -0,0 +1,32 @@
+"""Filtro de ligas por código de categoria contra a comparação de strings linha a linha."""
+import numpy as np
+import pandas as pd
+
+from engine import filter_approved
+from engine.leagues import APPROVED_LEAGUES, approved_mask, normalize_leagues
+
+
+def test_filter_matches_string_compare():
+    rng = np.random.default_rng(0)
+    names = ["england 2 ", "ENGLAND 2", " Spain 1", "MARS 1", "brazil 1", "Narnia 3", None]
+    league = pd.Series(rng.choice(np.array(names, dtype=object), 5000))
+    df = pd.DataFrame({"League": league, "Odd": rng.random(5000)})
+
+    expected = league.str.upper().str.strip().isin(APPROVED_LEAGUES).to_numpy()
+    np.testing.assert_array_equal(approved_mask(league), expected)
+
+    out = filter_approved(df)
+    pd.testing.assert_series_equal(out["Odd"], df.loc[expected, "Odd"])
+    assert set(out["League"].cat.categories) == {"ENGLAND 2", "SPAIN 1", "MARS 1", "BRAZIL 1", "NARNIA 3"}
+    assert set(out["League"].astype(str)) == {"ENGLAND 2", "SPAIN 1", "BRAZIL 1"}
+
+    assert filter_approved(df, {"MARS 1"})["League"].astype(str).eq("MARS 1").all()
+    normalized = out["League"]
+    assert normalize_leagues(normalized) is normalized
+
+
+def test_without_league_column():
+    df = pd.DataFrame({"Odd": [1.5, 2.0]})
+    out = filter_approved(df)
+    pd.testing.assert_frame_equal(out, df)
+    assert out is not df
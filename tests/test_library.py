@@ -0,0 +1,63 @@
+"""Biblioteca de estratégias em arquivos e cache de apostas por chave de conteúdo."""
+import os
+
+import numpy as np
+import pytest
+
+from engine import approval_data, load_page_catalog, prepare_history
+from engine.catalog import Catalog
+from engine.library import BetCache, StrategyLibrary, parse_strategy_file, strategy_file_text
+
+TEXT = """# teste
+[over25]
+A: VAR41 >= 0.3 and VAR39 <= 2
+B: VAR75 in [0.4, 0.8] or VAR41 < 0.2
+
+[back_home]
+C: VAR01 in [1.2, 2.5]
+"""
+
+
+def _write(path, text, mtime):
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_refresh_and_bet_cache(tmp_path, history_df):
+    path = tmp_path / "teste.txt"
+    _write(path, TEXT, 10**18)
+    library = StrategyLibrary.open([str(path)])
+    assert library.catalog.names == ["A", "B", "C"]
+    assert library.refresh() == []
+
+    cache = BetCache(prepare_history(history_df))
+    data, new = cache.approval_data(library.catalog, library.keys)
+    assert new == 3
+
+    # Renomear não muda a chave; mudar uma faixa muda só a chave dessa estratégia
+    _write(path, TEXT.replace("A:", "A2:").replace("[1.2, 2.5]", "[1.3, 2.5]"), 2 * 10**18)
+    assert library.refresh() == [str(path)]
+    assert library.catalog.names == ["A2", "B", "C"]
+    data, new = cache.approval_data(library.catalog, library.keys)
+    assert new == 1
+    expected = approval_data(cache.history, library.catalog)
+    for field in ("offsets", "rows", "win", "profit"):
+        np.testing.assert_array_equal(getattr(data, field), getattr(expected, field))
+    assert cache.approval_data(library.catalog, library.keys)[1] == 0
+
+
+def test_page_round_trip(history_df):
+    catalog = load_page_catalog('4_Over_2.5.py')
+    rules = parse_strategy_file(strategy_file_text(catalog))
+    assert [(name, market) for name, market, _ in rules] == list(zip(catalog.names, catalog.markets))
+    history = prepare_history(history_df)
+    expected, data = approval_data(history, catalog), approval_data(history, Catalog.from_rules(rules))
+    np.testing.assert_array_equal(data.offsets, expected.offsets)
+    np.testing.assert_array_equal(data.rows, expected.rows)
+
+
+@pytest.mark.parametrize('text', ["[nada]\nA: VAR01 >= 1", "A: VAR01 >= 1", "[over25]\nVAR01 >= 1",
+                                  "[over25]\nA: VAR01 >="])
+def test_file_errors_name_the_line(text):
+    with pytest.raises(ValueError, match="linha"):
+        parse_strategy_file(text)
@@ -0,0 +1,43 @@
+"""Meta-backtest contra o replay direto, dia a dia, com as somas do pandas."""
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_history
+
+from engine import load_page_catalog, prepare_history
+from engine.backtest import bet_sequences, match_bits
+from engine.meta_backtest import matchdays, meta_backtest
+
+
+def _approved(win, profit):
+    """check_moving_averages das páginas de back sobre as apostas já liquidadas."""
+    if len(win) == 0:
+        return False
+    return bool(profit.tail(8).sum() >= 0.1 and profit.tail(40).sum() > 0.1
+                and win.tail(8).mean() >= 0.5 and win.tail(40).mean() > 0.5)
+
+
+@pytest.mark.parametrize('seed', [0, 2])
+def test_meta_backtest_matches_replay(seed):
+    history = prepare_history(make_history(4000, seed))
+    catalog = load_page_catalog('2_Back_Home.py').subset(range(0, 600, 3))
+    bits = match_bits(history, catalog)
+    summary, daily = meta_backtest(history, catalog, bits)
+
+    offsets, rows, _, win, profit = bet_sequences(history, catalog, bits)
+    day = matchdays(history)[rows]
+    expected = []
+    for k in range(len(catalog.names)):
+        w = pd.Series(win[offsets[k]:offsets[k + 1]])
+        p = pd.Series(profit[offsets[k]:offsets[k + 1]])
+        d = day[offsets[k]:offsets[k + 1]]
+        placed = np.array([_approved(w[d < d[j]], p[d < d[j]]) for j in range(len(d))], dtype=bool)
+        expected.append((placed.sum(), w[placed].sum(), p[placed].sum(), _approved(w, p)))
+    expected = np.array(expected, dtype=float)
+    assert expected[:, 0].sum() > 100  # o replay aprova apostas de fato
+    np.testing.assert_array_equal(summary["Apostas Aprovadas"], expected[:, 0])
+    np.testing.assert_array_equal(summary["Acertos"], expected[:, 1])
+    np.testing.assert_allclose(summary["Lucro Meta"], expected[:, 2], atol=1e-9)
+    np.testing.assert_array_equal(summary["Aprovada Hoje"], expected[:, 3].astype(bool))
+    assert daily["Apostas"].sum() == summary["Apostas Aprovadas"].sum()
+    assert np.isclose(daily["Lucro Acumulado"].iloc[-1], summary["Lucro Meta"].sum())
@@ -0,0 +1,61 @@
+"""MinHash/LSH: assinaturas contra o cálculo direto e grupos de estratégias equivalentes."""
+import numpy as np
+
+from engine import load_page_catalog, minhash_clusters, prepare_history
+from engine.backtest import match_bits
+from engine.bitsets import match_lists
+from engine.minhash import _PRIME, lsh_clusters, minhash_signatures
+
+
+def test_signatures_match_direct_minimum():
+    rng = np.random.default_rng(3)
+    lists = [np.sort(rng.choice(5000, size=s, replace=False)) for s in (0, 1, 40, 700)]
+    offsets = np.concatenate([[0], np.cumsum([len(x) for x in lists])])
+    signatures = minhash_signatures(offsets, np.concatenate(lists), n_hashes=40, seed=7)
+
+    rng = np.random.default_rng(7)  # os mesmos coeficientes da função
+    a = rng.integers(1, _PRIME, size=40, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, size=40, dtype=np.uint64)
+    assert (signatures[0] == _PRIME).all()
+    for rows, sig in zip(lists[1:], signatures[1:]):
+        direct = ((rows.astype(np.uint64)[:, None] * a + b) % _PRIME).min(axis=0)
+        np.testing.assert_array_equal(sig, direct)
+
+
+def test_estimated_jaccard():
+    base = np.arange(0, 4000, 2)
+    other = np.concatenate([base[:1500], np.arange(1, 1000, 2)])  # Jaccard 1500 / 2500 = 0.6
+    offsets = np.array([0, len(base), len(base) + len(other)])
+    sig = minhash_signatures(offsets, np.concatenate([base, np.sort(other)]), n_hashes=512)
+    assert abs((sig[0] == sig[1]).mean() - 0.6) < 0.08
+
+
+def test_lsh_groups_duplicates_and_respects_keys():
+    signatures = np.array([[1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 9, 9], [5, 6, 7, 8]], dtype=np.uint32)
+    labels = lsh_clusters(signatures, bands=2, threshold=0.5)
+    assert labels[0] == labels[1] == labels[2] != labels[3]
+    labels = lsh_clusters(signatures, bands=2, threshold=0.5, keys=np.array([0, 1, 0, 0]))
+    assert labels[0] == labels[2] != labels[1]
+
+
+def test_minhash_clusters(history_df):
+    history = prepare_history(history_df)
+    catalog = load_page_catalog('2_Back_Home.py')
+    bits = match_bits(history, catalog)
+    table = minhash_clusters(history, catalog, bits)
+    offsets, rows = match_lists(bits, history.n_rows)
+    sizes = np.diff(offsets)
+    np.testing.assert_array_equal(table["Total de Jogos"], sizes)
+    assert (table["Grupo"][sizes == 0] == -1).all()
+
+    # Estratégias com exatamente os mesmos jogos caem no mesmo grupo
+    keys = [rows[offsets[i]:offsets[i + 1]].tobytes() for i in range(len(sizes))]
+    for i, j in ((i, j) for i in range(len(keys)) for j in range(i) if sizes[i] and keys[i] == keys[j]):
+        assert table["Grupo"][i] == table["Grupo"][j]
+    # Um representante por grupo, o de mais jogos
+    groups = table[table["Grupo"] >= 0].groupby("Grupo")
+    assert (groups["Representante"].sum() == 1).all()
+    best = groups["Total de Jogos"].max()
+    rep = table[table["Representante"]].set_index("Grupo")["Total de Jogos"]
+    np.testing.assert_array_equal(rep.sort_index(), best.sort_index())
+    assert (groups.size() == table[table["Grupo"] >= 0].groupby("Grupo")["Tamanho do Grupo"].first()).all()
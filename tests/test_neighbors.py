@@ -0,0 +1,46 @@
+"""Vizinhos: busca exata contra a ordenação direta e médias por mercado contra o cálculo direto."""
+import numpy as np
+import pytest
+
+from engine import prepare_history
+from engine.neighbors import _exact_query, build_index, neighbor_games, neighbor_outcomes
+
+
+@pytest.fixture(scope='module')
+def history(history_df):
+    return prepare_history(history_df)
+
+
+def test_exact_query_matches_sorting():
+    rng = np.random.default_rng(0)
+    points, q = rng.normal(size=(500, 5)), rng.normal(size=(30, 5))
+    dist, idx = _exact_query(points, q, 7)
+    direct = np.sqrt(((q[:, None, :] - points[None]) ** 2).sum(axis=2))
+    np.testing.assert_array_equal(idx, np.argsort(direct, axis=1, kind='stable')[:, :7])
+    np.testing.assert_allclose(dist, np.sort(direct, axis=1)[:, :7], atol=1e-9)
+
+
+def test_index_without_pca_uses_standardized_vars(history):
+    index = build_index(history, n_components=None, rows=np.arange(3000))
+    x = history.features[:3000]
+    z = (x - np.nanmean(x, axis=0)) / np.where(np.nanstd(x, axis=0) > 0, np.nanstd(x, axis=0), 1.0)
+    np.testing.assert_allclose(index.points, np.where(np.isfinite(z), z, 0.0), atol=1e-9)
+
+    dist, rows = index.query(history.features[:5], k=3)
+    assert (rows[:, 0] == np.arange(5)).all() and np.allclose(dist[:, 0], 0.0, atol=1e-5)  # o próprio jogo
+
+
+def test_neighbor_outcomes(history):
+    index = build_index(history, n_components=8, rows=np.arange(3000))
+    features = history.features[3000:3040]
+    summary = neighbor_outcomes(history, index, features, k=25, markets=['back_home'])
+    _, idx = index.query(features, k=25)
+    s = history.settle('back_home')
+    for i in (0, 17, 39):
+        eligible = idx[i][s.eligible[idx[i]]]
+        assert np.isclose(summary["Acerto Back Home"][i], s.win[eligible].mean())
+        assert np.isclose(summary["Lucro Médio Back Home"][i], s.profit[eligible].mean())
+
+    games = neighbor_games(history, index, features[0], k=25, markets=['back_home'])
+    np.testing.assert_array_equal(games["Linha"], idx[0])
+    assert games["Distância"].is_monotonic_increasing
@@ -0,0 +1,62 @@
+"""Sobreposição: interseções contra a contagem direta e poda sem perda de cobertura."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from engine import load_page_catalog, prepare_history
+from engine.backtest import match_bits
+from engine.bitsets import unpack_rows
+from engine.overlap import intersection_matrix, jaccard_matrix, prune_redundant
+
+
+@pytest.fixture(scope='module')
+def matches(history_df):
+    history = prepare_history(history_df)
+    catalog = load_page_catalog('2_Back_Home.py')
+    bits = match_bits(history, catalog)
+    return catalog, bits, unpack_rows(bits, history.n_rows)
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_intersection_matrix(matches, n_jobs):
+    _, bits, rows = matches
+    dense = rows.astype(np.int32)
+    np.testing.assert_array_equal(intersection_matrix(bits, n_jobs=n_jobs), dense @ dense.T)
+
+
+def _greedy(catalog, rows):
+    """Poda de referência com conjuntos Python: maior primeiro, descarta as contidas numa mantida."""
+    sets = [frozenset(np.flatnonzero(r)) for r in rows]
+    kept = []
+    for i in sorted(range(len(sets)), key=lambda i: (-len(sets[i]), i)):
+        if not any(catalog.markets[j] == catalog.markets[i] and sets[i] <= sets[j] for j in kept):
+            kept.append(i)
+    return sorted(kept)
+
+
+def test_prune_redundant(matches):
+    catalog, bits, rows = matches
+    inter = intersection_matrix(bits, n_jobs=1)
+    kept = prune_redundant(catalog, inter)
+    np.testing.assert_array_equal(kept, _greedy(catalog, rows))
+    assert len(kept) < len(catalog.names)
+    np.testing.assert_array_equal(rows[kept].any(axis=0), rows.any(axis=0))  # cobertura idêntica
+
+    # Com min_jaccard, toda removida é contida ou quase igual a uma mantida do mesmo mercado
+    loose = prune_redundant(catalog, inter, min_jaccard=0.5)
+    jaccard = jaccard_matrix(inter)
+    markets = np.array(catalog.markets)
+    for i in np.setdiff1d(np.arange(len(markets)), loose):
+        peers = loose[markets[loose] == markets[i]]
+        assert ((inter[i, peers] == inter[i, i]) | (jaccard[i, peers] >= 0.5)).any()
+
+
+def test_prune_redundant_ties_and_markets():
+    # Cópias, subconjuntos, estratégias vazias e dois mercados: a poda vetorizada segue a gulosa
+    rng = np.random.default_rng(4)
+    base = rng.random((40, 300)) < 0.2
+    rows = np.concatenate([base, base[:10], base[10:30] & (rng.random((20, 300)) < 0.5), np.zeros((3, 300), bool)])
+    catalog = SimpleNamespace(markets=list(rng.choice(['back_home', 'over25'], len(rows))))
+    dense = rows.astype(np.int32)
+    np.testing.assert_array_equal(prune_redundant(catalog, dense @ dense.T), _greedy(catalog, rows))
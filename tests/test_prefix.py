@@ -0,0 +1,50 @@
+"""Somas prefixadas: janelas contra as somas diretas e estratégias independentes do resto do catálogo."""
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_history
+
+from engine import load_page_catalog, prepare_history
+from engine.backtest import bet_prefix
+from engine.meta_backtest import meta_backtest
+
+
+@pytest.fixture(scope='module')
+def setup():
+    history = prepare_history(make_history(4000, 2))
+    catalog = load_page_catalog('2_Back_Home.py')
+    return history, catalog, bet_prefix(history, catalog)
+
+
+def test_windows_match_direct_sums(setup):
+    history, _, prefix = setup
+    off = prefix.offsets
+    segments = [(k, pd.Series(prefix.profit[off[k]:off[k + 1]]), prefix.win[off[k]:off[k + 1]],
+                 prefix.rows[off[k]:off[k + 1]]) for k in range(len(off) - 1)]
+    bets, hits, profit = prefix.last(40)
+    np.testing.assert_array_equal(profit, [p.tail(40).sum() for _, p, _, _ in segments])  # bit a bit
+    np.testing.assert_array_equal(hits, [w[-40:].sum() for _, _, w, _ in segments])
+
+    bets, hits, profit = prefix.between_rows(1000, 2500)
+    for k, p, w, r in segments[::50]:
+        inside = (r >= 1000) & (r < 2500)
+        assert bets[k] == inside.sum() and hits[k] == w[inside].sum()
+        assert np.isclose(profit[k], p[inside].sum(), atol=1e-9)
+
+    rolling = prefix.rolling(8)[2]
+    for k, p, _, _ in segments[::50]:
+        np.testing.assert_array_equal(rolling[off[k]:off[k + 1]], [p.iloc[max(0, i - 7):i + 1].sum()
+                                                                    for i in range(len(p))])
+
+def test_strategy_alone_matches_full_catalog(setup):
+    history, catalog, prefix = setup
+    full, _ = meta_backtest(history, catalog)
+    picks = [0, 481, 700, len(catalog.names) - 1]
+    for k in picks:
+        alone, _ = meta_backtest(history, catalog.subset([k]))
+        pd.testing.assert_frame_equal(alone.reset_index(drop=True), full.iloc[[k]].reset_index(drop=True))
+
+    sub = bet_prefix(history, catalog.subset(picks))
+    for i, k in enumerate(picks):
+        full_total = prefix.sums(prefix.offsets[k:k + 1], prefix.offsets[k + 1:k + 2])[2]
+        np.testing.assert_array_equal(full_total, sub.sums(sub.offsets[i:i + 1], sub.offsets[i + 1:i + 2])[2])
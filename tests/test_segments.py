@@ -0,0 +1,28 @@
+"""Operações acumuladas por segmento."""
+import numpy as np
+
+from engine.segments import segment_cummax, segment_cumsum
+
+
+def _segments(seed=1):
+    rng = np.random.default_rng(seed)
+    offsets = np.concatenate([[0], np.cumsum(rng.integers(0, 300, 2000))])
+    return rng, offsets
+
+
+def test_segment_cummax_exact_with_large_values():
+    # Muitos segmentos e valores grandes: deslocar segmentos por índice x amplitude perdia precisão
+    rng, offsets = _segments()
+    values = rng.normal(size=offsets[-1]) * 1e12 + rng.normal(size=offsets[-1])
+    expected = np.concatenate([np.maximum.accumulate(values[a:b]) for a, b in zip(offsets[:-1], offsets[1:])])
+    np.testing.assert_array_equal(segment_cummax(values, offsets), expected)
+
+
+def test_segment_cumsum_independent_of_other_segments():
+    rng, offsets = _segments(2)
+    values = np.round(rng.normal(size=offsets[-1]) * 3, 2)
+    total = segment_cumsum(values, offsets)
+    for a, b in zip(offsets[:-1:97], offsets[1::97]):
+        np.testing.assert_array_equal(total[a:b], segment_cumsum(values[a:b], np.array([0, b - a])))
+        np.testing.assert_allclose(total[a:b], np.cumsum(values[a:b]), atol=1e-9)
+    assert len(segment_cumsum([], np.array([0, 0]))) == 0
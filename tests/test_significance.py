@@ -0,0 +1,48 @@
+"""Significância: FDR, bootstrap e permutação sobre o lucro das estratégias."""
+import numpy as np
+import pandas as pd
+
+from engine import approval_data, backtest_catalog, load_page_catalog, match_bits, prepare_history
+from engine.significance import benjamini_hochberg, significance
+
+
+def test_benjamini_hochberg():
+    # p ordenados 0.005, 0.01, 0.03, 0.04 -> p * 4 / posto = 0.02, 0.02, 0.04, 0.04
+    np.testing.assert_allclose(benjamini_hochberg([0.01, 0.04, 0.03, 0.005]), [0.02, 0.04, 0.04, 0.02])
+    assert len(benjamini_hochberg([])) == 0
+
+
+def test_significance(history_df):
+    history = prepare_history(history_df)
+    catalog = load_page_catalog('2_Back_Home.py').subset(range(120))
+    table = significance(history, catalog, n_resamples=400, seed=1, n_jobs=1)
+    pd.testing.assert_frame_equal(table, significance(history, catalog, n_resamples=400, seed=1, n_jobs=1))
+
+    board = backtest_catalog(history, catalog)
+    np.testing.assert_array_equal(table["Total de Jogos"], board["Total de Jogos"])
+    np.testing.assert_allclose(table["Lucro Total"], board["Lucro Total"], atol=1e-9)
+
+    active = table[table["Total de Jogos"] > 0]
+    inside = (active["IC Lucro Inferior"] <= active["Lucro Total"] + 1e-9) & \
+             (active["Lucro Total"] <= active["IC Lucro Superior"] + 1e-9)
+    assert inside.mean() > 0.95
+    assert ((table["p-valor"] >= 1 / 401) & (table["p-valor"] <= 1)).all()
+    assert (table["q-valor (FDR)"] >= table["p-valor"]).all()
+    assert (table.loc[table["Total de Jogos"] == 0, "p-valor"] == 1).all()
+
+
+def test_significance_min_odd(history_df):
+    history = prepare_history(history_df)
+    catalog = load_page_catalog('2_Back_Home.py').subset(range(60))
+    table = significance(history, catalog, n_resamples=200, seed=1, n_jobs=1, min_odd=1.8)
+    expected = approval_data(history, catalog).prefix(1.8)
+    sizes = np.diff(expected.offsets)
+    np.testing.assert_array_equal(table["Total de Jogos"], sizes)
+    owner = np.repeat(np.arange(len(sizes)), sizes)
+    np.testing.assert_allclose(table["Lucro Total"], np.bincount(owner, expected.profit, len(sizes)), atol=1e-9)
+    # A população nula também usa a odd mínima: com os mesmos bits, o p-valor muda sem ela
+    bits = match_bits(history, catalog, min_odd=1.8)
+    loose = significance(history, catalog, bits=bits, n_resamples=200, seed=1, n_jobs=1)
+    pd.testing.assert_frame_equal(significance(history, catalog, bits=bits, n_resamples=200, seed=1, n_jobs=1,
+                                               min_odd=1.8), table)
+    assert not np.array_equal(loose["p-valor"], table["p-valor"])
@@ -0,0 +1,46 @@
+"""Simulação de Poisson: médias recuperadas das odds, probabilidades coerentes e Monte Carlo perto do exato."""
+from math import exp, factorial
+
+import numpy as np
+import pandas as pd
+
+from engine import simulate_games
+from engine.simulation import market_probabilities, poisson_pmf, sample_grid, score_grid
+
+
+def _fair_odds(lam_home, lam_away):
+    """Odds sem margem (1X2 e Over/Under 2.5) de jogos com as médias dadas."""
+    probs = market_probabilities(score_grid(lam_home, lam_away, 20))
+    p_draw = 1 - probs['back_home'] - probs['back_away']
+    return pd.DataFrame({"Odd_H_Back": 1 / probs['back_home'], "Odd_D_Back": 1 / p_draw,
+                         "Odd_A_Back": 1 / probs['back_away'], "Odd_Over25_FT_Back": 1 / probs['over25'],
+                         "Odd_Under25_FT_Back": 1 / probs['under25']})
+
+
+def test_poisson_pmf():
+    pmf = poisson_pmf(np.array([0.7, 2.4]), max_goals=6)
+    expected = [[exp(-lam) * lam ** k / factorial(k) for k in range(7)] for lam in (0.7, 2.4)]
+    np.testing.assert_allclose(pmf, expected, rtol=1e-12)
+
+
+def test_rates_recovered_from_fair_odds():
+    lam_home, lam_away = np.array([0.6, 1.4, 2.5]), np.array([1.8, 1.1, 0.4])
+    df = _fair_odds(lam_home, lam_away)
+    df.loc[len(df)] = [2.0, np.nan, 3.0, 1.9, 1.9]  # sem empate: fica NaN
+    table, grid = simulate_games(df, max_goals=20)
+    np.testing.assert_allclose(table["λ Casa"][:3], lam_home, atol=1e-6)
+    np.testing.assert_allclose(table["λ Fora"][:3], lam_away, atol=1e-6)
+    assert table.iloc[3].isna().all()
+    np.testing.assert_allclose(table["Prob. Back Home"][:3] + table["Prob. Back Away"][:3]
+                               + grid[:3, np.arange(21), np.arange(21)].sum(axis=1), 1.0)
+    np.testing.assert_allclose(table["VE Back Home"][:3], 0.0, atol=1e-6)  # odds justas: VE zero
+    np.testing.assert_allclose(table["Prob. Lay 0x0"][:3], 1 - np.exp(-lam_home - lam_away), atol=1e-6)
+
+
+def test_monte_carlo_close_to_exact():
+    grid = score_grid(np.array([1.3, 0.9]), np.array([1.0, 1.6]), 10)
+    grid[1] = np.nan
+    sampled = sample_grid(grid, n_sims=200_000, seed=1)
+    assert np.isclose(sampled[0].sum(), 1.0) and np.isnan(sampled[1]).all()
+    np.testing.assert_allclose(sampled[0], grid[0], atol=0.005)
+    np.testing.assert_array_equal(sampled, sample_grid(grid, n_sims=200_000, seed=1))
@@ -0,0 +1,34 @@
+"""Stakes de Kelly e percentuais no back e no lay."""
+import numpy as np
+
+from engine.staking import kelly_fractions, stake_fractions
+
+
+def _fractions(odd, win, lay):
+    n = len(win)
+    return kelly_fractions(np.full(n, odd), np.asarray(win), np.array([0, n]), multiplier=1.0, min_bets=1,
+                           max_fraction=1.0, lay=np.full(n, lay))
+
+
+def test_kelly_back():
+    # 3 acertos em 4 a odd 2.0: f = p - (1 - p) / (odd - 1) = 0.5
+    assert np.isclose(_fractions(2.0, [True, True, False, True, False], False)[-1], 0.5)
+
+
+def test_kelly_lay_sizes_the_liability():
+    # Lay a odd 3.0 com 90% de acerto: responsabilidade f = p - (1 - p)(odd - 1) = 0.7
+    win = [True] * 9 + [False, True]
+    risk = _fractions(3.0, win, True)[-1]
+    assert np.isclose(risk, 0.7)
+    assert np.isclose(stake_fractions(np.array([risk]), np.array([3.0]), np.array([True]))[0], 0.35)
+    # Odd 11: perder custa 10 vezes a stake e 90% de acerto não dá vantagem
+    assert _fractions(11.0, win, True)[-1] == 0.0
+
+
+def test_percent_lay_risks_the_fraction_as_liability():
+    odd = np.array([2.0, 5.0, 5.0])
+    lay = np.array([False, False, True])
+    stake = stake_fractions(np.full(3, 0.02), odd, lay)
+    assert np.allclose(stake, [0.02, 0.02, 0.005])
+    # Perder o lay custa stake * (odd - 1): exatamente a fração da banca
+    assert np.isclose(stake[2] * (odd[2] - 1.0), 0.02)
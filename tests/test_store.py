@@ -0,0 +1,42 @@
+"""Armazém de históricos em disco: leitura mapeada e limite de históricos guardados."""
+import os
+import pickle
+import time
+
+import numpy as np
+
+from conftest import make_history
+from engine import approval_data, filter_approved, load_page_catalog, prepare_history
+from engine.store import default_store_dir, find_rows, open_history, row_keys
+
+
+def test_open_history_matches_prepare(history_df):
+    content = history_df.to_csv(index=False).encode()
+    history = open_history('historico.csv', content)
+    assert history.store.startswith(default_store_dir())
+    assert isinstance(history.features, np.memmap)
+
+    df = filter_approved(history_df).reset_index(drop=True)
+    catalog = load_page_catalog('2_Back_Home.py')
+    fresh = approval_data(prepare_history(df), catalog)
+    stored = approval_data(pickle.loads(pickle.dumps(history)), catalog)
+    np.testing.assert_array_equal(stored.offsets, fresh.offsets)
+    np.testing.assert_array_equal(stored.profit, fresh.profit)
+
+    keys = row_keys(df)
+    np.testing.assert_array_equal(find_rows(history, keys[::-1]), np.arange(len(df))[::-1])
+    assert (find_rows(history, [np.uint64(12345)]) == -1).all()
+
+
+def test_open_history_prunes_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv('ENGINE_STORE_MAX_ENTRIES', '2')
+    files = [make_history(300, seed).to_csv(index=False).encode() for seed in range(3)]
+    first = open_history('a.csv', files[0], str(tmp_path)).store
+    time.sleep(0.01)
+    second = open_history('b.csv', files[1], str(tmp_path)).store
+    time.sleep(0.01)
+    assert open_history('a.csv', files[0], str(tmp_path)).store == first  # renova o uso do primeiro
+    time.sleep(0.01)
+    third = open_history('c.csv', files[2], str(tmp_path)).store
+    assert os.path.isdir(first) and os.path.isdir(third)
+    assert not os.path.exists(second)
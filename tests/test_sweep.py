@@ -0,0 +1,52 @@
+"""Varredura da odd mínima contra a reavaliação direta de cada corte."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import approval_data, evaluate_approval, load_page_catalog, prepare_history
+from engine.sweep import best_min_odds, odds_curve, sweep_min_odds
+
+
+@pytest.fixture(scope='module')
+def data(history_df):
+    return approval_data(prepare_history(history_df), load_page_catalog('4_Over_2.5.py'))
+
+
+def test_sweep_matches_evaluate_approval(data):
+    cutoffs = (1.2, 1.3, 1.55, 2.0, 50.0)
+    sweep = sweep_min_odds(data, cutoffs)
+    assert len(sweep) == len(cutoffs) * len(data.names)
+    for c in cutoffs:
+        direct = evaluate_approval(data, min_odd=c)
+        at = sweep[sweep["Odd Mínima"] == c].reset_index(drop=True)
+        np.testing.assert_array_equal(at["Total de Jogos"], direct["Total de Jogos"])
+        np.testing.assert_array_equal(at["Acertos"], direct["Acertos"])
+        np.testing.assert_allclose(at["Lucro Total"], direct["Lucro Total"], atol=1e-9)
+    assert (sweep.loc[sweep["Odd Mínima"] == 50.0, "Total de Jogos"] == 0).all()
+
+
+def test_odds_curve_and_best(data):
+    k = int(np.argmax(np.diff(data.offsets)))
+    curve = odds_curve(data, k)
+    odd = data.odd[data.offsets[k]:data.offsets[k + 1]]
+    assert curve["Odd Mínima"].is_monotonic_increasing
+    for _, point in curve.iloc[::7].iterrows():
+        assert point["Total de Jogos"] == (odd >= point["Odd Mínima"]).sum()
+
+    sweep = sweep_min_odds(data)
+    best = best_min_odds(sweep, min_bets=20)
+    assert not best.duplicated(["Mercado", "Estratégia"]).any()
+    top = sweep[sweep["Total de Jogos"] >= 20].groupby("Estratégia", sort=False)["Lucro Total"].max()
+    np.testing.assert_allclose(best.set_index("Estratégia").loc[top.index, "Lucro Total"], top)
+
+
+def test_strategy_alone_matches_catalog(history_df):
+    # As somas recomeçam em cada estratégia: num catálogo menor, os mesmos números, bit a bit
+    history = prepare_history(history_df)
+    catalog = load_page_catalog('2_Back_Home.py')
+    full = sweep_min_odds(approval_data(history, catalog))
+    part = np.arange(1, len(catalog), 2)
+    alone = sweep_min_odds(approval_data(history, catalog.subset(part)))
+    cutoffs = full["Odd Mínima"].nunique()
+    rows = (part[:, None] * cutoffs + np.arange(cutoffs)).ravel()
+    pd.testing.assert_frame_equal(alone, full.iloc[rows].reset_index(drop=True), check_exact=True)
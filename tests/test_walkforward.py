@@ -0,0 +1,32 @@
+"""Walk-forward: somas por fold contra a contagem direta das apostas."""
+import numpy as np
+import pytest
+
+from engine import load_page_catalog, make_folds, match_bits, prepare_history, walk_forward
+from engine.bitsets import unpack_rows
+
+
+def test_make_folds():
+    assert make_folds(100, n_folds=2, train_size=0.5) == [(0, 50, 75), (25, 75, 100)]
+    assert make_folds(100, n_folds=2, train_size=0.5, anchored=True) == [(0, 50, 75), (0, 75, 100)]
+    with pytest.raises(ValueError):
+        make_folds(3, n_folds=5)
+
+
+def test_walk_forward_matches_direct_sums(history_df):
+    history = prepare_history(history_df)
+    catalog = load_page_catalog('3_Back_Away.py').subset(range(200))
+    folds = make_folds(history.n_rows, n_folds=3)
+    per_fold, summary = walk_forward(history, catalog, folds=folds, n_jobs=1)
+
+    matched = unpack_rows(match_bits(history, catalog), history.n_rows)
+    s = history.settle('back_away')
+    for k, (a, b, c) in enumerate(folds):
+        fold = per_fold[per_fold["Fold"] == k + 1]
+        np.testing.assert_array_equal(fold["Jogos Treino"], matched[:, a:b].sum(axis=1))
+        np.testing.assert_array_equal(fold["Acertos Teste"], (matched[:, b:c] & s.win[b:c]).sum(axis=1))
+        np.testing.assert_allclose(fold["Lucro Teste"], matched[:, b:c] @ s.profit[b:c], atol=1e-9)
+    test_profit = per_fold["Lucro Teste"].to_numpy().reshape(len(catalog), -1)
+    train_profit = per_fold["Lucro Treino"].to_numpy().reshape(len(catalog), -1)
+    np.testing.assert_allclose(summary["Lucro OOS Selecionado"],
+                               np.where(train_profit > 0, test_profit, 0.0).sum(axis=1), atol=1e-9)